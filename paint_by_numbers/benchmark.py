@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Performance Benchmarks
+Compares optimized pipeline stages against the implementations they replaced
+
+Each case runs in a fresh subprocess so peak RSS readings are not polluted by
+earlier cases. Usage:
+
+    python -m paint_by_numbers.benchmark assignment --size 2480x3508 --colors 72
+    python -m paint_by_numbers.benchmark skin_clutter --size 2480x3508 --speckles 500
+    python -m paint_by_numbers.benchmark preprocess --size 2480x3508 --workers 4
+    python -m paint_by_numbers.benchmark regions --size 2480x3508 --colors 24
+"""
+
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / 1024 if sys.platform != "darwin" else peak / (1024 * 1024)
+
+
+def _reset_peak_rss():
+    """Reset the kernel's high-water mark where supported (Linux)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _current_rss_mb() -> float:
+    """Current resident set size in MB (falls back to peak where unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return _peak_rss_mb()
+
+
+def _hwm_rss_mb() -> float:
+    """High-water RSS since the last reset in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return _peak_rss_mb()
+
+
+def _run_case(setup: Callable, fn: Callable, args: tuple, queue):
+    """Child-process body: build inputs, run once, report timing and memory."""
+    inputs = setup(*args)
+    _reset_peak_rss()
+    baseline = _current_rss_mb()
+
+    start = time.perf_counter()
+    fn(*inputs)
+    elapsed = time.perf_counter() - start
+
+    queue.put((elapsed, _hwm_rss_mb() - baseline))
+
+
+def run_isolated(setup: Callable, fn: Callable, args: tuple) -> Tuple[float, float]:
+    """
+    Run one benchmark case in a fresh process
+
+    Args:
+        setup: Picklable function building the inputs from ``args``
+        fn: Picklable function under test, called with the setup result
+        args: Arguments for ``setup``
+
+    Returns:
+        Tuple of (seconds, peak RSS growth in MB)
+    """
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_case, args=(setup, fn, args, queue))
+    proc.start()
+    proc.join()
+
+    if proc.exitcode != 0:
+        # Most often the OOM killer on the legacy code path
+        return float("nan"), float("nan")
+
+    return queue.get()
+
+
+def print_results(title: str, n_items: int, results: List[Tuple[str, float, float]],
+                  unit: str = "px"):
+    """Print a results table with throughput and peak memory columns."""
+    print("=" * 70)
+    print(title)
+    print("=" * 70)
+    print(f"{'Implementation':<32}{'Time (s)':>10}{f'M{unit}/s':>12}{'Peak RSS (MB)':>16}")
+    print("-" * 70)
+    for name, seconds, peak_mb in results:
+        throughput = n_items / seconds / 1e6 if seconds and seconds == seconds else float("nan")
+        print(f"{name:<32}{seconds:>10.3f}{throughput:>12.2f}{peak_mb:>16.1f}")
+    print()
+
+
+# ----------------------------------------------------------------------------
+# Nearest-palette assignment
+# ----------------------------------------------------------------------------
+
+def _assignment_inputs(width: int, height: int, n_colors: int, seed: int):
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    palette = rng.integers(0, 256, (n_colors, 3)).astype(np.float32)
+    return image, palette
+
+
+def _assign_broadcast(image: np.ndarray, palette: np.ndarray):
+    """Previous implementation: full N×K×3 difference tensor."""
+    pixels = image.reshape(-1, 3).astype(np.float32)
+    distances = np.linalg.norm(pixels[:, np.newaxis] - palette[np.newaxis, :], axis=2)
+    return np.argmin(distances, axis=1)
+
+
+def _assign_cdist(image: np.ndarray, palette: np.ndarray):
+    """Previous ColorOptimizer implementation: full N×K cdist matrix."""
+    from scipy.spatial import distance
+    pixels = image.reshape(-1, 3).astype(np.float32)
+    return np.argmin(distance.cdist(pixels, palette, metric='euclidean'), axis=1)
+
+
+def _assign_chunked(image: np.ndarray, palette: np.ndarray):
+    from paint_by_numbers.core.color_assignment import assign_to_nearest
+    return assign_to_nearest(image, palette)
+
+
+def benchmark_assignment(width: int, height: int, n_colors: int, seed: int = 0,
+                         include_legacy: bool = True, **options):
+    """Nearest-palette assignment: broadcast/cdist vs chunked engine."""
+    args = (width, height, n_colors, seed)
+    cases = [("chunked (PaletteAssigner)", _assign_chunked)]
+    if include_legacy:
+        cases = [("broadcast N×K×3", _assign_broadcast),
+                 ("scipy cdist N×K", _assign_cdist)] + cases
+
+    results = []
+    for name, fn in cases:
+        seconds, peak_mb = run_isolated(_assignment_inputs, fn, args)
+        results.append((name, seconds, peak_mb))
+
+    print_results(f"Nearest-palette assignment: {width}x{height}, {n_colors} colors",
+                  width * height, results)
+    return results
+
+
+# ----------------------------------------------------------------------------
+# Skin-clutter reduction
+# ----------------------------------------------------------------------------
+
+_SKIN_PALETTE = np.array([
+    [224, 172, 140],   # light skin
+    [198, 134, 100],   # mid skin
+    [40, 30, 28],      # dark brown
+    [25, 25, 30],      # near black
+    [240, 240, 240],   # background
+], dtype=np.uint8)
+
+
+def _skin_clutter_inputs(width: int, height: int, n_speckles: int, seed: int):
+    """Synthetic portrait: two skin tones on a light background, dark speckles in the skin."""
+    import logging
+    from paint_by_numbers.logger import logger
+    logger.setLevel(logging.WARNING)
+
+    rng = np.random.default_rng(seed)
+    labels = np.full((height, width), 4, dtype=np.uint8)
+    labels[height // 8:, width // 6:width - width // 6] = 0
+    labels[height // 2:, width // 6:width - width // 6] = 1
+
+    yy, xx = np.ogrid[:height, :width]
+    for _ in range(n_speckles):
+        cy = rng.integers(height // 8 + 8, height - 8)
+        cx = rng.integers(width // 6 + 8, width - width // 6 - 8)
+        r = rng.integers(1, 7)
+        y0, y1, x0, x1 = cy - r, cy + r + 1, cx - r, cx + r + 1
+        disk = (yy[y0:y1] - cy) ** 2 + (xx[:, x0:x1] - cx) ** 2 <= r * r
+        labels[y0:y1, x0:x1][disk] = rng.integers(2, 4)
+
+    image = _SKIN_PALETTE[labels]
+    return image, _SKIN_PALETTE.copy(), labels
+
+
+def _skin_clutter_full_frame(image: np.ndarray, palette: np.ndarray, labels: np.ndarray):
+    """Previous implementation: full-size mask and full-frame dilation per component."""
+    import cv2
+    from paint_by_numbers.core.color_quantizer import ColorQuantizer
+    quantizer = ColorQuantizer()
+    skin = [i for i, c in enumerate(palette) if quantizer._is_skin_tone(c)]
+    dark = [i for i, c in enumerate(palette) if i not in skin and np.mean(c) < 60]
+    kernel = np.ones((5, 5), np.uint8)
+
+    for dark_idx in dark:
+        n, components, stats, _ = cv2.connectedComponentsWithStats(
+            (labels == dark_idx).astype(np.uint8), connectivity=8
+        )
+        for region_idx in range(1, n):
+            if stats[region_idx, cv2.CC_STAT_AREA] >= 200:
+                continue
+            region_mask = components == region_idx
+            dilated = cv2.dilate(region_mask.astype(np.uint8), kernel, iterations=1)
+            neighbors = labels[dilated.astype(bool) & ~region_mask]
+            skin_neighbors = [v for v in np.unique(neighbors) if v in skin]
+            if skin_neighbors:
+                counts = [np.sum(neighbors == v) for v in skin_neighbors]
+                labels[region_mask] = skin_neighbors[int(np.argmax(counts))]
+    return labels
+
+
+def _skin_clutter_roi(image: np.ndarray, palette: np.ndarray, labels: np.ndarray):
+    from paint_by_numbers.core.color_quantizer import ColorQuantizer
+    return ColorQuantizer()._reduce_dark_clutter_in_skin(image, palette, labels)[1]
+
+
+def benchmark_skin_clutter(width: int, height: int, n_colors: int, seed: int = 0,
+                           include_legacy: bool = True, speckles: int = 500, **options):
+    """Dark-speckle merging in skin: full-frame dilation vs bounding-box ROIs."""
+    args = (width, height, speckles, seed)
+    cases = [("bbox ROI", _skin_clutter_roi)]
+    if include_legacy:
+        cases = [("full-frame dilation", _skin_clutter_full_frame)] + cases
+
+    results = []
+    for name, fn in cases:
+        seconds, peak_mb = run_isolated(_skin_clutter_inputs, fn, args)
+        results.append((name, seconds, peak_mb))
+
+    print_results(f"Skin-clutter reduction: {width}x{height}, {speckles} speckles",
+                  width * height, results)
+    return results
+
+
+# ----------------------------------------------------------------------------
+# Spatial preprocessing filters
+# ----------------------------------------------------------------------------
+
+def _preprocess_inputs(width: int, height: int, seed: int):
+    """Smooth gradient with sensor-like noise, and the default filter chain."""
+    from paint_by_numbers.config import Config
+    from paint_by_numbers.core.tiled_preprocess import spatial_filter_specs
+
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[:height, :width].astype(np.float32)
+    base = np.stack([xx / width, yy / height, (xx + yy) / (width + height)], axis=2) * 255
+    noisy = base + rng.normal(0, 12, base.shape)
+    image = np.clip(noisy, 0, 255).astype(np.uint8)
+    return image, spatial_filter_specs(Config())
+
+
+def _preprocess_single(image: np.ndarray, specs: list):
+    """Previous implementation: every filter on the whole frame in one thread."""
+    import cv2
+    from paint_by_numbers.core.tiled_preprocess import apply_spatial_filters
+    cv2.setNumThreads(1)
+    return apply_spatial_filters(image, specs)
+
+
+def _preprocess_tiled(image: np.ndarray, specs: list, tile_size: int, workers: int):
+    from paint_by_numbers.core.tiled_preprocess import apply_spatial_filters_tiled
+    return apply_spatial_filters_tiled(image, specs, tile_size=tile_size, max_workers=workers)
+
+
+def benchmark_preprocess(width: int, height: int, n_colors: int, seed: int = 0,
+                         include_legacy: bool = True, workers: int = None,
+                         tile_size: int = 1024, **options):
+    """Denoise/blur/bilateral chain: single-threaded full frame vs process-parallel tiles."""
+    from functools import partial
+
+    args = (width, height, seed)
+    cases = [(f"tiled ({tile_size}px, {workers or 'all'} workers)",
+              partial(_preprocess_tiled, tile_size=tile_size, workers=workers))]
+    if include_legacy:
+        cases = [("single-threaded full frame", _preprocess_single)] + cases
+
+    results = []
+    for name, fn in cases:
+        seconds, peak_mb = run_isolated(_preprocess_inputs, fn, args)
+        results.append((name, seconds, peak_mb))
+
+    # Peak RSS covers the coordinating process only, not the tile workers
+    print_results(f"Spatial preprocessing: {width}x{height}", width * height, results)
+    return results
+
+
+# ----------------------------------------------------------------------------
+# Region labeling
+# ----------------------------------------------------------------------------
+
+def _region_inputs(width: int, height: int, n_colors: int, seed: int):
+    """Blotchy label map: coarse color patches broken up by small specks."""
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    coarse = rng.integers(0, n_colors, (max(1, height // 40), max(1, width // 40)), dtype=np.uint8)
+    labels = cv2.resize(coarse, (width, height), interpolation=cv2.INTER_NEAREST)
+    # Blur the patch borders so regions get irregular outlines
+    noise = cv2.GaussianBlur(rng.random((height, width), dtype=np.float32), (0, 0), 6)
+    shifted = np.roll(labels, 17, axis=1)
+    labels = np.where(noise > np.median(noise), labels, shifted)
+    specks = rng.random((height, width)) < 0.002
+    labels[specks] = rng.integers(0, n_colors, int(specks.sum()))
+    return labels, n_colors, 100
+
+
+def _regions_per_color(labels: np.ndarray, n_colors: int, min_area: int):
+    """Previous implementation: per-color mask, contours, and a full-frame fill per contour."""
+    import cv2
+    regions = []
+    for color_idx in range(n_colors):
+        mask = (labels == color_idx).astype(np.uint8) * 255
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for contour in contours:
+            if cv2.contourArea(contour) < min_area:
+                continue
+            region_mask = np.zeros_like(mask)
+            cv2.drawContours(region_mask, [contour], -1, 255, -1)
+            regions.append((color_idx, contour, int(np.count_nonzero(region_mask))))
+    return regions
+
+
+def _regions_single_pass(labels: np.ndarray, n_colors: int, min_area: int):
+    from paint_by_numbers.core.region_labeling import label_regions, region_crop, region_contour
+    region_ids, table = label_regions(labels)
+    regions = []
+    for region_id in np.flatnonzero(table["area"] >= min_area):
+        crop, offset = region_crop(region_ids, table["bbox"][region_id], region_id)
+        regions.append((int(table["color"][region_id]), region_contour(crop, offset),
+                        int(table["area"][region_id])))
+    return regions
+
+
+def benchmark_regions(width: int, height: int, n_colors: int, seed: int = 0,
+                      include_legacy: bool = True, **options):
+    """Region extraction: per-color masks and contour fills vs one labeling pass."""
+    args = (width, height, n_colors, seed)
+    cases = [("single-pass labeling", _regions_single_pass)]
+    if include_legacy:
+        cases = [("per-color contour fill", _regions_per_color)] + cases
+
+    results = []
+    for name, fn in cases:
+        seconds, peak_mb = run_isolated(_region_inputs, fn, args)
+        results.append((name, seconds, peak_mb))
+
+    print_results(f"Region extraction: {width}x{height}, {n_colors} colors",
+                  width * height, results)
+    return results
+
+
+# ----------------------------------------------------------------------------
+# Nearby-region merging
+# ----------------------------------------------------------------------------
+
+def _merge_inputs(width: int, height: int, n_colors: int, seed: int):
+    """Detected regions of the blotchy label map, ready to merge."""
+    from paint_by_numbers.core.region_detector import RegionDetector
+
+    labels, n_colors, _ = _region_inputs(width, height, n_colors, seed)
+    palette = np.random.default_rng(seed).integers(0, 256, (n_colors, 3), dtype=np.uint8)
+    detector = RegionDetector()
+    detector.detect_regions(palette[labels], palette, labels)
+    return detector, 5
+
+
+def _merge_full_frame(detector, distance_threshold: int):
+    """Previous implementation: full-frame dilate, erode, contour and center per blob."""
+    import cv2
+    h, w = detector.region_ids.shape
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (distance_threshold, distance_threshold))
+    merged = []
+    for regions in detector.color_regions.values():
+        if not regions:
+            continue
+        combined = np.zeros((h, w), dtype=np.uint8)
+        for region in regions:
+            x, y, rw, rh = region.bbox
+            combined[y:y + rh, x:x + rw] |= region.mask
+        contours, _ = cv2.findContours(cv2.dilate(combined, kernel),
+                                       cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for contour in contours:
+            mask = np.zeros((h, w), dtype=np.uint8)
+            cv2.drawContours(mask, [contour], -1, 255, -1)
+            mask = cv2.bitwise_and(cv2.erode(mask, kernel), combined)
+            area = int(np.sum(mask > 0))
+            if area < detector.config.MIN_REGION_SIZE:
+                continue
+            clean, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            center = cv2.minMaxLoc(cv2.distanceTransform(mask, cv2.DIST_L2, 5))[3]
+            merged.append((max(clean, key=cv2.contourArea), center, area))
+    return merged
+
+
+def _merge_roi(detector, distance_threshold: int):
+    return detector.merge_nearby_regions(same_color=True, distance_threshold=distance_threshold)
+
+
+def benchmark_merge(width: int, height: int, n_colors: int, seed: int = 0,
+                    include_legacy: bool = True, **options):
+    """Nearby-region merging: full-frame masks vs per-cluster ROIs."""
+    args = (width, height, n_colors, seed)
+    cases = [("per-cluster ROI", _merge_roi)]
+    if include_legacy:
+        cases = [("full-frame dilate/erode", _merge_full_frame)] + cases
+
+    results = []
+    for name, fn in cases:
+        seconds, peak_mb = run_isolated(_merge_inputs, fn, args)
+        results.append((name, seconds, peak_mb))
+
+    print_results(f"Nearby-region merging: {width}x{height}, {n_colors} colors",
+                  width * height, results)
+    return results
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    "assignment": benchmark_assignment,
+    "skin_clutter": benchmark_skin_clutter,
+    "preprocess": benchmark_preprocess,
+    "regions": benchmark_regions,
+    "merge": benchmark_merge,
+}
+
+
+def _parse_size(value: str) -> Tuple[int, int]:
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Paint-by-numbers performance benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS.keys()))
+    parser.add_argument("--size", type=_parse_size, default=(2480, 3508),
+                        help="Image size as WIDTHxHEIGHT (default: A4 @ 300 DPI)")
+    parser.add_argument("--colors", type=int, default=72, help="Palette size")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for inputs")
+    parser.add_argument("--skip-legacy", action="store_true",
+                        help="Only run the optimized implementation")
+    parser.add_argument("--speckles", type=int, default=500,
+                        help="Dark speckles in the skin_clutter portrait")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes for tiled preprocess (default: CPU count)")
+    parser.add_argument("--tile-size", type=int, default=1024,
+                        help="Tile edge length for tiled preprocess")
+    args = parser.parse_args()
+
+    width, height = args.size
+    BENCHMARKS[args.benchmark](width, height, args.colors, seed=args.seed,
+                               include_legacy=not args.skip_legacy,
+                               speckles=args.speckles, workers=args.workers,
+                               tile_size=args.tile_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,13 +13,22 @@ class Config:
     # Image Processing
     MAX_IMAGE_SIZE = (1200, 1200)  # Maximum dimensions for processing (backend limit)
     MIN_IMAGE_SIZE = (400, 400)    # Minimum dimensions for good results
+    MAX_IMAGE_DIMENSION = 10000    # Largest side load_image accepts (larger images: streaming mode)
+    REDUCED_JPEG_DECODE = True     # Decode large JPEGs at 1/2, 1/4 or 1/8 scale when that still covers MAX_IMAGE_SIZE
     # IMPORTANT: Frontend PortraitCropSelector must stay within MAX_IMAGE_SIZE
     # to prevent memory issues and crashes
     AUTO_WHITE_BALANCE = True      # Apply gray-world white balance correction
     WHITE_BALANCE_CLIP = 0.01      # Clip percentile for white balance scaling
+    COLOR_GRADING_LUT_SIZE = 33    # Lattice points per channel of the fused color-grading 3D LUT
     APPLY_DENOISE = True           # Run fast denoising prior to clustering
     DENOISE_STRENGTH = 7           # Strength for luminance denoising
     DENOISE_COLOR_STRENGTH = 7     # Strength for chroma denoising
+    ADAPTIVE_DENOISE = True        # Pick skip / light bilateral / NLM from the estimated noise level
+    DENOISE_SKIP_SIGMA = 2.0       # Estimated noise sigma below which denoising is skipped
+    DENOISE_NLM_SIGMA = 5.0        # Estimated noise sigma at or above which NLM runs (between: bilateral)
+    DENOISE_BILATERAL_D = 5        # Diameter of the light bilateral denoise
+    DENOISE_BILATERAL_SIGMA_COLOR = 25  # Sigma color of the light bilateral denoise
+    DENOISE_BILATERAL_SIGMA_SPACE = 5   # Sigma space of the light bilateral denoise
     APPLY_LOCAL_CONTRAST = True    # Use CLAHE based local contrast enhancement
     CLAHE_CLIP_LIMIT = 2.5         # Clip limit for CLAHE
     CLAHE_TILE_GRID_SIZE = (8, 8)  # Tile grid for CLAHE (must be tuple)
@@ -28,6 +37,18 @@ class Config:
     APPLY_SHARPENING = True        # Apply unsharp masking for edge clarity
     SHARPEN_RADIUS = 3             # Radius for Gaussian blur in unsharp mask
     SHARPEN_AMOUNT = 0.6           # Sharpening amount (0-1 suggested)
+    TILED_PREPROCESS = False       # Denoise/blur/bilateral over overlapping tiles in a process pool
+    TILED_PREPROCESS_MIN_PIXELS = 4_000_000  # Frames smaller than this stay single-process
+    PREPROCESS_TILE_SIZE = 1024    # Edge length of each tile's output area (halo added per filter)
+    PREPROCESS_WORKERS = None      # Worker processes for tiled preprocessing (None = CPU count)
+    STREAMING_TILE_SIZE = 1024     # Tile edge length in streaming mode (bounds peak memory)
+    STREAMING_MAX_DIMENSION = 65500  # Largest side streaming mode accepts
+    STREAMING_DECODE_BUDGET_MB = 1024  # Largest full-frame decode allowed for compressed inputs
+                                       # (uncompressed PPM/TIFF are memory-mapped and exempt)
+    STREAMING_HISTOGRAM_BITS = 6   # Bits per channel of the streamed palette histogram
+    STREAMING_SMOOTHING_WINDOW = 5  # Majority-filter window for streamed labels (1 = off)
+    STREAMING_PREVIEW_SIZE = 2000  # Longest side of the streaming-mode preview PNG
+    STREAMING_SCRATCH_DIR = None   # Directory for decoded-pixel scratch files (None = system temp)
 
     # Color Quantization
     DEFAULT_NUM_COLORS = 15        # Default number of colors
@@ -35,12 +56,24 @@ class Config:
     MAX_NUM_COLORS = 72            # Increased for highly detailed outputs (was 36)
     COLOR_SAMPLE_FRACTION = 0.3    # Fraction of pixels to sample for clustering
     KMEANS_COLOR_SPACE = "lab"     # Color space for clustering (rgb, lab, hsv)
+    KMEANS_USE_HISTOGRAM = False   # Cluster a weighted histogram of distinct colors instead of sampled pixels
+    KMEANS_HISTOGRAM_BITS = 6      # Bits kept per channel when binning the histogram (8 = exact colors)
+    KMEANS_ENGINE = "sklearn"      # 'sklearn' (restarts in one call) or 'parallel' (threaded, early stopping;
+                                   # full-batch K-means only, so it implies KMEANS_USE_HISTOGRAM)
+    KMEANS_MAX_RESTARTS = 10       # Upper bound on restarts for the parallel engine
+    KMEANS_RESTART_BATCH = 4       # Restarts launched together; fixed so results don't depend on core count
+    KMEANS_PLATEAU_TOLERANCE = 0.001  # Stop when a batch improves best inertia by less than this fraction
+    KMEANS_WORKERS = None          # Threads for restarts (None = min(batch, CPU count))
     PALETTE_DISTANCE_METRIC = "lab"  # Metric for palette projection
+    ASSIGNMENT_MEMORY_MB = 64      # Working-memory ceiling for pixel-to-palette distance kernels
 
     # Unified Palette - BUSINESS MODEL: USE FIXED COLORS FOR REUSABLE PAINT KITS
     # This allows customers to buy ONE paint kit and paint MULTIPLE templates!
     USE_UNIFIED_PALETTE = False    # Default to dynamic palette for better color accuracy
     UNIFIED_PALETTE_NAME = "classic_18"  # Default: 18-color Creative Kit palette (when enabled)
+    PALETTE_LUT_ENABLED = True     # Map fixed palettes through cached RGB->label lookup tables
+    PALETTE_LUT_BITS = 8           # Bits per channel indexed by the LUT (8 = exact, fewer = binned)
+    PALETTE_LUT_CACHE_DIR = None   # LUT cache directory (None = ~/.cache/paint_by_numbers/palette_luts)
 
     # Business Benefits (when USE_UNIFIED_PALETTE = True):
     # - Customers buy standardized paint kits (Starter/Creative/Professional)
@@ -51,6 +84,7 @@ class Config:
 
     # Enhanced Color Control (for dynamic palettes)
     MAX_SINGLE_COLOR_PERCENTAGE = 40.0  # Max % any color can cover (prevents black dominance)
+    DOMINANT_SPLIT_SAMPLE_SIZE = 20000  # Pixels sampled to fit each dominant-color split
     AVOID_PURE_BLACK = True            # Replace pure black with dark shades
     AVOID_PURE_WHITE = False           # Replace pure white with off-white
     VIBRANCY_BOOST = 1.15             # Color vibrancy multiplier (1.0 = normal, 1.15 = 15% boost)
@@ -104,6 +138,7 @@ class Config:
     DPI = 300                      # DPI for saved images
     GENERATE_SVG = False           # Generate SVG output
     GENERATE_PDF = False           # Generate PDF kit
+    PREVIEW_MAX_DIMENSION = 400    # Longest side of the proxy generate_preview() works on
 
     # Logging
     LOG_LEVEL = "INFO"             # Logging level (DEBUG, INFO, WARNING, ERROR)
@@ -0,0 +1,265 @@
+"""
+Color Assignment Module - Memory-bounded pixel-to-palette assignment engines
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+try:
+    from paint_by_numbers.config import Config
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from config import Config
+
+
+# Smallest chunk worth dispatching to BLAS; below this the per-call overhead dominates
+MIN_CHUNK_PIXELS = 1024
+
+
+def compact_label_dtype(n_colors: int) -> np.dtype:
+    """
+    Get the smallest unsigned dtype able to hold labels for a palette
+
+    Args:
+        n_colors: Number of palette colors
+
+    Returns:
+        uint8 for palettes up to 256 colors, uint16 up to 65536, else int32
+    """
+    if n_colors <= np.iinfo(np.uint8).max + 1:
+        return np.dtype(np.uint8)
+    if n_colors <= np.iinfo(np.uint16).max + 1:
+        return np.dtype(np.uint16)
+    return np.dtype(np.int32)
+
+
+class PaletteAssigner:
+    """
+    Assigns pixels to their nearest palette color in fixed-size chunks.
+
+    Squared Euclidean distances are expanded as ‖x‖² − 2x·c + ‖c‖², so each
+    chunk costs one matrix product against the palette. The ‖x‖² term is
+    constant per pixel and only computed when distances are requested.
+    All working buffers are allocated once and reused for every chunk, which
+    keeps peak memory at roughly ``memory_limit_mb`` regardless of image size.
+    """
+
+    def __init__(self, palette: np.ndarray, memory_limit_mb: Optional[float] = None):
+        """
+        Initialize assigner
+
+        Args:
+            palette: Palette colors (K, 3) in the space distances are measured in
+            memory_limit_mb: Ceiling for working buffers (default from config)
+        """
+        if memory_limit_mb is None:
+            memory_limit_mb = Config.ASSIGNMENT_MEMORY_MB
+
+        palette = np.asarray(palette, dtype=np.float64).reshape(-1, 3)
+        if len(palette) == 0:
+            raise ValueError("Palette must contain at least one color")
+
+        # Center on the palette mean so float32 products keep their precision
+        self.center = palette.mean(axis=0)
+        centered = palette - self.center
+
+        self.n_colors = len(palette)
+        self.label_dtype = compact_label_dtype(self.n_colors)
+        self.palette_t = np.ascontiguousarray((-2.0 * centered).T, dtype=np.float32)
+        self.palette_sq = np.einsum('ij,ij->i', centered, centered).astype(np.float32)
+        self.center32 = self.center.astype(np.float32)
+
+        # Per-pixel working set: K distances + 3 centered channels + argmin index
+        bytes_per_pixel = self.n_colors * 4 + 3 * 4 + np.dtype(np.intp).itemsize
+        self.chunk_size = max(MIN_CHUNK_PIXELS,
+                              int(memory_limit_mb * 1024 * 1024) // bytes_per_pixel)
+
+        self._pixel_buffer = None
+        self._distance_buffer = None
+        self._index_buffer = None
+
+    def _ensure_buffers(self, n: int):
+        """Allocate reusable chunk buffers the first time they are needed."""
+        size = min(n, self.chunk_size)
+        if self._distance_buffer is None or len(self._distance_buffer) < size:
+            self._pixel_buffer = np.empty((size, 3), dtype=np.float32)
+            self._distance_buffer = np.empty((size, self.n_colors), dtype=np.float32)
+            self._index_buffer = np.empty(size, dtype=np.intp)
+
+    def assign(self, pixels: np.ndarray,
+               return_distances: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Assign every pixel to its nearest palette color
+
+        Args:
+            pixels: Pixel values (..., 3) in the same space as the palette
+            return_distances: Also return squared distance to the chosen color
+
+        Returns:
+            Tuple of (labels with the pixels' leading shape, squared distances or None)
+        """
+        shape = pixels.shape[:-1]
+        flat = pixels.reshape(-1, 3)
+        n = len(flat)
+
+        labels = np.empty(n, dtype=self.label_dtype)
+        min_distances = np.empty(n, dtype=np.float32) if return_distances else None
+
+        if n == 0:
+            return labels.reshape(shape), (min_distances.reshape(shape) if return_distances else None)
+
+        self._ensure_buffers(n)
+
+        for start in range(0, n, self.chunk_size):
+            stop = min(start + self.chunk_size, n)
+            count = stop - start
+
+            chunk = self._pixel_buffer[:count]
+            dist = self._distance_buffer[:count]
+            idx = self._index_buffer[:count]
+
+            np.subtract(flat[start:stop], self.center32, out=chunk, casting='unsafe')
+            np.dot(chunk, self.palette_t, out=dist)
+            dist += self.palette_sq
+            np.argmin(dist, axis=1, out=idx)
+            labels[start:stop] = idx
+
+            if return_distances:
+                nearest = dist[np.arange(count), idx]
+                nearest += np.einsum('ij,ij->i', chunk, chunk)
+                np.maximum(nearest, 0, out=nearest)
+                min_distances[start:stop] = nearest
+
+        labels = labels.reshape(shape)
+        if return_distances:
+            return labels, min_distances.reshape(shape)
+        return labels, None
+
+    def __call__(self, pixels: np.ndarray) -> np.ndarray:
+        """Shorthand for ``assign(pixels)`` returning only labels."""
+        return self.assign(pixels)[0]
+
+
+def assign_to_nearest(pixels: np.ndarray, palette: np.ndarray,
+                      memory_limit_mb: Optional[float] = None) -> np.ndarray:
+    """
+    Assign pixels to nearest palette colors with bounded memory
+
+    Args:
+        pixels: Pixel values (..., 3)
+        palette: Palette colors (K, 3) in the same space
+        memory_limit_mb: Ceiling for working buffers (default from config)
+
+    Returns:
+        Compact label array with the pixels' leading shape
+    """
+    return PaletteAssigner(palette, memory_limit_mb)(pixels)
+
+
+def build_color_histogram(pixels: np.ndarray, bits: int = 8) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reduce 8-bit pixels to a weighted histogram of distinct colors
+
+    Args:
+        pixels: uint8 pixel values (..., 3)
+        bits: Bits kept per channel; below 8, colors are binned and each bin
+              is represented by the mean of its members
+
+    Returns:
+        Tuple of (colors (U, 3) float32, counts (U,) int64, inverse index
+        mapping every pixel to its histogram entry)
+    """
+    flat = pixels.reshape(-1, 3)
+    shift = 8 - int(np.clip(bits, 1, 8))
+
+    binned = flat >> shift if shift else flat
+    keys = (binned[:, 0].astype(np.uint32) << 16) | (binned[:, 1].astype(np.uint32) << 8) | binned[:, 2]
+    unique_keys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+
+    if shift == 0:
+        colors = np.stack([(unique_keys >> 16) & 0xFF,
+                           (unique_keys >> 8) & 0xFF,
+                           unique_keys & 0xFF], axis=1).astype(np.float32)
+    else:
+        colors = np.empty((len(unique_keys), 3), dtype=np.float32)
+        for channel in range(3):
+            sums = np.bincount(inverse, weights=flat[:, channel], minlength=len(unique_keys))
+            colors[:, channel] = sums / counts
+
+    return colors, counts.astype(np.int64), inverse
+
+
+def balanced_assignment(cost: np.ndarray, weights: np.ndarray,
+                        target_percentages: np.ndarray,
+                        tolerance: float = 15.0,
+                        under_use_penalty: float = 5.0,
+                        over_use_penalty: float = 10.0,
+                        max_rounds: int = 50,
+                        price_step: float = 0.02) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Capacity-constrained assignment by iterative price adjustment
+
+    Every item picks the column minimizing ``cost + price``. After each round
+    the per-column usage (weighted, in percent) is compared to its target and
+    each price moves by ``price_step`` times the usage penalty:
+    ``deviation * over_use_penalty`` above the tolerance band,
+    ``deviation * under_use_penalty`` (a bonus) below it, nothing inside it.
+    Prices accumulate, so a color keeps the surcharge that brought it into
+    the band. Unchanged labels do not mean convergence while any column is
+    out of band, since its price keeps moving until it flips rows; the loop
+    stops once every column is inside the band or after ``max_rounds``, and
+    the assignment with the smallest total out-of-band deviation is returned.
+
+    Args:
+        cost: Cost matrix (U, K), e.g. ΔE from histogram colors to palette
+        weights: Pixel count per row (U,)
+        target_percentages: Target usage per column in percent (K,)
+        tolerance: Allowed deviation from target before penalties apply (%)
+        under_use_penalty: Bonus multiplier for under-used columns
+        over_use_penalty: Penalty multiplier for over-used columns
+        max_rounds: Maximum number of price-adjustment rounds
+        price_step: Fraction of the penalty applied to prices each round
+
+    Returns:
+        Tuple of (row labels (U,), usage percentages (K,), rounds run)
+    """
+    n_rows, n_cols = cost.shape
+    weights = np.asarray(weights, dtype=np.float64)
+    targets = np.asarray(target_percentages, dtype=np.float64)
+    total = weights.sum()
+
+    prices = np.zeros(n_cols, dtype=np.float32)
+
+    # Priced costs are evaluated in row chunks to avoid a second (U, K) matrix
+    chunk_rows = max(MIN_CHUNK_PIXELS, int(Config.ASSIGNMENT_MEMORY_MB * 1024 * 1024) // (n_cols * 4))
+    buffer = np.empty((min(chunk_rows, n_rows), n_cols), dtype=np.float32)
+
+    best_labels, best_usage, best_violation = None, None, np.inf
+    rounds = 0
+
+    for rounds in range(1, max_rounds + 1):
+        new_labels = np.empty(n_rows, dtype=np.intp)
+        for start in range(0, n_rows, chunk_rows):
+            stop = min(start + chunk_rows, n_rows)
+            priced = buffer[:stop - start]
+            np.add(cost[start:stop], prices, out=priced)
+            np.argmin(priced, axis=1, out=new_labels[start:stop])
+
+        usage = np.bincount(new_labels, weights=weights, minlength=n_cols) / total * 100
+        deviation = usage - targets
+        violation = np.maximum(np.abs(deviation) - tolerance, 0).sum()
+
+        if violation <= best_violation:
+            best_labels, best_usage, best_violation = new_labels, usage, violation
+
+        if violation == 0:
+            break
+
+        penalty = np.where(deviation > tolerance, deviation * over_use_penalty,
+                           np.where(deviation < -tolerance, deviation * under_use_penalty, 0.0))
+        prices += (price_step * penalty).astype(np.float32)
+
+    return best_labels, best_usage, rounds
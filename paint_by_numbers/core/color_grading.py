@@ -0,0 +1,317 @@
+"""
+Color Grading Module - Per-pixel color transforms fused into one RGB→RGB 3D LUT
+"""
+
+import numpy as np
+from typing import Callable, List, Optional, Tuple
+
+try:
+    from paint_by_numbers.utils.opencv import require_cv2
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from utils.opencv import require_cv2
+
+
+# A stage maps float32 RGB values (M, 3) in [0, 255] to new values in [0, 255]
+ColorStage = Callable[[np.ndarray], np.ndarray]
+
+# Pixels converted per chunk when applying a LUT
+APPLY_CHUNK_PIXELS = 1 << 16
+
+
+class ColorGradingLUT:
+    """
+    Chain of per-pixel color stages compiled into a 3D lookup table.
+
+    Stages are evaluated once on a ``size``³ lattice of RGB values, in
+    float, so there is no rounding between stages. Images are then graded
+    in a single pass by trilinear interpolation between the eight lattice
+    points surrounding each pixel, instead of one full-frame round trip
+    (and float copy) per stage.
+    """
+
+    def __init__(self, size: int = 33):
+        """
+        Initialize an empty (identity) grading chain
+
+        Args:
+            size: Lattice points per channel
+        """
+        self.size = int(max(2, size))
+        self.stages: List[Tuple[str, ColorStage]] = []
+        self._table = None
+
+    def add(self, name: str, stage: ColorStage) -> 'ColorGradingLUT':
+        """
+        Append a stage to the chain
+
+        Args:
+            name: Stage name, for logging
+            stage: Per-pixel transform
+
+        Returns:
+            self, for chaining
+        """
+        self.stages.append((name, stage))
+        self._table = None
+        return self
+
+    def extend(self, stages: List[Tuple[str, ColorStage]]) -> 'ColorGradingLUT':
+        """Append several (name, stage) pairs."""
+        for name, stage in stages:
+            self.add(name, stage)
+        return self
+
+    @property
+    def names(self) -> List[str]:
+        """Names of the stages in order"""
+        return [name for name, _ in self.stages]
+
+    def transform(self, pixels: np.ndarray) -> np.ndarray:
+        """
+        Run the stages directly (no interpolation) on a set of colors
+
+        Args:
+            pixels: RGB values (..., 3)
+
+        Returns:
+            float32 RGB values (M, 3) in [0, 255]
+        """
+        values = np.asarray(pixels, dtype=np.float32).reshape(-1, 3)
+        for _, stage in self.stages:
+            values = stage(values)
+        return values
+
+    @property
+    def table(self) -> np.ndarray:
+        """The (size³, 3) float32 table, built on first access"""
+        if self._table is None:
+            levels = np.linspace(0, 255, self.size, dtype=np.float32)
+            r, g, b = np.meshgrid(levels, levels, levels, indexing='ij')
+            lattice = np.stack([r.ravel(), g.ravel(), b.ravel()], axis=1)
+            self._table = np.ascontiguousarray(self.transform(lattice), dtype=np.float32)
+        return self._table
+
+    def apply(self, image: np.ndarray) -> np.ndarray:
+        """
+        Grade a uint8 RGB image in one pass
+
+        Args:
+            image: uint8 RGB image (..., 3)
+
+        Returns:
+            Graded uint8 image of the same shape
+        """
+        if not self.stages:
+            return image
+
+        table = self.table
+        n = self.size
+        shape = image.shape
+        flat = np.ascontiguousarray(image, dtype=np.uint8).reshape(-1, 3)
+        out = np.empty_like(flat)
+
+        # Lattice offsets and fractional positions of every 8-bit level
+        position = np.arange(256, dtype=np.float32) * ((n - 1) / 255.0)
+        cell = np.minimum(position.astype(np.int32), n - 2)
+        frac = (position - cell).astype(np.float32)[:, None]
+        stride_r, stride_g = n * n, n
+        offset_r, offset_g = cell * stride_r, cell * stride_g
+        corners = [dr * stride_r + dg * stride_g + db
+                   for dr in (0, 1) for dg in (0, 1) for db in (0, 1)]
+
+        for start in range(0, len(flat), APPLY_CHUNK_PIXELS):
+            chunk = flat[start:start + APPLY_CHUNK_PIXELS]
+            r, g, b = chunk[:, 0], chunk[:, 1], chunk[:, 2]
+            base = offset_r[r] + offset_g[g] + cell[b]
+            c000, c001, c010, c011, c100, c101, c110, c111 = (
+                np.take(table, base + corner, axis=0) for corner in corners
+            )
+
+            # Interpolate along blue, then green, then red
+            fb, fg, fr = frac[b], frac[g], frac[r]
+            c00 = _lerp(c000, c001, fb)
+            c01 = _lerp(c010, c011, fb)
+            c10 = _lerp(c100, c101, fb)
+            c11 = _lerp(c110, c111, fb)
+            graded = _lerp(_lerp(c00, c01, fg), _lerp(c10, c11, fg), fr)
+
+            graded += 0.5
+            np.clip(graded, 0, 255, out=graded)
+            out[start:start + len(chunk)] = graded
+
+        return out.reshape(shape)
+
+    __call__ = apply
+
+
+def _lerp(a: np.ndarray, b: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """a + (b - a) * t, reusing b's buffer."""
+    b -= a
+    b *= t
+    b += a
+    return b
+
+
+def _convert(values: np.ndarray, code: int) -> np.ndarray:
+    """cvtColor on an (M, 3) float32 array."""
+    cv2 = require_cv2()
+    return cv2.cvtColor(values.reshape(-1, 1, 3), code).reshape(-1, 3)
+
+
+def sample_pixels(image: np.ndarray, max_pixels: int = 1 << 18) -> np.ndarray:
+    """
+    Regular-grid pixel sample for image statistics
+
+    Args:
+        image: Image (H, W, 3)
+        max_pixels: Approximate upper bound on the sample size
+
+    Returns:
+        Pixels (M, 3)
+    """
+    h, w = image.shape[:2]
+    step = max(1, int(np.ceil(np.sqrt(h * w / max_pixels))))
+    return image[::step, ::step].reshape(-1, 3)
+
+
+def _histogram_percentile(hist: np.ndarray, q: float) -> float:
+    """np.percentile (linear interpolation) of integer data given its histogram."""
+    cumulative = np.cumsum(hist)
+    n = int(cumulative[-1])
+    position = q / 100.0 * (n - 1)
+    k = int(np.floor(position))
+    low = np.searchsorted(cumulative, k, side='right')
+    high = np.searchsorted(cumulative, min(k + 1, n - 1), side='right')
+    return float(low + (position - k) * (high - low))
+
+
+def white_balance_stage(image: np.ndarray, clip: float = 0.0) -> ColorStage:
+    """
+    Gray-world white balance with optional percentile clipping
+
+    Statistics come from per-channel 256-bin histograms, which give the same
+    percentiles and clipped means as working on a float copy of the frame.
+
+    Args:
+        image: uint8 RGB image the statistics are measured on
+        clip: Fraction clipped at each end of every channel before averaging
+
+    Returns:
+        Stage applying the clip and per-channel gains
+    """
+    levels = np.arange(256, dtype=np.float64)
+    lower = np.zeros(3)
+    upper = np.full(3, 255.0)
+    avg_rgb = np.empty(3)
+
+    for channel in range(3):
+        hist = np.bincount(image[..., channel].ravel(), minlength=256)
+        if clip > 0:
+            lower[channel] = _histogram_percentile(hist, clip * 100)
+            upper[channel] = _histogram_percentile(hist, (1.0 - clip) * 100)
+        clipped = np.clip(levels, lower[channel], upper[channel])
+        avg_rgb[channel] = (hist * clipped).sum() / hist.sum()
+
+    scale = np.mean(avg_rgb) / np.maximum(avg_rgb, 1e-6)
+    lower, upper, scale = (v.astype(np.float32) for v in (lower, upper, scale))
+
+    def stage(rgb: np.ndarray) -> np.ndarray:
+        return np.clip(np.clip(rgb, lower, upper) * scale, 0, 255)
+
+    return stage
+
+
+def mean_lightness(pixels: np.ndarray) -> float:
+    """
+    Mean CIELAB lightness of a set of colors, normalized to 0-1
+
+    Args:
+        pixels: RGB values (M, 3) in [0, 255]
+
+    Returns:
+        Mean L / 100
+    """
+    cv2 = require_cv2()
+    lab = _convert(np.asarray(pixels, dtype=np.float32) / 255.0, cv2.COLOR_RGB2Lab)
+    return float(np.mean(lab[:, 0])) / 100.0
+
+
+def tone_gamma(mean_l: float, target: float) -> Optional[float]:
+    """
+    Gamma that moves a mean lightness onto the target
+
+    Args:
+        mean_l: Current mean lightness (0-1)
+        target: Desired mean lightness (0-1)
+
+    Returns:
+        Gamma, or None when the image is too dark or too bright to correct
+    """
+    if mean_l <= 1e-3:
+        return None
+    denominator = np.log(max(mean_l, 1e-3))
+    if abs(denominator) < 1e-6:
+        return None
+    return float(np.log(target) / denominator)
+
+
+def tone_curve_stage(gamma: float) -> ColorStage:
+    """
+    Power curve on CIELAB lightness, leaving chroma untouched
+
+    Args:
+        gamma: Exponent applied to L / 100
+
+    Returns:
+        Stage
+    """
+    cv2 = require_cv2()
+
+    def stage(rgb: np.ndarray) -> np.ndarray:
+        lab = _convert(rgb / 255.0, cv2.COLOR_RGB2Lab)
+        # Stabilize extremes to prevent NaNs
+        lab[:, 0] = np.power(np.clip(lab[:, 0] / 100.0, 1e-4, 1.0), gamma) * 100.0
+        return np.clip(_convert(lab, cv2.COLOR_Lab2RGB) * 255.0, 0, 255)
+
+    return stage
+
+
+def saturation_stage(factor: float) -> ColorStage:
+    """
+    Scale HSV saturation
+
+    Args:
+        factor: Saturation multiplier
+
+    Returns:
+        Stage
+    """
+    cv2 = require_cv2()
+
+    def stage(rgb: np.ndarray) -> np.ndarray:
+        hsv = _convert(rgb / 255.0, cv2.COLOR_RGB2HSV)
+        hsv[:, 1] = np.clip(hsv[:, 1] * factor, 0, 1)
+        return np.clip(_convert(hsv, cv2.COLOR_HSV2RGB) * 255.0, 0, 255)
+
+    return stage
+
+
+def warmth_stage(amount: float) -> ColorStage:
+    """
+    Shift red up and blue down (positive = warmer, negative = cooler)
+
+    Args:
+        amount: Red offset; blue moves by half of it the other way
+
+    Returns:
+        Stage
+    """
+    shift = np.array([amount, 0.0, -amount * 0.5], dtype=np.float32)
+
+    def stage(rgb: np.ndarray) -> np.ndarray:
+        return np.clip(rgb + shift, 0, 255)
+
+    return stage
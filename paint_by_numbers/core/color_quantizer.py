@@ -2,25 +2,42 @@
 Color Quantization Module - Reduces image to limited color palette
 """
 
+import time
 import numpy as np
 from typing import Optional, Tuple
-from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.cluster import KMeans
 
 try:
     from paint_by_numbers.config import Config
-    from paint_by_numbers.utils.helpers import sort_colors_by_brightness, ensure_uint8
+    from paint_by_numbers.utils.helpers import ensure_uint8
     from paint_by_numbers.palettes import PaletteManager
     from paint_by_numbers.logger import logger
     from paint_by_numbers.utils.opencv import require_cv2
+    from paint_by_numbers.core.color_assignment import (
+        assign_to_nearest, build_color_histogram, balanced_assignment, compact_label_dtype
+    )
+    from paint_by_numbers.core.palette_lut import get_palette_lut
+    from paint_by_numbers.core.palette_tree import PaletteTree
+    from paint_by_numbers.core.kmeans_engine import make_kmeans, fit_kmeans_restarts, MINIBATCH_THRESHOLD
+    from paint_by_numbers.core.color_grading import ColorGradingLUT, saturation_stage, warmth_stage
+    from paint_by_numbers.core.image_context import ImageContext
 except ImportError:
     import sys
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent.parent))
     from config import Config
-    from utils.helpers import sort_colors_by_brightness, ensure_uint8
+    from utils.helpers import ensure_uint8
     from palettes import PaletteManager
     from logger import logger
     from utils.opencv import require_cv2
+    from core.color_assignment import (
+        assign_to_nearest, build_color_histogram, balanced_assignment, compact_label_dtype
+    )
+    from core.palette_lut import get_palette_lut
+    from core.palette_tree import PaletteTree
+    from core.kmeans_engine import make_kmeans, fit_kmeans_restarts, MINIBATCH_THRESHOLD
+    from core.color_grading import ColorGradingLUT, saturation_stage, warmth_stage
+    from core.image_context import ImageContext
 
 
 def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
@@ -139,6 +156,82 @@ def delta_e_cie2000(lab1: np.ndarray, lab2: np.ndarray) -> float:
     return dE
 
 
+def delta_e_cie2000_matrix(lab1: np.ndarray, lab2: np.ndarray,
+                           memory_limit_mb: Optional[float] = None) -> np.ndarray:
+    """
+    Calculate CIEDE2000 differences between every pair of colors in two sets.
+
+    Broadcast, float32 version of ``delta_e_cie2000``: entry [i, j] equals
+    ``delta_e_cie2000(lab1[i], lab2[j])``. Rows are processed in chunks so the
+    temporaries stay within the memory ceiling, which makes it usable for
+    pixel×palette matrices as well as palette×palette checks.
+
+    Args:
+        lab1: LAB colors (N, 3), e.g. image pixels
+        lab2: LAB colors (M, 3), e.g. palette
+        memory_limit_mb: Ceiling for chunk temporaries (default from config)
+
+    Returns:
+        Distance matrix (N, M) in float32
+    """
+    if memory_limit_mb is None:
+        memory_limit_mb = Config.ASSIGNMENT_MEMORY_MB
+
+    lab1 = np.asarray(lab1, dtype=np.float32).reshape(-1, 3)
+    lab2 = np.asarray(lab2, dtype=np.float32).reshape(-1, 3)
+    n, m = len(lab1), len(lab2)
+    result = np.empty((n, m), dtype=np.float32)
+    if n == 0 or m == 0:
+        return result
+
+    L1, a1, b1 = lab1[:, 0:1], lab1[:, 1:2], lab1[:, 2:3]
+    L2, a2, b2 = lab2[:, 0], lab2[:, 1], lab2[:, 2]
+
+    C1 = np.sqrt(a1**2 + b1**2)
+    C2 = np.sqrt(a2**2 + b2**2)
+    b1_sq = b1**2
+    b2_sq = b2**2
+    # Lightness weighting only depends on the first color
+    SL = 1 + (0.015 * (L1 - 50)**2) / np.sqrt(20 + (L1 - 50)**2)
+    pow25_7 = np.float32(25.0**7)
+
+    # About ten (rows × M) float32 temporaries are live at once
+    rows = max(1, int(memory_limit_mb * 1024 * 1024) // (m * 4 * 10))
+
+    for start in range(0, n, rows):
+        s = slice(start, min(start + rows, n))
+
+        cbar7 = ((C1[s] + C2) / 2.0)**7
+        one_plus_g = 1.5 - 0.5 * np.sqrt(cbar7 / (cbar7 + pow25_7))
+        del cbar7
+
+        C1p = np.sqrt((a1[s] * one_plus_g)**2 + b1_sq[s])
+        dC = np.sqrt((a2 * one_plus_g)**2 + b2_sq)
+        dC -= C1p
+        del one_plus_g
+
+        # Simplified hue difference (matches the scalar implementation)
+        dH = (a2 - a1[s])**2
+        dH += (b2 - b1[s])**2
+        dH -= dC**2
+        np.maximum(dH, 0, out=dH)
+        np.sqrt(dH, out=dH)
+
+        dH /= 1 + 0.015 * C1p
+        dC /= 1 + 0.045 * C1p
+        del C1p
+
+        out = result[s]
+        np.subtract(L2, L1[s], out=out)
+        out /= SL[s]
+        np.square(out, out=out)
+        out += dC**2
+        out += dH**2
+        np.sqrt(out, out=out)
+
+    return result
+
+
 def assign_colors_to_palette(image: np.ndarray, palette: np.ndarray) -> np.ndarray:
     """
     Assign each pixel in image to the nearest color in palette
@@ -151,11 +244,9 @@ def assign_colors_to_palette(image: np.ndarray, palette: np.ndarray) -> np.ndarr
         Quantized image with pixels assigned to palette colors
     """
     h, w = image.shape[:2]
-    pixels = image.reshape(-1, 3).astype(np.float32)
 
-    # Find nearest palette color for each pixel
-    distances = np.linalg.norm(pixels[:, np.newaxis] - palette[np.newaxis, :], axis=2)
-    labels = np.argmin(distances, axis=1)
+    # Find nearest palette color for each pixel (chunked, bounded memory)
+    labels = assign_to_nearest(image, palette)
 
     # Create quantized image
     quantized = palette[labels].reshape(h, w, 3).astype(np.uint8)
@@ -166,19 +257,24 @@ def assign_colors_to_palette(image: np.ndarray, palette: np.ndarray) -> np.ndarr
 class ColorQuantizer:
     """Handles color quantization using K-means clustering or unified palettes"""
 
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None,
+                 image_context: Optional[ImageContext] = None):
         """
         Initialize color quantizer
 
         Args:
             config: Configuration object
+            image_context: Shared per-job conversion cache
         """
         self.config = config or Config()
+        self.image_context = image_context or ImageContext()
         self.palette = None
-        self.quantized_image = None
         self.labels = None
         self.palette_manager = PaletteManager()
         self.color_names = []
+        self.palette_tree = None
+        self.clustering_metadata = None
+        self.cluster_model = None  # K-means clusters behind the palette, for quantize_with_palette
 
         # Enhanced color control parameters
         self.max_single_color_percentage = getattr(config, 'MAX_SINGLE_COLOR_PERCENTAGE', 40.0) if config else 40.0
@@ -187,16 +283,19 @@ class ColorQuantizer:
         self.vibrancy_boost = getattr(config, 'VIBRANCY_BOOST', 1.15) if config else 1.15
         self.simplify_background = getattr(config, 'SIMPLIFY_BACKGROUND', False) if config else False
 
+    @property
+    def quantized_image(self) -> Optional[np.ndarray]:
+        """RGB rendering of the current label map, materialized on demand"""
+        if self.palette is None or self.labels is None:
+            return None
+        return ensure_uint8(self.palette)[self.labels]
+
     def _prepare_for_clustering(self, image: np.ndarray) -> Tuple[np.ndarray, str]:
         """Convert image into selected color space for clustering."""
         color_space = getattr(self.config, "KMEANS_COLOR_SPACE", "rgb").lower()
 
-        if color_space == "lab":
-            cv2 = require_cv2()
-            converted = cv2.cvtColor(image, cv2.COLOR_RGB2LAB)
-        elif color_space == "hsv":
-            cv2 = require_cv2()
-            converted = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)
+        if color_space in ("lab", "hsv"):
+            converted = self.image_context.convert(image, color_space)
         else:
             converted = image
             color_space = "rgb"
@@ -222,17 +321,12 @@ class ColorQuantizer:
         """Convert inputs to the configured perceptual space for palette projection."""
         metric = getattr(self.config, "PALETTE_DISTANCE_METRIC", "lab").lower()
 
-        if metric == "lab":
-            cv2 = require_cv2()
-            image_space = cv2.cvtColor(image, cv2.COLOR_RGB2LAB).astype(np.float32)
-            palette_space = cv2.cvtColor(
-                palette.reshape(1, -1, 3).astype(np.uint8), cv2.COLOR_RGB2LAB
-            ).reshape(-1, 3).astype(np.float32)
-        elif metric == "hsv":
+        if metric in ("lab", "hsv"):
             cv2 = require_cv2()
-            image_space = cv2.cvtColor(image, cv2.COLOR_RGB2HSV).astype(np.float32)
+            code = cv2.COLOR_RGB2LAB if metric == "lab" else cv2.COLOR_RGB2HSV
+            image_space = self.image_context.convert(image, metric).astype(np.float32)
             palette_space = cv2.cvtColor(
-                palette.reshape(1, -1, 3).astype(np.uint8), cv2.COLOR_RGB2HSV
+                palette.reshape(1, -1, 3).astype(np.uint8), code
             ).reshape(-1, 3).astype(np.float32)
         else:
             image_space = image.astype(np.float32)
@@ -284,10 +378,15 @@ class ColorQuantizer:
         return avg_color.astype(np.uint8)
 
     def _detect_and_split_dominant_color(self, image: np.ndarray, palette: np.ndarray,
-                                         labels: np.ndarray, n_colors: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+                                         labels: np.ndarray, n_colors: int) -> Tuple[np.ndarray, np.ndarray]:
         """
         Detect if one color dominates too much of the image and split it.
 
+        All dominant colors are gathered in one pass over the labels. Dark
+        colors are split at their median brightness; others by a 2-cluster
+        K-means fitted on at most DOMINANT_SPLIT_SAMPLE_SIZE pixels, with
+        every member pixel then assigned to the nearer sub-center.
+
         Args:
             image: Original image
             palette: Current color palette
@@ -295,98 +394,125 @@ class ColorQuantizer:
             n_colors: Target number of colors
 
         Returns:
-            Tuple of (updated_palette, updated_labels, updated_quantized_image)
+            Tuple of (updated_palette, updated_labels)
         """
-        h, w = image.shape[:2]
-        total_pixels = h * w
+        total_pixels = labels.size
 
         # Calculate color percentages
-        unique, counts = np.unique(labels, return_counts=True)
+        counts = np.bincount(labels.ravel(), minlength=len(palette))
         percentages = (counts / total_pixels) * 100
 
         # Find if any color is too dominant
-        dominant_mask = percentages > self.max_single_color_percentage
+        dominant = np.flatnonzero(percentages > self.max_single_color_percentage)
 
-        if not np.any(dominant_mask):
+        if len(dominant) == 0:
             # No dominant colors, return unchanged
-            quantized = palette[labels].reshape(h, w, 3)
-            return palette, labels, quantized
+            return palette, labels
 
         logger.info(f"Detected dominant color(s) covering >{self.max_single_color_percentage}% of image")
 
-        # For each dominant color, try to split it
-        for idx in np.where(dominant_mask)[0]:
-            color_idx = unique[idx]
-            percentage = percentages[idx]
+        # Group member pixels of every dominant color with a single stable sort
+        flat_labels = labels.reshape(-1).copy()
+        flat_image = image.reshape(-1, 3)
+        is_dominant = np.zeros(len(palette), dtype=bool)
+        is_dominant[dominant] = True
+        members = np.flatnonzero(is_dominant[flat_labels])
+        members = members[np.argsort(flat_labels[members], kind='stable')]
+        groups = np.split(members, np.cumsum(counts[dominant])[:-1])
 
-            logger.info(f"  Color {color_idx} covers {percentage:.1f}% - splitting into 2 shades")
+        sample_size = getattr(self.config, 'DOMINANT_SPLIT_SAMPLE_SIZE', 20000)
+        rng = np.random.default_rng(42)
 
-            # Get pixels belonging to this color
-            color_mask = (labels == color_idx)
-            color_pixels_flat = image.reshape(-1, 3)[color_mask]
+        for color_idx, color_indices in zip(dominant, groups):
+            logger.info(f"  Color {color_idx} covers {percentages[color_idx]:.1f}% - splitting into 2 shades")
+
+            color_pixels_flat = flat_image[color_indices]
 
             # Check if this is a dark color (likely black issue)
             is_dark = np.mean(palette[color_idx]) < 60
 
             if is_dark:
                 # For dark colors, split into two shades by brightness
-                brightnesses = np.mean(color_pixels_flat, axis=1)
+                brightnesses = color_pixels_flat.mean(axis=1)
                 median_brightness = np.median(brightnesses)
-
-                # Create two clusters: darker and lighter
-                darker_mask = brightnesses <= median_brightness
                 lighter_mask = brightnesses > median_brightness
 
-                darker_pixels = color_pixels_flat[darker_mask]
-                lighter_pixels = color_pixels_flat[lighter_mask]
-
-                if len(darker_pixels) > 0 and len(lighter_pixels) > 0:
-                    color1 = np.mean(darker_pixels, axis=0).astype(np.uint8)
-                    color2 = np.mean(lighter_pixels, axis=0).astype(np.uint8)
-
-                    # Ensure they're visually distinct (at least 20 units apart)
-                    if np.linalg.norm(color1.astype(float) - color2.astype(float)) < 20:
-                        # Make them more distinct
-                        color1 = np.clip(color1 * 0.7, 0, 255).astype(np.uint8)
-                        color2 = np.clip(color2 * 1.3, 0, 255).astype(np.uint8)
-
-                    # Replace the dominant color with two colors
-                    palette[color_idx] = color1
-
-                    # Add new color if we have room
-                    if len(palette) < n_colors + 5:  # Allow some extra colors
-                        palette = np.vstack([palette, color2])
-                        # Reassign lighter pixels to new color
-                        color_mask_2d = labels.reshape(h, w) == color_idx
-                        image_brightnesses = np.mean(image, axis=2)
-                        light_mask_2d = image_brightnesses > median_brightness
-                        combined_mask = color_mask_2d & light_mask_2d
-                        labels_2d = labels.reshape(h, w)
-                        labels_2d[combined_mask] = len(palette) - 1
-                        labels = labels_2d.flatten()
+                if lighter_mask.all() or not lighter_mask.any():
+                    continue
+
+                color1 = color_pixels_flat[~lighter_mask].mean(axis=0).astype(np.uint8)
+                color2 = color_pixels_flat[lighter_mask].mean(axis=0).astype(np.uint8)
+
+                # Ensure they're visually distinct (at least 20 units apart)
+                if np.linalg.norm(color1.astype(float) - color2.astype(float)) < 20:
+                    # Make them more distinct
+                    color1 = np.clip(color1 * 0.7, 0, 255).astype(np.uint8)
+                    color2 = np.clip(color2 * 1.3, 0, 255).astype(np.uint8)
+
+                # Replace the dominant color with two colors
+                palette[color_idx] = color1
+                second_color, second_members = color2, lighter_mask
             else:
-                # For other colors, use K-means to split into 2 sub-clusters
-                if len(color_pixels_flat) > 100:
-                    kmeans = KMeans(n_clusters=2, random_state=42, n_init=3)
-                    sub_labels = kmeans.fit_predict(color_pixels_flat)
-                    sub_centers = kmeans.cluster_centers_.astype(np.uint8)
-
-                    # Replace original color and add new one
-                    palette[color_idx] = sub_centers[0]
-                    if len(palette) < n_colors + 5:
-                        palette = np.vstack([palette, sub_centers[1]])
-                        # Reassign pixels
-                        flat_labels = labels.copy()
-                        color_indices = np.where(color_mask)[0]
-                        for i, sub_label in enumerate(sub_labels):
-                            if sub_label == 1:
-                                flat_labels[color_indices[i]] = len(palette) - 1
-                        labels = flat_labels
-
-        # Recreate quantized image
-        quantized = palette[labels].reshape(h, w, 3)
+                # For other colors, use K-means on a bounded sample to split into 2 sub-clusters
+                if len(color_pixels_flat) <= 100:
+                    continue
+
+                sample = color_pixels_flat
+                if len(sample) > sample_size:
+                    sample = sample[rng.choice(len(sample), sample_size, replace=False)]
+
+                kmeans = KMeans(n_clusters=2, random_state=42, n_init=3)
+                kmeans.fit(sample.astype(np.float32))
+                sub_centers = kmeans.cluster_centers_.astype(np.float32)
+
+                # Replace original color and add new one
+                palette[color_idx] = sub_centers[0].astype(np.uint8)
+                second_color = sub_centers[1].astype(np.uint8)
+                second_members = assign_to_nearest(
+                    color_pixels_flat, sub_centers,
+                    memory_limit_mb=getattr(self.config, 'ASSIGNMENT_MEMORY_MB', None)
+                ) == 1
+
+            # Add new color if we have room
+            if len(palette) < n_colors + 5:  # Allow some extra colors
+                palette = np.vstack([palette, second_color])
+                flat_labels[color_indices[second_members]] = len(palette) - 1
+
+        return palette, flat_labels.reshape(labels.shape)
+
+    def _split_cluster_centers(self, clustering_image: np.ndarray, labels: np.ndarray,
+                               centers: np.ndarray, counts: np.ndarray, n_labels: int) -> np.ndarray:
+        """
+        Cluster centers after dominant-color splitting, in the clustering space
 
-        return palette, labels, quantized
+        Clusters the split left untouched keep their K-means center; split
+        clusters and the colors split off them get the mean of their members.
+
+        Args:
+            clustering_image: Image in the clustering color space
+            labels: Flat labels after splitting
+            centers: K-means centers (K, 3)
+            counts: Member count of each K-means cluster before splitting
+            n_labels: Palette size after splitting
+
+        Returns:
+            (n_labels, 3) float32 centers, NaN for labels without members
+        """
+        new_counts = np.bincount(labels, minlength=n_labels)
+        model_centers = np.full((n_labels, 3), np.nan, dtype=np.float32)
+        model_centers[:len(centers)] = centers
+
+        changed = np.ones(n_labels, dtype=bool)
+        changed[:len(counts)] = new_counts[:len(counts)] != counts
+        changed &= new_counts > 0
+        if changed.any():
+            pixels = clustering_image.reshape(-1, 3)
+            for channel in range(3):
+                sums = np.bincount(labels, weights=pixels[:, channel], minlength=n_labels)
+                model_centers[changed, channel] = sums[changed] / new_counts[changed]
+
+        model_centers[new_counts == 0] = np.nan
+        return model_centers
 
     def _enhance_vibrancy(self, image: np.ndarray) -> np.ndarray:
         """
@@ -398,22 +524,55 @@ class ColorQuantizer:
         Returns:
             Enhanced RGB image with boosted vibrancy
         """
-        if self.vibrancy_boost == 1.0:
+        stages = self.vibrancy_stages()
+        if not stages:
             return image
 
-        cv2 = require_cv2()
+        enhanced = self._grading_lut(stages).apply(image)
 
-        # Convert to HSV for saturation adjustment
-        hsv = cv2.cvtColor(image, cv2.COLOR_RGB2HSV).astype(np.float32)
+        logger.info(f"Enhanced color vibrancy by {self.vibrancy_boost}x")
+        return enhanced
 
-        # Boost saturation
-        hsv[:, :, 1] = np.clip(hsv[:, :, 1] * self.vibrancy_boost, 0, 255)
+    def vibrancy_stages(self) -> list:
+        """Vibrancy boost as (name, stage) pairs for a ColorGradingLUT."""
+        if self.vibrancy_boost == 1.0:
+            return []
+        return [("vibrancy", saturation_stage(self.vibrancy_boost))]
 
-        # Convert back to RGB
-        enhanced = cv2.cvtColor(hsv.astype(np.uint8), cv2.COLOR_HSV2RGB)
+    def color_style_stages(self) -> list:
+        """Saturation boost and warmth shift as (name, stage) pairs for a ColorGradingLUT."""
+        saturation_boost = getattr(self.config, 'SATURATION_BOOST', 1.0)
+        warmth_adjustment = getattr(self.config, 'WARMTH_ADJUSTMENT', 0)
 
-        logger.info(f"Enhanced color vibrancy by {self.vibrancy_boost}x")
-        return enhanced
+        stages = []
+        if saturation_boost != 1.0:
+            stages.append(("saturation", saturation_stage(saturation_boost)))
+        if warmth_adjustment != 0:
+            # Positive = warmer (more red/yellow), Negative = cooler (more blue)
+            stages.append(("warmth", warmth_stage(warmth_adjustment)))
+        return stages
+
+    def color_grading_stages(self, include_vibrancy: bool = True) -> list:
+        """
+        Per-pixel color stages this quantizer would apply, in order
+
+        Lets apply_color_style fold vibrancy into the color style LUT; callers
+        then pass ``apply_vibrancy=False`` to quantize.
+
+        Args:
+            include_vibrancy: Include the pre-quantization vibrancy boost
+
+        Returns:
+            List of (name, stage) pairs
+        """
+        stages = self.color_style_stages()
+        if include_vibrancy:
+            stages += self.vibrancy_stages()
+        return stages
+
+    def _grading_lut(self, stages: list) -> ColorGradingLUT:
+        """LUT for a list of stages at the configured lattice size."""
+        return ColorGradingLUT(size=getattr(self.config, 'COLOR_GRADING_LUT_SIZE', 33)).extend(stages)
 
     def _replace_pure_colors(self, palette: np.ndarray, image: np.ndarray, labels: np.ndarray) -> np.ndarray:
         """
@@ -638,16 +797,10 @@ class ColorQuantizer:
         adjusted_palette = lab_to_rgb(palette_lab)
 
         # Verify improvements
-        min_dist_before = float('inf')
-        min_dist_after = float('inf')
-
         palette_lab_orig = rgb_to_lab(palette)
-        for i in range(len(palette)):
-            for j in range(i + 1, len(palette)):
-                dist_before = delta_e_cie2000(palette_lab_orig[i], palette_lab_orig[j])
-                dist_after = delta_e_cie2000(palette_lab[i], palette_lab[j])
-                min_dist_before = min(min_dist_before, dist_before)
-                min_dist_after = min(min_dist_after, dist_after)
+        upper = np.triu_indices(len(palette), k=1)
+        min_dist_before = float(delta_e_cie2000_matrix(palette_lab_orig, palette_lab_orig)[upper].min())
+        min_dist_after = float(delta_e_cie2000_matrix(palette_lab, palette_lab)[upper].min())
 
         logger.info(f"Color separation: min distance {min_dist_before:.1f} → {min_dist_after:.1f} Delta E")
 
@@ -684,91 +837,199 @@ class ColorQuantizer:
 
         logger.info(f"Found {len(skin_color_indices)} skin tones and {len(dark_color_indices)} dark colors")
 
+        cv2 = require_cv2()
+        is_skin = np.zeros(len(palette), dtype=bool)
+        is_skin[skin_color_indices] = True
+
+        # Neighborhood of a component = its 5x5 dilation, so work on its bbox plus 2px
+        kernel = np.ones((5, 5), np.uint8)
+        pad = 2
+
         # For each dark color, check if it appears in small regions near skin tones
         for dark_idx in dark_color_indices:
             dark_mask = (labels_2d == dark_idx)
 
             # Find connected components of this dark color
-            cv2 = require_cv2()
             num_labels, components, stats, centroids = cv2.connectedComponentsWithStats(
-                dark_mask.astype(np.uint8), connectivity=8
+                dark_mask.view(np.uint8), connectivity=8
             )
 
-            # Check each dark region
-            for region_idx in range(1, num_labels):  # Skip background (0)
-                area = stats[region_idx, cv2.CC_STAT_AREA]
+            # Only small regions (< 200 pixels) are candidates for merging; skip background (0)
+            small = np.flatnonzero(stats[1:, cv2.CC_STAT_AREA] < 200) + 1
 
-                # If region is small (< 200 pixels), consider merging
-                if area < 200:
-                    # Get region mask
-                    region_mask = (components == region_idx)
+            for region_idx in small:
+                x, y, bw, bh, area = stats[region_idx]
 
-                    # Dilate to find neighboring colors
-                    kernel = np.ones((5, 5), np.uint8)
-                    dilated = cv2.dilate(region_mask.astype(np.uint8), kernel, iterations=1)
-                    neighbor_mask = dilated & ~region_mask
+                # Work inside the padded bounding box only
+                y0, y1 = max(0, y - pad), min(h, y + bh + pad)
+                x0, x1 = max(0, x - pad), min(w, x + bw + pad)
+                region_mask = components[y0:y1, x0:x1] == region_idx
 
-                    # Get neighboring color labels
-                    neighbor_labels = labels_2d[neighbor_mask]
-                    if len(neighbor_labels) == 0:
-                        continue
-
-                    # Find most common neighbor
-                    unique_neighbors, counts = np.unique(neighbor_labels, return_counts=True)
+                # Dilate to find neighboring colors
+                dilated = cv2.dilate(region_mask.view(np.uint8), kernel, iterations=1).view(bool)
+                neighbor_labels = labels_2d[y0:y1, x0:x1][dilated & ~region_mask]
+                if len(neighbor_labels) == 0:
+                    continue
 
-                    # Prefer skin tone neighbors
-                    skin_neighbors = [n for n in unique_neighbors if n in skin_color_indices]
+                # Prefer skin tone neighbors: merge into the most common one
+                neighbor_counts = np.bincount(neighbor_labels, minlength=len(palette))
+                neighbor_counts[~is_skin] = 0
 
-                    if skin_neighbors:
-                        # Merge into most common skin tone neighbor
-                        neighbor_counts = counts[[list(unique_neighbors).index(n) for n in skin_neighbors]]
-                        best_neighbor = skin_neighbors[np.argmax(neighbor_counts)]
+                if neighbor_counts.any():
+                    best_neighbor = int(np.argmax(neighbor_counts))
 
-                        logger.info(f"Merging small dark region ({area}px) into skin tone {best_neighbor}")
-                        labels_2d[region_mask] = best_neighbor
+                    logger.info(f"Merging small dark region ({area}px) into skin tone {best_neighbor}")
+                    labels_2d[y0:y1, x0:x1][region_mask] = best_neighbor
 
         return palette, labels_2d
 
-    def apply_color_style(self, image: np.ndarray) -> np.ndarray:
+    def apply_color_style(self, image: np.ndarray, include_vibrancy: bool = False) -> np.ndarray:
         """
         Apply color style adjustments (saturation boost, warmth adjustment)
         for Vintage and Pop-Art effects
 
         Args:
             image: Input RGB image
+            include_vibrancy: Apply the pre-quantization vibrancy boost in the
+                              same LUT pass
 
         Returns:
             Styled RGB image
         """
-        # Get style settings from config
-        saturation_boost = getattr(self.config, 'SATURATION_BOOST', 1.0)
-        warmth_adjustment = getattr(self.config, 'WARMTH_ADJUSTMENT', 0)
+        stages = self.color_grading_stages(include_vibrancy=include_vibrancy)
 
         # If no adjustments needed, return original
-        if saturation_boost == 1.0 and warmth_adjustment == 0:
+        if not stages:
             return image
 
-        cv2 = require_cv2()
-        styled = image.copy().astype(np.float32)
+        return self._grading_lut(stages).apply(image)
 
-        # Apply saturation boost (works in HSV space)
-        if saturation_boost != 1.0:
-            hsv = cv2.cvtColor(image, cv2.COLOR_RGB2HSV).astype(np.float32)
-            hsv[:, :, 1] = np.clip(hsv[:, :, 1] * saturation_boost, 0, 255)
-            styled = cv2.cvtColor(hsv.astype(np.uint8), cv2.COLOR_HSV2RGB).astype(np.float32)
+    def _fit_kmeans(self, samples: np.ndarray, n_colors: int, random_state: int,
+                    sample_weight: Optional[np.ndarray] = None):
+        """
+        Fit K-means with the configured engine and record run metadata
 
-        # Apply warmth adjustment (shift red/blue channels)
-        if warmth_adjustment != 0:
-            # Positive = warmer (more red/yellow), Negative = cooler (more blue)
-            styled[:, :, 0] = np.clip(styled[:, :, 0] + warmth_adjustment, 0, 255)  # Red
-            styled[:, :, 2] = np.clip(styled[:, :, 2] - warmth_adjustment * 0.5, 0, 255)  # Blue
+        'sklearn' runs all restarts inside one estimator; 'parallel' runs
+        seeded restarts in a thread pool and stops once inertia plateaus.
+        Sample sets large enough for MiniBatchKMeans always use one sklearn
+        fit, since its restarts are cheap initialization trials; a warning
+        is logged when that overrides 'parallel'.
+
+        Args:
+            samples: Training samples
+            n_colors: Number of clusters
+            random_state: Random state for reproducibility
+            sample_weight: Optional per-sample weights
+
+        Returns:
+            Fitted estimator
+        """
+        engine = getattr(self.config, 'KMEANS_ENGINE', 'sklearn').lower()
+
+        if engine == 'parallel' and len(samples) > MINIBATCH_THRESHOLD:
+            logger.warning(f"KMEANS_ENGINE='parallel' needs at most {MINIBATCH_THRESHOLD} samples, "
+                           f"got {len(samples)}; falling back to a single MiniBatchKMeans fit "
+                           f"(lower KMEANS_HISTOGRAM_BITS to shrink the histogram)")
+
+        if engine == 'parallel' and len(samples) <= MINIBATCH_THRESHOLD:
+            kmeans, metadata = fit_kmeans_restarts(
+                samples, n_colors, random_state,
+                sample_weight=sample_weight,
+                max_restarts=getattr(self.config, 'KMEANS_MAX_RESTARTS', 10),
+                batch_size=getattr(self.config, 'KMEANS_RESTART_BATCH', 4),
+                plateau_tolerance=getattr(self.config, 'KMEANS_PLATEAU_TOLERANCE', 1e-3),
+                max_workers=getattr(self.config, 'KMEANS_WORKERS', None)
+            )
+        else:
+            start = time.perf_counter()
+            kmeans = make_kmeans(len(samples), n_colors, random_state)
+            kmeans.fit(samples, sample_weight=sample_weight)
+            metadata = {
+                "engine": "sklearn",
+                "restarts_run": kmeans.n_init,
+                "max_restarts": kmeans.n_init,
+                "best_restart": None,
+                "iterations": [int(kmeans.n_iter_)],
+                "inertias": [float(kmeans.inertia_)],
+                "seconds": time.perf_counter() - start,
+            }
+
+        metadata["n_samples"] = len(samples)
+        self.clustering_metadata = metadata
+        logger.info(f"K-means ({metadata['engine']}): {metadata['restarts_run']} restarts "
+                    f"in {metadata['seconds']:.2f}s")
+        return kmeans
+
+    def _cluster_sampled_pixels(self, clustering_image: np.ndarray, n_colors: int,
+                                random_state: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fit K-means on a random pixel sample and predict every pixel
+
+        Args:
+            clustering_image: Image in the clustering color space
+            n_colors: Number of clusters
+            random_state: Random state for reproducibility
+
+        Returns:
+            Tuple of (flat labels, cluster centers)
+        """
+        pixels = clustering_image.reshape(-1, 3).astype(np.float32)
 
-        return styled.astype(np.uint8)
+        # Sample pixels if image is large for faster processing
+        n_pixels = len(pixels)
+        sample_size = int(n_pixels * self.config.COLOR_SAMPLE_FRACTION)
+
+        if sample_size < n_pixels:
+            # Random sampling
+            np.random.seed(random_state)
+            indices = np.random.choice(n_pixels, sample_size, replace=False)
+            sample_pixels = pixels[indices]
+        else:
+            sample_pixels = pixels
+
+        # Perform K-means clustering
+        logger.info(f"Performing K-means clustering with {n_colors} colors...")
+
+        kmeans = self._fit_kmeans(sample_pixels, n_colors, random_state)
+
+        # Predict labels for all pixels
+        labels = kmeans.predict(pixels)
+        return labels, kmeans.cluster_centers_.astype(np.float32)
+
+    def _cluster_color_histogram(self, clustering_image: np.ndarray, n_colors: int,
+                                 random_state: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fit weighted K-means on the histogram of distinct colors
+
+        The image is reduced to its distinct (optionally binned) colors, each
+        weighted by pixel count, so clustering cost depends on color content
+        rather than image size. Labels are mapped back through the inverse index.
+
+        Args:
+            clustering_image: uint8 image in the clustering color space
+            n_colors: Number of clusters
+            random_state: Random state for reproducibility
+
+        Returns:
+            Tuple of (flat labels, cluster centers)
+        """
+        bits = getattr(self.config, 'KMEANS_HISTOGRAM_BITS', 6)
+        colors, counts, inverse = build_color_histogram(ensure_uint8(clustering_image), bits=bits)
+
+        n_clusters = min(n_colors, len(colors))
+        logger.info(f"Performing weighted K-means with {n_clusters} colors "
+                    f"on {len(colors)} histogram bins...")
+
+        kmeans = self._fit_kmeans(colors, n_clusters, random_state, sample_weight=counts)
+
+        color_labels = kmeans.predict(colors)
+        return color_labels[inverse], kmeans.cluster_centers_.astype(np.float32)
 
     def quantize(self, image: np.ndarray, n_colors: int = None,
                  sort_palette: bool = True, random_state: int = 42,
                  use_unified_palette: Optional[bool] = None,
-                 palette_name: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+                 palette_name: Optional[str] = None,
+                 apply_vibrancy: bool = True) -> Tuple[np.ndarray, np.ndarray]:
         """
         Quantize image colors using K-means clustering or unified palette
 
@@ -779,6 +1040,8 @@ class ColorQuantizer:
             random_state: Random state for reproducibility
             use_unified_palette: Use predefined palette (overrides config)
             palette_name: Name of unified palette to use (overrides config)
+            apply_vibrancy: Boost vibrancy before K-means (False if it was
+                            already folded into preprocessing)
 
         Returns:
             Tuple of (quantized_image, color_palette)
@@ -805,51 +1068,27 @@ class ColorQuantizer:
         h, w = image.shape[:2]
 
         # ENHANCEMENT 1: Apply vibrancy boost before quantization
-        enhanced_image = self._enhance_vibrancy(image)
+        enhanced_image = self._enhance_vibrancy(image) if apply_vibrancy else image
 
         clustering_image, color_space = self._prepare_for_clustering(enhanced_image)
-        pixels = clustering_image.reshape(-1, 3).astype(np.float32)
-
-        # Sample pixels if image is large for faster processing
-        n_pixels = len(pixels)
-        sample_size = int(n_pixels * self.config.COLOR_SAMPLE_FRACTION)
-
-        if sample_size < n_pixels:
-            # Random sampling
-            np.random.seed(random_state)
-            indices = np.random.choice(n_pixels, sample_size, replace=False)
-            sample_pixels = pixels[indices]
-        else:
-            sample_pixels = pixels
 
-        # Perform K-means clustering
-        logger.info(f"Performing K-means clustering with {n_colors} colors...")
-
-        if len(sample_pixels) > 10000:
-            # Use MiniBatchKMeans for large datasets
-            kmeans = MiniBatchKMeans(
-                n_clusters=n_colors,
-                random_state=random_state,
-                batch_size=1024,
-                n_init=10,
-                max_iter=300
+        # The parallel engine only runs full-batch fits, which the sampled
+        # pixels are too many for, so it always clusters the histogram
+        use_histogram = (getattr(self.config, 'KMEANS_USE_HISTOGRAM', False)
+                         or getattr(self.config, 'KMEANS_ENGINE', 'sklearn').lower() == 'parallel')
+        if use_histogram:
+            labels, cluster_centers = self._cluster_color_histogram(
+                clustering_image, n_colors, random_state
             )
         else:
-            kmeans = KMeans(
-                n_clusters=n_colors,
-                random_state=random_state,
-                n_init=10,
-                max_iter=300
+            labels, cluster_centers = self._cluster_sampled_pixels(
+                clustering_image, n_colors, random_state
             )
-
-        kmeans.fit(sample_pixels)
-
-        # Predict labels for all pixels
-        labels = kmeans.predict(pixels)
+        # Dominant-color splitting below may add up to 5 colors
+        labels = labels.astype(compact_label_dtype(n_colors + 5))
         self.labels = labels.reshape(h, w)
 
         # Get color palette (cluster centers)
-        cluster_centers = kmeans.cluster_centers_.astype(np.float32)
         palette = self._restore_palette_to_rgb(cluster_centers, color_space)
         palette = ensure_uint8(palette)
 
@@ -857,9 +1096,13 @@ class ColorQuantizer:
         palette = self._replace_pure_colors(palette, enhanced_image, labels)
 
         # ENHANCEMENT 3: Detect and split dominant colors
-        palette, labels, quantized = self._detect_and_split_dominant_color(
+        cluster_counts = np.bincount(labels, minlength=len(palette))
+        palette, labels = self._detect_and_split_dominant_color(
             enhanced_image, palette, labels, n_colors
         )
+        model_centers = self._split_cluster_centers(
+            clustering_image, labels, cluster_centers, cluster_counts, len(palette)
+        )
 
         # ENHANCEMENT 4: Simplify background if enabled
         if self.simplify_background:
@@ -883,33 +1126,100 @@ class ColorQuantizer:
         self.labels = labels.reshape(h, w)
 
         # Sort palette by brightness if requested
+        old_to_new = np.arange(n_colors_actual).astype(self.labels.dtype)
         if sort_palette and n_colors_actual > 1:
-            # Create mapping from old to new labels
-            sorted_palette = sort_colors_by_brightness(palette)
-            old_to_new = np.zeros(n_colors_actual, dtype=int)
-
-            for new_idx, sorted_color in enumerate(sorted_palette):
-                # Find which old index this color came from
-                for old_idx, orig_color in enumerate(palette):
-                    if np.array_equal(sorted_color, orig_color):
-                        old_to_new[old_idx] = new_idx
-                        break
-
-            # Remap labels
-            labels_flat = self.labels.flatten()
-            labels_flat = np.array([old_to_new[label] if label < len(old_to_new) else label for label in labels_flat])
-            self.labels = labels_flat.reshape(h, w)
-            palette = sorted_palette
+            # Same ordering as sort_colors_by_brightness, remapped with one gather
+            luminance = 0.299 * palette[:, 0] + 0.587 * palette[:, 1] + 0.114 * palette[:, 2]
+            order = np.argsort(luminance)
+            old_to_new[order] = np.arange(n_colors_actual)
+
+            self.labels = old_to_new[self.labels]
+            palette = palette[order]
 
         self.palette = palette
 
+        # Palette adjustments above moved colors away from their clusters, so
+        # re-rendering this palette elsewhere (e.g. promoting a preview) has to
+        # predict the clusters rather than map to the nearest palette color
+        present = ~np.isnan(model_centers).any(axis=1)
+        self.cluster_model = {
+            "color_space": color_space,
+            "centers": model_centers[present],
+            "palette_index": old_to_new[present],
+        }
+
         # Create final quantized image
-        quantized = palette[self.labels.flatten()].reshape(h, w, 3)
-        self.quantized_image = ensure_uint8(quantized)
+        quantized = self.quantized_image
 
         logger.info(f"Color quantization complete: {len(palette)} colors (requested: {n_colors})")
         return quantized, palette
 
+    def build_palette_tree(self, image: np.ndarray) -> PaletteTree:
+        """
+        Build a palette tree that can later be cut at any color count
+
+        One tree serves every palette size between MIN_NUM_COLORS and
+        MAX_NUM_COLORS, so a color-count slider only needs quantize_from_tree.
+
+        Args:
+            image: Input image in RGB format
+
+        Returns:
+            The built PaletteTree (also stored on the quantizer)
+        """
+        enhanced_image = self._enhance_vibrancy(image)
+        clustering_image, color_space = self._prepare_for_clustering(enhanced_image)
+
+        logger.info(f"Building palette tree up to {self.config.MAX_NUM_COLORS} colors...")
+        tree = PaletteTree(max_colors=self.config.MAX_NUM_COLORS)
+        tree.build(ensure_uint8(clustering_image),
+                   bits=getattr(self.config, 'KMEANS_HISTOGRAM_BITS', 6),
+                   color_space=color_space)
+
+        self.palette_tree = tree
+        return tree
+
+    def quantize_from_tree(self, n_colors: int = None,
+                           sort_palette: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Quantize by cutting the palette tree built with build_palette_tree
+
+        Unlike quantize(), no palette post-processing (dominant color
+        splitting, minimum distance, skin clutter) is applied; this is the
+        fast path for previews at many color counts.
+
+        Args:
+            n_colors: Number of colors in palette (default from config)
+            sort_palette: Sort palette by brightness
+
+        Returns:
+            Tuple of (quantized_image, color_palette)
+        """
+        if self.palette_tree is None:
+            raise RuntimeError("build_palette_tree() must be called before quantize_from_tree()")
+
+        if n_colors is None:
+            n_colors = self.config.DEFAULT_NUM_COLORS
+        n_colors = max(self.config.MIN_NUM_COLORS,
+                      min(n_colors, self.config.MAX_NUM_COLORS))
+
+        centers, entry_labels = self.palette_tree.cut_histogram(n_colors)
+        palette = ensure_uint8(self._restore_palette_to_rgb(centers, self.palette_tree.color_space))
+
+        # Relabel on the histogram, before expanding to full resolution
+        if sort_palette and len(palette) > 1:
+            order = np.argsort(0.299 * palette[:, 0] + 0.587 * palette[:, 1] + 0.114 * palette[:, 2],
+                               kind='stable')
+            old_to_new = np.empty(len(order), dtype=entry_labels.dtype)
+            old_to_new[order] = np.arange(len(order))
+            entry_labels = old_to_new[entry_labels]
+            palette = palette[order]
+
+        self.labels = self.palette_tree.expand_labels(entry_labels, len(palette))
+        self.palette = palette
+
+        return self.quantized_image, palette
+
     def _quantize_with_unified_palette(self, image: np.ndarray,
                                       palette_name: str) -> Tuple[np.ndarray, np.ndarray]:
         """
@@ -926,33 +1236,82 @@ class ColorQuantizer:
 
         # Get the unified palette
         palette = ensure_uint8(self.palette_manager.get_palette(palette_name))
-        self.color_names = self.palette_manager.get_color_names(palette_name)
+        quantized, palette = self.quantize_with_palette(
+            image, palette, self.palette_manager.get_color_names(palette_name),
+            use_lut=getattr(self.config, 'PALETTE_LUT_ENABLED', False)
+        )
+
+        logger.info(f"Color quantization complete with unified palette: {len(palette)} colors")
+        return quantized, palette
+
+    def quantize_with_palette(self, image: np.ndarray, palette: np.ndarray,
+                              color_names: Optional[list] = None,
+                              use_lut: bool = False,
+                              cluster_model: Optional[dict] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map an image onto a fixed palette (no clustering)
+
+        Used for unified palettes and to re-render a preview's palette at
+        full resolution.
+
+        Args:
+            image: Input image in RGB format
+            palette: Palette (K, 3) RGB
+            color_names: Optional names for the palette colors
+            use_lut: Map through a cached RGB->label table (pays off for
+                     palettes reused across many images)
+            cluster_model: ``cluster_model`` of the quantize() run that made
+                           ``palette``; pixels are then assigned to its
+                           clusters (in its color space) instead of to the
+                           nearest palette color
+
+        Returns:
+            Tuple of (quantized_image, color_palette)
+        """
+        palette = ensure_uint8(palette)
+        self.color_names = list(color_names) if color_names else []
 
         # Apply the palette to the image
         h, w = image.shape[:2]
-        metric_image, metric_palette = self._convert_to_metric_space(image, palette)
-        pixels = metric_image.reshape(-1, 3)
-        palette_space = metric_palette
-
-        # Find nearest color for each pixel in perceptual space
         logger.info("Mapping pixels to nearest palette colors...")
-        diff = pixels[:, np.newaxis, :] - palette_space[np.newaxis, :, :]
-        distances = np.linalg.norm(diff, axis=2)
-        labels = np.argmin(distances, axis=1)
+
+        if cluster_model is not None:
+            # K-means palette: predict the clusters it was made from
+            color_space = cluster_model["color_space"]
+            if color_space in ("lab", "hsv"):
+                space_image = self.image_context.convert(image, color_space)
+            else:
+                space_image = ensure_uint8(image)
+            clusters = assign_to_nearest(
+                space_image.astype(np.float32), cluster_model["centers"],
+                memory_limit_mb=getattr(self.config, 'ASSIGNMENT_MEMORY_MB', None)
+            ).reshape(-1)
+            labels = cluster_model["palette_index"][clusters]
+        elif use_lut:
+            # Fixed palette: the mapping depends only on the RGB value, so use the cached table
+            metric = getattr(self.config, "PALETTE_DISTANCE_METRIC", "lab").lower()
+            lut = get_palette_lut(palette, metric, self.config)
+            labels = lut.apply(ensure_uint8(image)).reshape(-1)
+        else:
+            # Find nearest color for each pixel in perceptual space
+            metric_image, metric_palette = self._convert_to_metric_space(image, palette)
+            labels = assign_to_nearest(
+                metric_image, metric_palette,
+                memory_limit_mb=getattr(self.config, 'ASSIGNMENT_MEMORY_MB', None)
+            ).reshape(-1)
 
         self.labels = labels.reshape(h, w)
         self.palette = palette
+        self.cluster_model = cluster_model
 
         # Create quantized image
-        quantized = palette[labels].reshape(h, w, 3)
-        self.quantized_image = quantized
+        quantized = self.quantized_image
 
         # Filter out unused colors
         unique_labels = np.unique(labels)
         if len(unique_labels) < len(palette):
             logger.info(f"Using {len(unique_labels)} of {len(palette)} available colors")
 
-        logger.info(f"Color quantization complete with unified palette: {len(palette)} colors")
         return quantized, palette
 
     def get_color_counts(self) -> dict:
@@ -965,8 +1324,9 @@ class ColorQuantizer:
         if self.labels is None:
             raise ValueError("No quantization performed. Call quantize() first.")
 
-        unique, counts = np.unique(self.labels, return_counts=True)
-        return dict(zip(unique.tolist(), counts.tolist()))
+        counts = np.bincount(self.labels.ravel())
+        used = np.flatnonzero(counts)
+        return dict(zip(used.tolist(), counts[used].tolist()))
 
     def get_color_percentages(self) -> dict:
         """
@@ -1055,14 +1415,12 @@ class ColorQuantizer:
             Quantized image
         """
         h, w = image.shape[:2]
-        pixels = image.reshape(-1, 3).astype(np.float32)
 
-        # Find nearest color for each pixel
-        palette_float = palette.astype(np.float32)
-
-        # Calculate distances to all palette colors (vectorized)
-        distances = np.sqrt(((pixels[:, np.newaxis] - palette_float) ** 2).sum(axis=2))
-        labels = np.argmin(distances, axis=1)
+        # Find nearest color for each pixel (chunked, bounded memory)
+        labels = assign_to_nearest(
+            image, palette,
+            memory_limit_mb=getattr(self.config, 'ASSIGNMENT_MEMORY_MB', None)
+        )
 
         # Map pixels to palette colors
         quantized = palette[labels].reshape(h, w, 3)
@@ -1076,91 +1434,59 @@ class ColorQuantizer:
         target_percentages: np.ndarray,
         tolerance: float = 15.0,
         under_use_penalty: float = 5.0,
-        max_passes: int = 3
+        max_passes: int = 50
     ) -> Tuple[np.ndarray, np.ndarray]:
         """
         Advanced quantization with target percentage enforcement.
         Prevents color collapse and ensures balanced palette usage.
 
+        Works on the histogram of distinct image colors: ΔE2000 to every palette
+        color is computed once, then per-color prices are adjusted until usage
+        settles inside the tolerance band (see ``balanced_assignment``).
+
         Args:
             image: Input image in RGB format
             palette: Color palette (N, 3) in RGB
             target_percentages: Target percentage for each color (N,)
             tolerance: Tolerance for deviation from target (%)
             under_use_penalty: Penalty multiplier for under-used colors (bonus to favor them)
-            max_passes: Number of refinement passes
+            max_passes: Maximum number of price-adjustment passes
 
         Returns:
             Tuple of (quantized_image, labels)
         """
         h, w = image.shape[:2]
-        total_pixels = h * w
+        palette = ensure_uint8(np.asarray(palette))
 
-        # Convert image and palette to LAB for perceptual matching
-        logger.info("Converting to LAB color space for perceptual quantization...")
-        image_lab = rgb_to_lab(image)
-        palette_lab = rgb_to_lab(palette)
+        # Distinct colors only - cost no longer scales with image size
+        colors, counts, inverse = build_color_histogram(ensure_uint8(image))
+        logger.info(f"Balancing {len(colors)} distinct colors across {len(palette)} palette colors...")
 
-        # Flatten image
-        pixels_lab = image_lab.reshape(-1, 3)
-
-        # Initialize tracking
-        current_counts = np.zeros(len(palette), dtype=int)
-        assignments = np.full(total_pixels, -1, dtype=int)
-
-        logger.info(f"Performing {max_passes}-pass quantization with target percentages...")
-
-        for pass_idx in range(max_passes):
-            for i in range(total_pixels):
-                # Skip already assigned pixels in early passes
-                if assignments[i] >= 0 and pass_idx < max_passes - 1:
-                    continue
-
-                pixel_lab = pixels_lab[i]
-                best_idx = -1
-                best_score = float('inf')
-
-                for p in range(len(palette)):
-                    # Calculate perceptual color difference (CIEDE2000)
-                    delta_e = delta_e_cie2000(pixel_lab, palette_lab[p])
-
-                    # Calculate penalty/bonus based on target deviation
-                    current_percent = (current_counts[p] / total_pixels) * 100
-                    deviation = current_percent - target_percentages[p]
-
-                    penalty = 0.0
-                    if deviation > tolerance:
-                        # Over target: strong penalty to push pixels away
-                        penalty = deviation * 10.0
-                    elif deviation < -tolerance:
-                        # Under target: negative penalty (bonus) to favor this color
-                        penalty = deviation * under_use_penalty
-
-                    score = delta_e + penalty
+        # Perceptual cost matrix (distinct colors × palette)
+        colors_lab = self.image_context.lab(colors).astype(np.float32)
+        palette_lab = rgb_to_lab(palette)
+        cost = delta_e_cie2000_matrix(
+            colors_lab, palette_lab,
+            memory_limit_mb=getattr(self.config, 'ASSIGNMENT_MEMORY_MB', None)
+        )
 
-                    if score < best_score:
-                        best_score = score
-                        best_idx = p
+        color_labels, final_percentages, passes = balanced_assignment(
+            cost, counts, target_percentages,
+            tolerance=tolerance,
+            under_use_penalty=under_use_penalty,
+            max_rounds=max_passes
+        )
+        logger.info(f"Target percentage balancing finished after {passes} passes")
 
-                # Update assignment
-                if assignments[i] >= 0:
-                    current_counts[assignments[i]] -= 1
-                assignments[i] = best_idx
-                current_counts[best_idx] += 1
+        labels = color_labels.astype(compact_label_dtype(len(palette)))[inverse].reshape(h, w)
 
-            # Log progress
-            actual_percentages = (current_counts / total_pixels) * 100
-            logger.info(f"Pass {pass_idx + 1}/{max_passes} complete. Color usage: " +
-                       f"{', '.join([f'{p:.1f}%' for p in actual_percentages])}")
+        self.labels = labels
+        self.palette = palette
 
         # Create quantized image
-        quantized = palette[assignments].reshape(h, w, 3)
-        self.quantized_image = ensure_uint8(quantized)
-        self.labels = assignments.reshape(h, w)
-        self.palette = palette
+        quantized = self.quantized_image
 
         # Log final statistics
-        final_percentages = (current_counts / total_pixels) * 100
         logger.info("Target percentage enforcement complete:")
         for i, (target, actual) in enumerate(zip(target_percentages, final_percentages)):
             diff = actual - target
@@ -120,16 +120,16 @@ class DiagnosticsCalculator:
         proc_h, proc_w = processed_image.shape[:2]
         total_pixels = proc_h * proc_w
 
-        # Color metrics
-        unique_labels = np.unique(labels)
+        # Color metrics (one counting pass over the label map)
+        label_counts = np.bincount(np.asarray(labels).ravel())
+        unique_labels = np.flatnonzero(label_counts)
         colors_used = len(unique_labels)
         colors_unused = len(palette) - colors_used
 
         # Palette coverage
         palette_coverage = {}
         for label in unique_labels:
-            count = np.sum(labels == label)
-            percentage = (count / total_pixels) * 100
+            percentage = (label_counts[label] / total_pixels) * 100
             palette_coverage[int(label)] = float(percentage)
 
         # Region metrics
@@ -0,0 +1,172 @@
+"""
+Image Context Module - Per-job cache of color-space conversions and proxies
+"""
+
+import numpy as np
+from collections import Counter
+from typing import Dict, Hashable, Tuple
+
+try:
+    from paint_by_numbers.utils.opencv import require_cv2
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from utils.opencv import require_cv2
+
+
+# Spaces convert() understands
+COLOR_SPACES = ("lab", "hsv", "gray")
+
+
+class ImageContext:
+    """
+    Lazily computed, memoized representations of the images in one job.
+
+    Pipeline stages ask the context for Lab/HSV/gray versions (and
+    downsampled proxies) of an image instead of calling ``cv2.cvtColor``
+    themselves, so each conversion of a given array happens once per job.
+    Only image-sized inputs (frames, proxies, color histograms) go through
+    the context; single colors, palettes, noise-estimation patches and LUT
+    lattices are converted directly, so ``conversion_counts`` reflects
+    per-frame work.
+    Entries are keyed by array identity and a per-array version; call
+    ``invalidate`` after modifying an array in place. Cached arrays are
+    returned read-only.
+
+    Two encodings are available: the default 8-bit OpenCV encoding (Lab
+    scaled to 0-255, hue 0-179), and ``precise=True``, which converts from
+    float RGB in [0, 1] (L 0-100, hue in degrees, S/V in 0-1).
+    """
+
+    def __init__(self):
+        """Initialize an empty context"""
+        self._entries: Dict[Tuple, Tuple[np.ndarray, np.ndarray]] = {}
+        self._versions: Dict[int, int] = {}
+        self.conversion_counts: Counter = Counter()
+        self.hits = 0
+
+    def _lookup(self, image: np.ndarray, key: Hashable):
+        """Cached result for ``key`` on ``image``, or None."""
+        entry = self._entries.get((id(image), self._versions.get(id(image), 0), key))
+        # The stored source guards against a recycled id()
+        if entry is not None and entry[0] is image:
+            self.hits += 1
+            return entry[1]
+        return None
+
+    def _store(self, image: np.ndarray, key: Hashable, value: np.ndarray) -> np.ndarray:
+        """Cache ``value`` as the result for ``key`` on ``image``."""
+        value.flags.writeable = False
+        self._entries[(id(image), self._versions.get(id(image), 0), key)] = (image, value)
+        return value
+
+    def convert(self, image: np.ndarray, space: str, precise: bool = False) -> np.ndarray:
+        """
+        RGB image (or (N, 3) pixel array) converted to another color space
+
+        Args:
+            image: RGB values (..., 3)
+            space: 'lab', 'hsv' or 'gray'
+            precise: Convert from float RGB instead of the 8-bit encoding
+
+        Returns:
+            Converted array (read-only); gray drops the channel axis
+        """
+        space = space.lower()
+        if space not in COLOR_SPACES:
+            raise ValueError(f"Unknown color space '{space}', expected one of {COLOR_SPACES}")
+
+        key = (space, precise)
+        cached = self._lookup(image, key)
+        if cached is not None:
+            return cached
+
+        cv2 = require_cv2()
+        code = {
+            "lab": cv2.COLOR_RGB2LAB,
+            "hsv": cv2.COLOR_RGB2HSV,
+            "gray": cv2.COLOR_RGB2GRAY,
+        }[space]
+
+        shape = image.shape
+        if precise:
+            source = np.asarray(image, dtype=np.float32) / 255.0
+        else:
+            source = np.ascontiguousarray(image, dtype=np.uint8)
+        # cvtColor wants an image; view pixel lists as a single column
+        converted = cv2.cvtColor(source.reshape(-1, 1, 3) if len(shape) == 2 else source, code)
+        converted = converted.reshape(shape[:-1] if space == "gray" else shape)
+
+        self.conversion_counts[f"{space}{'_precise' if precise else ''}"] += 1
+        return self._store(image, key, converted)
+
+    def lab(self, image: np.ndarray, precise: bool = False) -> np.ndarray:
+        """Lab version of an RGB image."""
+        return self.convert(image, "lab", precise)
+
+    def hsv(self, image: np.ndarray, precise: bool = False) -> np.ndarray:
+        """HSV version of an RGB image."""
+        return self.convert(image, "hsv", precise)
+
+    def gray(self, image: np.ndarray) -> np.ndarray:
+        """Grayscale version of an RGB image."""
+        return self.convert(image, "gray")
+
+    def proxy(self, image: np.ndarray, step: int) -> np.ndarray:
+        """
+        Strided downsample keeping every ``step``-th row and column
+
+        The proxy is itself cached, so conversions of it are shared too.
+
+        Args:
+            image: Image (H, W, ...)
+            step: Stride in both directions
+
+        Returns:
+            Downsampled view (read-only)
+        """
+        step = max(1, int(step))
+        if step == 1:
+            return image
+
+        key = ("proxy", step)
+        cached = self._lookup(image, key)
+        if cached is not None:
+            return cached
+
+        self.conversion_counts[f"proxy_{step}"] += 1
+        return self._store(image, key, image[::step, ::step])
+
+    def invalidate(self, image: np.ndarray):
+        """
+        Mark an array as modified so its cached conversions are recomputed
+
+        Args:
+            image: Array that was changed in place
+        """
+        image_id = id(image)
+        self._versions[image_id] = self._versions.get(image_id, 0) + 1
+        self._entries = {key: entry for key, entry in self._entries.items()
+                         if key[0] != image_id}
+
+    def clear(self):
+        """Drop every cached entry and reset the counters (start of a new job)."""
+        self._entries.clear()
+        self._versions.clear()
+        self.conversion_counts.clear()
+        self.hits = 0
+
+    def get_statistics(self) -> dict:
+        """
+        Conversion counts for the current job
+
+        Returns:
+            Dictionary with per-space conversion counts, cache hits and
+            the number of cached entries
+        """
+        return {
+            'conversions': dict(self.conversion_counts),
+            'cache_hits': self.hits,
+            'cached_entries': len(self._entries),
+        }
@@ -9,83 +9,170 @@ from pathlib import Path
 # Handle imports for both package and script usage
 try:
     from paint_by_numbers.config import Config
-    from paint_by_numbers.utils.helpers import resize_image, ensure_uint8
+    from paint_by_numbers.utils.helpers import resize_image, ensure_uint8, majority_filter_labels
     from paint_by_numbers.logger import logger
     from paint_by_numbers.utils.opencv import require_cv2
     from paint_by_numbers.core.intelligent_upscaler import IntelligentUpscaler
+    from paint_by_numbers.core.color_assignment import build_color_histogram
+    from paint_by_numbers.core.resolution_planner import plan_resolution, apply_resolution_plan
+    from paint_by_numbers.core.color_grading import (
+        ColorGradingLUT, white_balance_stage, tone_curve_stage, tone_gamma, mean_lightness, sample_pixels
+    )
+    from paint_by_numbers.core.tiled_preprocess import (
+        spatial_filter_specs, apply_spatial_filters, apply_spatial_filters_tiled
+    )
+    from paint_by_numbers.core.image_context import ImageContext
 except ImportError:
     import sys
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent.parent))
     from config import Config
-    from utils.helpers import resize_image, ensure_uint8
+    from utils.helpers import resize_image, ensure_uint8, majority_filter_labels
     from logger import logger
     from utils.opencv import require_cv2
     from core.intelligent_upscaler import IntelligentUpscaler
+    from core.color_assignment import build_color_histogram
+    from core.resolution_planner import plan_resolution, apply_resolution_plan
+    from core.color_grading import (
+        ColorGradingLUT, white_balance_stage, tone_curve_stage, tone_gamma, mean_lightness, sample_pixels
+    )
+    from core.tiled_preprocess import (
+        spatial_filter_specs, apply_spatial_filters, apply_spatial_filters_tiled
+    )
+    from core.image_context import ImageContext
 
 
 class ImageProcessor:
     """Handles image loading, validation, and preprocessing"""
 
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None,
+                 image_context: Optional[ImageContext] = None):
         """
         Initialize image processor
 
         Args:
             config: Configuration object
+            image_context: Shared per-job conversion cache
         """
         self.config = config or Config()
+        self.image_context = image_context or ImageContext()
         self.original_image = None
         self.processed_image = None
         self.upscaler = IntelligentUpscaler(target_format='ultra_hd')
         self.upscale_metadata = None
+        self.resolution_plan = None
+        self.decode_reduction = 1
+        self.denoise_metadata = None
 
-    def _apply_white_balance(self, image: np.ndarray) -> np.ndarray:
-        """Apply simple gray-world white balance with optional clipping."""
-        if not getattr(self.config, "AUTO_WHITE_BALANCE", False):
-            return image
+    def build_color_grading(self, image: np.ndarray) -> ColorGradingLUT:
+        """
+        Compile this job's white and tone balance into one 3D LUT
 
-        clip = float(getattr(self.config, "WHITE_BALANCE_CLIP", 0.0))
-        float_img = image.astype(np.float32)
+        Gray-world white balance and tone balance are measured on ``image``
+        and chained, so both corrections cost a single pass over the frame.
 
-        if clip > 0:
-            lower = np.percentile(float_img, clip * 100, axis=(0, 1))
-            upper = np.percentile(float_img, (1.0 - clip) * 100, axis=(0, 1))
-            float_img = np.clip(float_img, lower, upper)
+        Args:
+            image: uint8 RGB image the corrections are measured on
 
-        avg_rgb = float_img.reshape(-1, 3).mean(axis=0)
-        mean_gray = np.mean(avg_rgb)
-        scale = mean_gray / np.maximum(avg_rgb, 1e-6)
-        balanced = float_img * scale
-        return np.clip(balanced, 0, 255).astype(np.uint8)
+        Returns:
+            ColorGradingLUT (identity if nothing is enabled)
+        """
+        lut = ColorGradingLUT(size=getattr(self.config, "COLOR_GRADING_LUT_SIZE", 33))
 
-    def _apply_tone_balance(self, image: np.ndarray) -> np.ndarray:
-        """Normalize image luminance towards configured target."""
-        if not getattr(self.config, "APPLY_TONE_BALANCE", False):
-            return image
+        if getattr(self.config, "AUTO_WHITE_BALANCE", False):
+            clip = float(getattr(self.config, "WHITE_BALANCE_CLIP", 0.0))
+            lut.add("white_balance", white_balance_stage(image, clip))
+
+        if getattr(self.config, "APPLY_TONE_BALANCE", False):
+            target = float(getattr(self.config, "TONE_BALANCE_TARGET", 0.55))
+            target = np.clip(target, 0.05, 0.95)
+
+            # Measured after white balance, on a regular sample of the frame
+            mean_l = mean_lightness(lut.transform(sample_pixels(image)))
+            gamma = tone_gamma(mean_l, target)
+            if gamma is not None:
+                lut.add("tone_balance", tone_curve_stage(gamma))
+
+        return lut
+
+    def estimate_noise(self, image: np.ndarray, patch_size: int = 64, max_patches: int = 256) -> float:
+        """
+        Estimate the standard deviation of additive noise in an image
+
+        Applies Immerkær's 3x3 Laplacian-difference kernel, which cancels
+        smooth gradients, to the gray levels of a grid of full-resolution
+        patches (so the proxy neither averages noise away nor aliases edges
+        into it). The median absolute residual is robust to the edges that do
+        remain.
+
+        Args:
+            image: uint8 RGB image
+            patch_size: Edge length of each sampled patch
+            max_patches: Upper bound on sampled patches
 
+        Returns:
+            Estimated noise sigma in gray levels
+        """
         cv2 = require_cv2()
-        target = float(getattr(self.config, "TONE_BALANCE_TARGET", 0.55))
-        target = np.clip(target, 0.05, 0.95)
+        h, w = image.shape[:2]
+        patch = min(patch_size, h, w)
+        per_side = max(1, int(np.sqrt(max_patches)))
+        ys = np.linspace(0, h - patch, min(per_side, max(1, h // patch))).astype(int)
+        xs = np.linspace(0, w - patch, min(per_side, max(1, w // patch))).astype(int)
+
+        kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+        residuals = []
+        for y in ys:
+            for x in xs:
+                gray = cv2.cvtColor(image[y:y + patch, x:x + patch], cv2.COLOR_RGB2GRAY)
+                residual = cv2.filter2D(gray.astype(np.float32), -1, kernel)
+                residuals.append(residual[1:-1, 1:-1].ravel())
+
+        residual = np.concatenate(residuals)
+        # MAD -> sigma for Gaussian noise; the kernel's L2 norm is 6
+        return float(1.4826 * np.median(np.abs(residual)) / 6.0)
+
+    def _select_denoise(self, image: np.ndarray) -> str:
+        """
+        Choose the denoise branch for an image and record it in denoise_metadata
 
-        lab = cv2.cvtColor(image, cv2.COLOR_RGB2LAB).astype(np.float32)
-        l_channel = lab[:, :, 0] / 255.0
-        mean_l = float(np.mean(l_channel))
+        Args:
+            image: uint8 RGB image about to be filtered
 
-        if mean_l <= 1e-3:
-            return image
+        Returns:
+            'skip', 'bilateral' or 'nlm'
+        """
+        if not getattr(self.config, "APPLY_DENOISE", False):
+            self.denoise_metadata = {"branch": "skip", "noise_sigma": None, "adaptive": False}
+            return "skip"
+
+        if not getattr(self.config, "ADAPTIVE_DENOISE", False):
+            self.denoise_metadata = {"branch": "nlm", "noise_sigma": None, "adaptive": False}
+            return "nlm"
+
+        sigma = self.estimate_noise(image)
+        if sigma < float(getattr(self.config, "DENOISE_SKIP_SIGMA", 2.0)):
+            branch = "skip"
+        elif sigma < float(getattr(self.config, "DENOISE_NLM_SIGMA", 5.0)):
+            branch = "bilateral"
+        else:
+            branch = "nlm"
 
-        denominator = np.log(max(mean_l, 1e-3))
-        if abs(denominator) < 1e-6:
-            return image
+        self.denoise_metadata = {"branch": branch, "noise_sigma": sigma, "adaptive": True}
+        logger.info(f"Estimated noise sigma {sigma:.2f}: denoise branch '{branch}'")
+        return branch
 
-        gamma = np.log(target) / denominator
-        # Stabilize extremes to prevent NaNs
-        l_channel = np.power(np.clip(l_channel, 1e-4, 1.0), gamma)
-        lab[:, :, 0] = np.clip(l_channel * 255.0, 0, 255)
+    def _apply_spatial_filters(self, image: np.ndarray, specs: list) -> np.ndarray:
+        """Run denoise/blur/bilateral, over parallel tiles for large frames when enabled."""
+        h, w = image.shape[:2]
+        min_pixels = int(getattr(self.config, "TILED_PREPROCESS_MIN_PIXELS", 4_000_000))
+        if not specs or not getattr(self.config, "TILED_PREPROCESS", False) or h * w < min_pixels:
+            return apply_spatial_filters(image, specs)
 
-        balanced = cv2.cvtColor(lab.astype(np.uint8), cv2.COLOR_LAB2RGB)
-        return balanced
+        tile_size = int(getattr(self.config, "PREPROCESS_TILE_SIZE", 1024))
+        workers = getattr(self.config, "PREPROCESS_WORKERS", None)
+        logger.info(f"Tiled preprocessing: {w}x{h} in {tile_size}px tiles")
+        return apply_spatial_filters_tiled(image, specs, tile_size=tile_size, max_workers=workers)
 
     def _apply_local_contrast(self, image: np.ndarray) -> np.ndarray:
         """Enhance local contrast using CLAHE in LAB space."""
@@ -95,7 +182,7 @@ class ImageProcessor:
         cv2 = require_cv2()
         clip_limit = float(getattr(self.config, "CLAHE_CLIP_LIMIT", 2.0))
         tile_grid = getattr(self.config, "CLAHE_TILE_GRID_SIZE", (8, 8))
-        lab = cv2.cvtColor(image, cv2.COLOR_RGB2LAB)
+        lab = self.image_context.lab(image)
         l_channel, a_channel, b_channel = cv2.split(lab)
 
         clahe = cv2.createCLAHE(clipLimit=max(0.1, clip_limit),
@@ -119,15 +206,111 @@ class ImageProcessor:
         sharpened = cv2.addWeighted(image, 1.0 + amount, blurred, -amount, 0)
         return np.clip(sharpened, 0, 255).astype(np.uint8)
 
-    def load_image(self, image_path: str) -> np.ndarray:
+    def _read_image_header(self, path: Path) -> Optional[Tuple[int, int, str]]:
+        """
+        Read image dimensions without decoding pixel data
+
+        Args:
+            path: Image file path
+
+        Returns:
+            Tuple of (width, height, format name) as displayed after EXIF
+            rotation, or None if the header could not be read
+        """
+        try:
+            from PIL import Image
+        except ImportError:
+            return None
+
+        try:
+            with Image.open(path) as img:
+                width, height = img.size
+                image_format = img.format or ""
+                orientation = img.getexif().get(0x0112, 1)
+        except Exception:
+            # Let OpenCV decide whether the file is readable
+            return None
+
+        # imread applies EXIF orientation; tags 5-8 swap the axes
+        if orientation in (5, 6, 7, 8):
+            width, height = height, width
+        return width, height, image_format
+
+    def _validate_dimensions(self, w: int, h: int):
+        """
+        Reject images too small for good results or too large to process
+
+        Args:
+            w: Image width
+            h: Image height
+
+        Raises:
+            ValueError: If image is too small or too large
+        """
+        # Check minimum size
+        min_w, min_h = self.config.MIN_IMAGE_SIZE
+        if h < min_h or w < min_w:
+            raise ValueError(
+                f"Image too small. Minimum size is {min_w}x{min_h}, "
+                f"got {w}x{h}"
+            )
+
+        # Check maximum size to prevent memory issues
+        max_dimension = getattr(self.config, "MAX_IMAGE_DIMENSION", 10000)
+        if h > max_dimension or w > max_dimension:
+            raise ValueError(
+                f"Image dimensions too large: {w}x{h}. "
+                f"Maximum dimension is {max_dimension} pixels. "
+                f"Please resize your image or use streaming mode (--streaming)."
+            )
+
+        # Estimate memory usage (3 bytes per pixel for RGB)
+        estimated_memory_mb = (w * h * 3) / (1024 * 1024)
+        if estimated_memory_mb > 300:  # 300MB limit for single image
+            logger.warning(
+                f"Large image detected ({w}x{h}, ~{estimated_memory_mb:.1f}MB). "
+                f"Processing may be slow or fail on systems with limited memory."
+            )
+
+    def _decode_reduction(self, width: int, height: int, image_format: str, paper_format=None) -> int:
+        """
+        Pick the largest JPEG DCT scaling factor that still covers the working size
+
+        Args:
+            width: Full-resolution width from the header
+            height: Full-resolution height from the header
+            image_format: Format name from the header
+            paper_format: Optional PaperFormat the image will be fitted into
+
+        Returns:
+            1, 2, 4 or 8
+        """
+        if image_format != "JPEG" or not getattr(self.config, "REDUCED_JPEG_DECODE", True):
+            return 1
+
+        plan = plan_resolution((width, height), self.config.MAX_IMAGE_SIZE,
+                               paper_format=paper_format, upscaler=self.upscaler)
+        content_w, content_h = plan.content_size
+        for factor in (8, 4, 2):
+            # Reduced decodes round up, so floor division is the safe bound
+            if width // factor >= content_w and height // factor >= content_h:
+                return factor
+        return 1
+
+    def load_image(self, image_path: str, paper_format=None) -> np.ndarray:
         """
         Load and validate image from file
 
+        The image is brought to its final working resolution here, in a
+        single resample planned from the source size, the paper format and
+        ``MAX_IMAGE_SIZE`` (see ``core.resolution_planner``).
+
         Args:
             image_path: Path to image file
+            paper_format: Optional PaperFormat to fit the image into (with borders)
 
         Returns:
-            Loaded image in RGB format
+            Loaded image in RGB format at working resolution
 
         Raises:
             FileNotFoundError: If image file doesn't exist
@@ -159,9 +342,25 @@ class ImageProcessor:
 
         cv2 = require_cv2()
 
+        # Validate dimensions from the header before decoding any pixels
+        header = self._read_image_header(path)
+        reduction = 1
+        if header is not None:
+            header_w, header_h, image_format = header
+            self._validate_dimensions(header_w, header_h)
+            reduction = self._decode_reduction(header_w, header_h, image_format, paper_format)
+
+        # libjpeg can decode straight to 1/2, 1/4 or 1/8 scale via DCT scaling
+        flags = {
+            1: cv2.IMREAD_COLOR,
+            2: cv2.IMREAD_REDUCED_COLOR_2,
+            4: cv2.IMREAD_REDUCED_COLOR_4,
+            8: cv2.IMREAD_REDUCED_COLOR_8,
+        }[reduction]
+
         # Load image with error handling
         try:
-            image = cv2.imread(str(path))
+            image = cv2.imread(str(path), flags)
         except Exception as e:
             raise ValueError(f"Failed to read image file: {e}")
 
@@ -169,33 +368,12 @@ class ImageProcessor:
             raise ValueError(f"Failed to load image: {image_path}. "
                            f"This may not be a valid image file or the format is not supported.")
 
-        # Validate image dimensions
         h, w = image.shape[:2]
-
-        # Check minimum size
-        min_w, min_h = self.config.MIN_IMAGE_SIZE
-        if h < min_h or w < min_w:
-            raise ValueError(
-                f"Image too small. Minimum size is {min_w}x{min_h}, "
-                f"got {w}x{h}"
-            )
-
-        # Check maximum size to prevent memory issues
-        MAX_DIMENSION = 10000  # 10k pixels per dimension
-        if h > MAX_DIMENSION or w > MAX_DIMENSION:
-            raise ValueError(
-                f"Image dimensions too large: {w}x{h}. "
-                f"Maximum dimension is {MAX_DIMENSION} pixels. "
-                f"Please resize your image before processing."
-            )
-
-        # Estimate memory usage (3 bytes per pixel for RGB)
-        estimated_memory_mb = (w * h * 3) / (1024 * 1024)
-        if estimated_memory_mb > 300:  # 300MB limit for single image
-            logger.warning(
-                f"Large image detected ({w}x{h}, ~{estimated_memory_mb:.1f}MB). "
-                f"Processing may be slow or fail on systems with limited memory."
-            )
+        self.decode_reduction = reduction
+        if header is None:
+            self._validate_dimensions(w, h)
+        elif reduction > 1:
+            logger.info(f"Decoded {header_w}x{header_h} JPEG at 1/{reduction} scale: {w}x{h}")
 
         # Convert BGR to RGB with error handling
         try:
@@ -203,33 +381,72 @@ class ImageProcessor:
         except cv2.error as e:
             raise ValueError(f"Failed to convert image color space: {e}")
 
+        if reduction == 1:
+            logger.info(f"Successfully loaded image: {w}x{h} pixels")
+
+        image = self.fit_to_working_resolution(image, paper_format)
         self.original_image = image
-        logger.info(f"Successfully loaded image: {w}x{h} pixels")
+        return image
 
-        # ========================================
-        # INTELLIGENT UPSCALING FOR BEST QUALITY
-        # ========================================
-        # Automatically upscale small images for crystal-clear results
-        upscaled_image, upscale_info = self.upscaler.process(image, force_upscale=False)
+    def fit_to_working_resolution(self, image: np.ndarray, paper_format=None) -> np.ndarray:
+        """
+        Resample an image once to the resolution the pipeline will work at
+
+        Small images are still enlarged by the intelligent upscaler's rules,
+        but only as far as ``MAX_IMAGE_SIZE`` allows, and its sharpening and
+        denoising run on the final pixels rather than on an ultra-HD
+        intermediate that would be thrown away by the next downscale.
+
+        Args:
+            image: Source RGB image
+            paper_format: Optional PaperFormat to fit the image into (with borders)
 
-        if upscale_info['was_upscaled']:
-            self.upscale_metadata = upscale_info
+        Returns:
+            Working image
+        """
+        h, w = image.shape[:2]
+        plan = plan_resolution((w, h), self.config.MAX_IMAGE_SIZE,
+                               paper_format=paper_format, upscaler=self.upscaler)
+        self.resolution_plan = plan
+
+        # Face detection is only needed to choose the enlargement chain
+        has_faces = plan.enhance and self.upscaler.detect_faces(image)
+
+        def enhance(content: np.ndarray) -> np.ndarray:
+            return self.upscaler.enhance_upscaled(content, has_faces=has_faces)
+
+        working = apply_resolution_plan(image, plan, has_faces=has_faces, enhance=enhance)
+
+        content_w, content_h = plan.content_size
+        if plan.enhance:
+            original_mp = (w * h) / 1_000_000
+            final_mp = (content_w * content_h) / 1_000_000
+            self.upscale_metadata = {
+                'original_size': (w, h),
+                'original_megapixels': original_mp,
+                'was_upscaled': True,
+                'has_faces': bool(has_faces),
+                'upscale_method': 'face_optimized' if has_faces else 'quality_optimized',
+                'final_size': (content_w, content_h),
+                'final_megapixels': final_mp,
+                'quality_improvement': (final_mp / original_mp - 1) * 100,
+                'resolution_plan': plan.to_dict()
+            }
             logger.info("🚀 INTELLIGENT UPSCALING APPLIED")
-            logger.info(f"   Original: {upscale_info['original_size'][0]}x{upscale_info['original_size'][1]} "
-                       f"({upscale_info['original_megapixels']:.1f}MP)")
-            logger.info(f"   Enhanced: {upscale_info['final_size'][0]}x{upscale_info['final_size'][1]} "
-                       f"({upscale_info['final_megapixels']:.1f}MP)")
-            logger.info(f"   Quality Improvement: +{upscale_info['quality_improvement']:.0f}%")
-            logger.info(f"   Method: {upscale_info['upscale_method']}")
-            if upscale_info['has_faces']:
+            logger.info(f"   Original: {w}x{h} ({original_mp:.1f}MP)")
+            logger.info(f"   Enhanced: {content_w}x{content_h} ({final_mp:.1f}MP)")
+            logger.info(f"   Method: {self.upscale_metadata['upscale_method']}")
+            if has_faces:
                 logger.info("   ✨ Face-optimized processing enabled!")
-
-            # Use the upscaled image
-            self.original_image = upscaled_image
-            return upscaled_image
+        elif plan.needs_resample:
+            logger.info(f"   Resampled once to working size: {content_w}x{content_h}")
         else:
-            logger.info("   Image resolution is already optimal - no upscaling needed")
-            return image
+            logger.info("   Image resolution is already optimal - no resampling needed")
+
+        if plan.canvas_size != plan.content_size:
+            logger.info(f"   Placed on {plan.canvas_size[0]}x{plan.canvas_size[1]} canvas")
+
+        return working
 
     def preprocess(self, image: Optional[np.ndarray] = None,
                    apply_bilateral: bool = True,
@@ -255,39 +472,24 @@ class ImageProcessor:
         processed = resize_image(image, self.config.MAX_IMAGE_SIZE)
         processed = ensure_uint8(processed)
 
-        # Global color and tone normalization first for stable clustering
-        processed = self._apply_white_balance(processed)
-        processed = self._apply_tone_balance(processed)
-
-        # Pre-denoise to avoid fragmenting regions before clustering
-        if getattr(self.config, "APPLY_DENOISE", False):
-            h = float(getattr(self.config, "DENOISE_STRENGTH", 7))
-            h_color = float(getattr(self.config, "DENOISE_COLOR_STRENGTH", 7))
-            try:
-                processed = cv2.fastNlMeansDenoisingColored(
-                    processed, None, h, h_color, 7, 21
-                )
-            except AttributeError:
-                if 'logger' in globals():
-                    logger.warning(
-                        "OpenCV build missing fastNlMeansDenoisingColored; skipping denoise step"
-                    )
-
-        # Apply Gaussian blur for subtle noise smoothing
-        if apply_gaussian:
-            kernel = self.config.GAUSSIAN_BLUR_KERNEL
-            processed = cv2.GaussianBlur(processed, kernel, 0)
-
-        # Apply bilateral filter for edge-preserving smoothing
-        if apply_bilateral:
-            processed = cv2.bilateralFilter(
-                processed,
-                d=self.config.BILATERAL_FILTER_D,
-                sigmaColor=self.config.BILATERAL_SIGMA_COLOR,
-                sigmaSpace=self.config.BILATERAL_SIGMA_SPACE
-            )
-
-        # Reinforce local contrast before quantization
+        # Global color and tone normalization first for stable clustering;
+        # white and tone balance share one LUT pass
+        grading = self.build_color_grading(processed)
+        if grading.stages:
+            processed = grading.apply(processed)
+            logger.info(f"Color grading ({', '.join(grading.names)}) applied in one LUT pass")
+
+        # Pre-denoise to avoid fragmenting regions before clustering, then
+        # Gaussian blur for subtle noise and bilateral filter for
+        # edge-preserving smoothing
+        denoise = self._select_denoise(processed)
+        if denoise == "nlm" and not hasattr(cv2, "fastNlMeansDenoisingColored"):
+            logger.warning("OpenCV build missing fastNlMeansDenoisingColored; skipping denoise step")
+        specs = spatial_filter_specs(self.config, apply_gaussian, apply_bilateral, denoise=denoise)
+        processed = self._apply_spatial_filters(processed, specs)
+
+        # Reinforce local contrast before quantization (CLAHE's tile grid spans
+        # the whole frame, so it always runs untiled)
         processed = self._apply_local_contrast(processed)
 
         # Final sharpening to keep contours crisp
@@ -315,7 +517,7 @@ class ImageProcessor:
 
         cv2 = require_cv2()
         # Convert to LAB color space
-        lab = cv2.cvtColor(image, cv2.COLOR_RGB2LAB)
+        lab = self.image_context.lab(image)
         l_channel, a, b = cv2.split(lab)
 
         # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization) to L channel
@@ -349,7 +551,7 @@ class ImageProcessor:
 
         cv2 = require_cv2()
         # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        gray = self.image_context.gray(image)
 
         # Apply Canny edge detection
         edges = cv2.Canny(
@@ -362,15 +564,21 @@ class ImageProcessor:
 
     def apply_majority_filter(self, image: np.ndarray,
                              edge_mask: Optional[np.ndarray] = None,
-                             edge_threshold: int = 30) -> np.ndarray:
+                             edge_threshold: int = 30,
+                             window_size: int = 3) -> np.ndarray:
         """
-        Apply 3×3 majority filter to remove single-pixel noise.
+        Apply majority filter to remove single-pixel noise.
         Only affects non-edge pixels to preserve important details.
 
+        The image's distinct colors are turned into a compact label map and
+        filtered with majority_filter_labels, so cost does not depend on
+        per-pixel Python work.
+
         Args:
             image: Input quantized image
             edge_mask: Optional edge strength map (0-255)
             edge_threshold: Threshold above which pixels are considered edges
+            window_size: Odd window side length (3 = 3×3)
 
         Returns:
             Filtered image
@@ -380,31 +588,16 @@ class ImageProcessor:
 
         # Generate edge mask if not provided
         if edge_mask is None:
-            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+            gray = self.image_context.gray(image)
             edge_mask = cv2.Canny(gray, 30, 100)
 
-        output = image.copy()
-
-        for y in range(1, h - 1):
-            for x in range(1, w - 1):
-                # Skip edge pixels
-                if edge_mask[y, x] > edge_threshold:
-                    continue
-
-                # Count color occurrences in 3×3 neighborhood
-                color_counts = {}
-
-                for ky in range(-1, 2):
-                    for kx in range(-1, 2):
-                        ny, nx = y + ky, x + kx
-                        color = tuple(image[ny, nx])
-                        color_counts[color] = color_counts.get(color, 0) + 1
+        # Distinct colors -> labels (a quantized image has only a handful)
+        colors, _, inverse = build_color_histogram(ensure_uint8(image))
+        labels = inverse.reshape(h, w).astype(np.int32)
 
-                # Find majority color
-                majority_color = max(color_counts.items(), key=lambda x: x[1])[0]
-                output[y, x] = majority_color
+        filtered = majority_filter_labels(labels, window_size, exclude_mask=edge_mask > edge_threshold)
 
-        return output
+        return colors.astype(np.uint8)[filtered]
 
     def get_image_info(self) -> dict:
         """
@@ -7,6 +7,7 @@ Especially optimized for portrait/face images
 import numpy as np
 from typing import Tuple, Optional
 from ..utils.opencv import require_cv2
+from ..intelligence.detector_service import get_detector_service
 
 cv2 = require_cv2()
 
@@ -55,6 +56,19 @@ class IntelligentUpscaler:
             True if image should be upscaled
         """
         height, width = image.shape[:2]
+        return self.size_needs_upscaling(width, height)
+
+    def size_needs_upscaling(self, width: int, height: int) -> bool:
+        """
+        Check if an image of the given size should be upscaled
+
+        Args:
+            width: Image width in pixels
+            height: Image height in pixels
+
+        Returns:
+            True if image should be upscaled
+        """
         max_dim = max(height, width)
         min_dim = min(height, width)
 
@@ -72,6 +86,19 @@ class IntelligentUpscaler:
             Optimal (width, height) for upscaling
         """
         height, width = image.shape[:2]
+        return self.optimal_size_for(width, height)
+
+    def optimal_size_for(self, width: int, height: int) -> Tuple[int, int]:
+        """
+        Calculate optimal upscaling size for an image of the given size
+
+        Args:
+            width: Image width in pixels
+            height: Image height in pixels
+
+        Returns:
+            Optimal (width, height) for upscaling
+        """
         aspect_ratio = width / height
 
         target_width, target_height = self.target_resolution
@@ -107,19 +134,9 @@ class IntelligentUpscaler:
             True if faces detected
         """
         try:
-            # Convert to grayscale for face detection
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-            # Use Haar Cascade for fast face detection
-            face_cascade = cv2.CascadeClassifier(
-                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-            )
-
-            faces = face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30)
+            # Shared service: cascade loaded once, detection on a small proxy
+            faces = get_detector_service().detect_faces(
+                image, min_size=(30, 30), verify_eyes=False
             )
 
             return len(faces) > 0
@@ -141,14 +158,7 @@ class IntelligentUpscaler:
         """
         # Use INTER_CUBIC for upscaling (best quality)
         upscaled = cv2.resize(image, target_size, interpolation=cv2.INTER_CUBIC)
-
-        # Apply sharpening to restore detail lost in upscaling
-        upscaled = self._sharpen_image(upscaled, amount=0.5)
-
-        # Denoise to remove interpolation artifacts
-        upscaled = cv2.fastNlMeansDenoisingColored(upscaled, None, 3, 3, 7, 21)
-
-        return upscaled
+        return self.enhance_upscaled(upscaled, has_faces=False)
 
     def upscale_for_faces(self, image: np.ndarray, target_size: Tuple[int, int]) -> np.ndarray:
         """
@@ -161,23 +171,46 @@ class IntelligentUpscaler:
         Returns:
             Upscaled image optimized for faces
         """
-        # Step 1: Initial upscaling with LANCZOS4 (best for faces)
+        # Initial upscaling with LANCZOS4 (best for faces)
         upscaled = cv2.resize(image, target_size, interpolation=cv2.INTER_LANCZOS4)
+        return self.enhance_upscaled(upscaled, has_faces=True)
+
+    def enhance_upscaled(self, upscaled: np.ndarray, has_faces: bool) -> np.ndarray:
+        """
+        Clean up an image that has just been enlarged by interpolation
+
+        Runs the sharpening and denoising that follow an upscale. It is kept
+        separate from the resize so callers can resample once to their final
+        size and pay for the (expensive) denoising only there.
+
+        Args:
+            upscaled: Freshly upscaled image
+            has_faces: Use the face-optimized chain
+
+        Returns:
+            Enhanced image
+        """
+        if has_faces:
+            # Step 1: Enhance skin tones (optional, can be commented out)
+            upscaled = self._enhance_skin_tones(upscaled)
 
-        # Step 2: Enhance skin tones (optional, can be commented out)
-        upscaled = self._enhance_skin_tones(upscaled)
+            # Step 2: Sharpen with face-specific settings
+            upscaled = self._sharpen_image(upscaled, amount=0.7)
 
-        # Step 3: Sharpen with face-specific settings
-        upscaled = self._sharpen_image(upscaled, amount=0.7)
+            # Step 3: Apply bilateral filter to smooth skin while preserving edges
+            upscaled = cv2.bilateralFilter(upscaled, 5, 50, 50)
 
-        # Step 4: Apply bilateral filter to smooth skin while preserving edges
-        upscaled = cv2.bilateralFilter(upscaled, 5, 50, 50)
+            # Step 4: Light denoising
+            upscaled = cv2.fastNlMeansDenoisingColored(upscaled, None, 2, 2, 7, 21)
 
-        # Step 5: Light denoising
-        upscaled = cv2.fastNlMeansDenoisingColored(upscaled, None, 2, 2, 7, 21)
+            # Step 5: Final detail enhancement with CLAHE
+            return self._enhance_details(upscaled)
 
-        # Step 6: Final detail enhancement with CLAHE
-        upscaled = self._enhance_details(upscaled)
+        # Apply sharpening to restore detail lost in upscaling
+        upscaled = self._sharpen_image(upscaled, amount=0.5)
+
+        # Denoise to remove interpolation artifacts
+        upscaled = cv2.fastNlMeansDenoisingColored(upscaled, None, 3, 3, 7, 21)
 
         return upscaled
 
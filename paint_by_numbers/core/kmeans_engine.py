@@ -0,0 +1,118 @@
+"""
+K-means Engine Module - Deterministic parallel K-means restarts with early stopping
+"""
+
+import os
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+
+# Above this many samples a single MiniBatchKMeans fit is used; its n_init
+# restarts only compare initializations, so there is nothing worth parallelizing
+MINIBATCH_THRESHOLD = 10000
+
+
+def make_kmeans(n_samples: int, n_clusters: int, random_state: int, n_init: int = 10,
+                max_iter: int = 300):
+    """
+    Pick the K-means estimator suited to the number of training samples
+
+    Args:
+        n_samples: Number of training samples
+        n_clusters: Number of clusters
+        random_state: Seed for the estimator
+        n_init: Restarts run inside the estimator
+        max_iter: Maximum iterations per restart
+
+    Returns:
+        Unfitted KMeans or MiniBatchKMeans
+    """
+    if n_samples > MINIBATCH_THRESHOLD:
+        # Use MiniBatchKMeans for large datasets
+        return MiniBatchKMeans(
+            n_clusters=n_clusters,
+            random_state=random_state,
+            batch_size=1024,
+            n_init=n_init,
+            max_iter=max_iter
+        )
+    return KMeans(
+        n_clusters=n_clusters,
+        random_state=random_state,
+        n_init=n_init,
+        max_iter=max_iter
+    )
+
+
+def restart_seeds(random_state: int, n_restarts: int) -> np.ndarray:
+    """Independent per-restart seeds derived from one random state."""
+    return np.random.SeedSequence(random_state).generate_state(n_restarts)
+
+
+def fit_kmeans_restarts(samples: np.ndarray, n_clusters: int, random_state: int = 42,
+                        sample_weight: Optional[np.ndarray] = None,
+                        max_restarts: int = 10, batch_size: int = 4,
+                        plateau_tolerance: float = 1e-3, max_iter: int = 300,
+                        max_workers: Optional[int] = None) -> Tuple[object, Dict]:
+    """
+    Run K-means restarts in a thread pool and stop once inertia plateaus
+
+    Restarts are launched in fixed-size batches, each with its own seed from
+    ``restart_seeds``. After a batch, if it improved the best inertia by
+    less than ``plateau_tolerance`` (relative), no further batches start.
+    Batch size, not worker count, decides which restarts run, and ties are
+    broken by restart index, so the result is identical for a given seed on
+    any machine.
+
+    Args:
+        samples: Training samples (N, D)
+        n_clusters: Number of clusters
+        random_state: Seed all restart seeds derive from
+        sample_weight: Optional per-sample weights (N,)
+        max_restarts: Upper bound on restarts
+        batch_size: Restarts launched together between plateau checks
+        plateau_tolerance: Relative inertia improvement needed to continue
+        max_iter: Maximum iterations per restart
+        max_workers: Threads used (default: min(batch_size, CPU count))
+
+    Returns:
+        Tuple of (best fitted estimator, metadata dict)
+    """
+    start = time.perf_counter()
+    seeds = restart_seeds(random_state, max_restarts)
+    batch_size = max(1, min(batch_size, max_restarts))
+    workers = max_workers or min(batch_size, os.cpu_count() or 1)
+
+    def run(seed):
+        estimator = make_kmeans(len(samples), n_clusters, int(seed), n_init=1, max_iter=max_iter)
+        estimator.fit(samples, sample_weight=sample_weight)
+        return estimator
+
+    fitted = []
+    best_idx = None
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for batch_start in range(0, max_restarts, batch_size):
+            previous_best = fitted[best_idx].inertia_ if best_idx is not None else None
+            fitted.extend(executor.map(run, seeds[batch_start:batch_start + batch_size]))
+
+            inertias = [estimator.inertia_ for estimator in fitted]
+            best_idx = int(np.argmin(inertias))
+
+            if previous_best is not None:
+                improvement = (previous_best - inertias[best_idx]) / max(previous_best, 1e-12)
+                if improvement < plateau_tolerance:
+                    break
+
+    metadata = {
+        "engine": "parallel",
+        "restarts_run": len(fitted),
+        "max_restarts": max_restarts,
+        "best_restart": best_idx,
+        "iterations": [int(estimator.n_iter_) for estimator in fitted],
+        "inertias": [float(estimator.inertia_) for estimator in fitted],
+        "seconds": time.perf_counter() - start,
+    }
+    return fitted[best_idx], metadata
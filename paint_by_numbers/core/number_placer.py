@@ -81,6 +81,7 @@ class NumberPlacer:
             # Draw number
             self._draw_number(result, number, position, text_color)
 
+            region.number_position = position
             self.placed_positions.append((region, position, number))
 
         logger.info(f"Placed {len(self.placed_positions)} numbers")
@@ -97,11 +98,20 @@ class NumberPlacer:
         Returns:
             (x, y) position or None if no suitable position found
         """
+        # Work on the region's bbox crop, padded by one background pixel so the
+        # distance transform sees the region edge; one transform serves every
+        # candidate checked below
+        cv2 = require_cv2()
+        mask, offset = region.padded_mask(1, image_shape)
+        dist_transform = cv2.distanceTransform(mask, cv2.DIST_L2, 5)
+
         # Try pole-of-inaccessibility algorithm first (if available)
         if HAS_POLE_OF_INACCESSIBILITY and hasattr(region, 'contour') and region.contour is not None:
             try:
-                pole_position = find_best_label_position(region.mask, region.contour, precision=1.0)
-                if pole_position and self._is_position_valid(pole_position, region, image_shape):
+                pole_position = find_best_label_position(mask, region.contour, precision=1.0,
+                                                         offset=offset)
+                if pole_position and self._is_position_valid(pole_position, region, image_shape,
+                                                             dist_transform, mask, offset):
                     return pole_position
             except Exception as e:
                 # If pole algorithm fails, fall back to distance transform
@@ -110,16 +120,12 @@ class NumberPlacer:
         # Fallback 1: Try the geometric center
         center = region.center
 
-        if self._is_position_valid(center, region, image_shape):
+        if self._is_position_valid(center, region, image_shape, dist_transform, mask, offset):
             return center
 
         # Fallback 2: Use distance transform to find interior points
-        cv2 = require_cv2()
-        dist_transform = cv2.distanceTransform(region.mask, cv2.DIST_L2, 5)
-
         # Get multiple candidate positions sorted by distance from edge
-        h, w = region.mask.shape
-        y_coords, x_coords = np.where(region.mask > 0)
+        y_coords, x_coords = np.where(mask > 0)
 
         if len(x_coords) == 0:
             return None
@@ -127,6 +133,10 @@ class NumberPlacer:
         # Get distances for all points
         distances = dist_transform[y_coords, x_coords]
 
+        # Back to frame coordinates
+        x_coords = x_coords + offset[0]
+        y_coords = y_coords + offset[1]
+
         # Sort by distance (descending)
         sorted_indices = np.argsort(distances)[::-1]
 
@@ -134,7 +144,7 @@ class NumberPlacer:
         for idx in sorted_indices[:10]:  # Try top 10 positions
             candidate = (x_coords[idx], y_coords[idx])
 
-            if self._is_position_valid(candidate, region, image_shape):
+            if self._is_position_valid(candidate, region, image_shape, dist_transform, mask, offset):
                 return candidate
 
         # If nothing works, use the point with maximum distance from edge
@@ -145,14 +155,20 @@ class NumberPlacer:
         return None
 
     def _is_position_valid(self, position: Tuple[int, int], region,
-                          image_shape: Tuple[int, int]) -> bool:
+                          image_shape: Tuple[int, int],
+                          dist_transform: Optional[np.ndarray] = None,
+                          mask: Optional[np.ndarray] = None,
+                          offset: Optional[Tuple[int, int]] = None) -> bool:
         """
         Check if position is valid for placing a number
 
         Args:
-            position: (x, y) position
+            position: (x, y) position in frame coordinates
             region: Region object
             image_shape: (height, width) of image
+            dist_transform: Precomputed distance transform of ``mask``
+            mask: Region mask to test against (default: the region's crop)
+            offset: (x, y) frame position of ``mask`` (default: the region's offset)
 
         Returns:
             True if position is valid
@@ -164,8 +180,14 @@ class NumberPlacer:
         if x < 0 or x >= w or y < 0 or y >= h:
             return False
 
+        if mask is None:
+            mask, offset = region.mask, region.offset
+            dist_transform = None
+
         # Check if point is inside region with some margin
-        if not is_point_inside_region(position, region.mask, min_distance=5):
+        local = (x - offset[0], y - offset[1])
+        if not is_point_inside_region(local, mask, min_distance=5,
+                                      dist_transform=dist_transform):
             return False
 
         # Check if too close to other placed numbers
@@ -0,0 +1,222 @@
+"""
+Palette LUT Module - Precomputed RGB-to-label lookup tables for fixed palettes
+"""
+
+import hashlib
+import os
+import tempfile
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+try:
+    from paint_by_numbers.config import Config
+    from paint_by_numbers.logger import logger
+    from paint_by_numbers.utils.opencv import require_cv2
+    from paint_by_numbers.core.color_assignment import assign_to_nearest, compact_label_dtype
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from config import Config
+    from logger import logger
+    from utils.opencv import require_cv2
+    from core.color_assignment import assign_to_nearest, compact_label_dtype
+
+
+# Bump when the LUT contents would change for the same palette/metric/bits
+LUT_FORMAT_VERSION = 1
+
+# Tables already loaded in this process, keyed by cache key, least recently
+# used first; an exact table is 16 MB, so only a few are kept
+MAX_LOADED_LUTS = 4
+_LOADED_LUTS: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+
+def default_cache_dir() -> Path:
+    """Directory used for LUT files when the config does not name one."""
+    return Path.home() / ".cache" / "paint_by_numbers" / "palette_luts"
+
+
+def to_metric_space(rgb: np.ndarray, metric: str) -> np.ndarray:
+    """
+    Convert uint8 RGB values into the space palette distances are measured in
+
+    Matches ColorQuantizer._convert_to_metric_space so LUT lookups give the
+    same labels as direct assignment.
+
+    Args:
+        rgb: uint8 RGB values (..., 3)
+        metric: 'lab', 'hsv' or 'rgb'
+
+    Returns:
+        float32 values with the same shape
+    """
+    if metric in ("lab", "hsv"):
+        cv2 = require_cv2()
+        code = cv2.COLOR_RGB2LAB if metric == "lab" else cv2.COLOR_RGB2HSV
+        shape = rgb.shape
+        converted = cv2.cvtColor(np.ascontiguousarray(rgb, dtype=np.uint8).reshape(-1, 1, 3), code)
+        return converted.reshape(shape).astype(np.float32)
+    return rgb.astype(np.float32)
+
+
+class PaletteLUT:
+    """
+    RGB → palette label lookup table for a fixed palette and distance metric.
+
+    In exact mode (``bits=8``) the table covers all 2²⁴ RGB values and gives
+    the same labels as per-pixel nearest-color search. With fewer bits each
+    channel is binned and every bin maps to the label of its center color,
+    trading a little accuracy for a much smaller table. Tables are built
+    once and stored as ``.npy`` files keyed by a hash of the palette, metric
+    and bit depth; later loads are memory-mapped.
+    """
+
+    def __init__(self, palette: np.ndarray, metric: str = "lab", bits: int = 8,
+                 cache_dir: Optional[str] = None):
+        """
+        Initialize lookup table (built or loaded lazily on first use)
+
+        Args:
+            palette: Palette colors (K, 3) in RGB
+            metric: Distance metric ('lab', 'hsv' or 'rgb')
+            bits: Bits per channel indexed by the table (8 = exact)
+            cache_dir: Directory for LUT files (default: ~/.cache/paint_by_numbers/palette_luts)
+        """
+        self.palette = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+        self.metric = metric.lower()
+        self.bits = int(np.clip(bits, 1, 8))
+        self.shift = 8 - self.bits
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.key = self._cache_key()
+        self._table = None
+
+    def _cache_key(self) -> str:
+        """Hash identifying the palette, metric, bit depth and format version."""
+        digest = hashlib.sha1()
+        digest.update(self.palette.tobytes())
+        digest.update(f"|{self.metric}|{self.bits}|v{LUT_FORMAT_VERSION}".encode())
+        return digest.hexdigest()[:20]
+
+    @property
+    def path(self) -> Path:
+        """Location of the cached table on disk"""
+        return self.cache_dir / f"lut_{self.metric}_{self.bits}bit_{self.key}.npy"
+
+    @property
+    def table(self) -> np.ndarray:
+        """The (S, S, S) label table, loading or building it on first access"""
+        if self._table is None:
+            self._table = self._load_or_build()
+        return self._table
+
+    def _load_or_build(self) -> np.ndarray:
+        """Return the table from the process cache, disk, or a fresh build."""
+        if self.key in _LOADED_LUTS:
+            _LOADED_LUTS.move_to_end(self.key)
+            return _LOADED_LUTS[self.key]
+
+        table = None
+        if self.path.exists():
+            try:
+                table = np.load(self.path, mmap_mode="r")
+                if table.shape != (1 << self.bits,) * 3:
+                    logger.warning(f"Ignoring malformed palette LUT: {self.path}")
+                    table = None
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not load palette LUT {self.path}: {e}")
+                table = None
+
+        if table is None:
+            table = self._build()
+            self._save(table)
+
+        _LOADED_LUTS[self.key] = table
+        while len(_LOADED_LUTS) > MAX_LOADED_LUTS:
+            _LOADED_LUTS.popitem(last=False)
+        return table
+
+    def _build(self) -> np.ndarray:
+        """Assign the representative color of every table cell to the palette."""
+        size = 1 << self.bits
+        logger.info(f"Building {size}³ palette LUT ({len(self.palette)} colors, {self.metric})...")
+
+        # Exact mode indexes raw values; binned mode uses each bin's center
+        levels = np.arange(size, dtype=np.uint16) << self.shift
+        if self.shift:
+            levels += 1 << (self.shift - 1)
+        levels = levels.astype(np.uint8)
+
+        metric_palette = to_metric_space(self.palette, self.metric)
+        table = np.empty((size, size, size), dtype=compact_label_dtype(len(self.palette)))
+
+        # Fill the table a few red planes at a time to keep the build's memory flat
+        planes = max(1, min(size, (1 << 20) // (size * size)))
+        for start in range(0, size, planes):
+            stop = min(start + planes, size)
+            grid = np.empty((stop - start, size, size, 3), dtype=np.uint8)
+            grid[..., 0] = levels[start:stop, None, None]
+            grid[..., 1] = levels[None, :, None]
+            grid[..., 2] = levels[None, None, :]
+
+            table[start:stop] = assign_to_nearest(
+                to_metric_space(grid, self.metric), metric_palette,
+                memory_limit_mb=getattr(Config, 'ASSIGNMENT_MEMORY_MB', None)
+            )
+
+        return table
+
+    def _save(self, table: np.ndarray):
+        """Write the table atomically; a read-only cache only costs a rebuild."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".npy.tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, table)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not cache palette LUT in {self.cache_dir}: {e}")
+
+    def apply(self, image: np.ndarray) -> np.ndarray:
+        """
+        Look up palette labels for every pixel
+
+        Args:
+            image: uint8 RGB image (..., 3)
+
+        Returns:
+            Compact label array with the image's leading shape
+        """
+        table = self.table
+        if self.shift:
+            r = image[..., 0] >> self.shift
+            g = image[..., 1] >> self.shift
+            b = image[..., 2] >> self.shift
+        else:
+            r, g, b = image[..., 0], image[..., 1], image[..., 2]
+        return table[r, g, b]
+
+    __call__ = apply
+
+
+def get_palette_lut(palette: np.ndarray, metric: str = "lab",
+                    config: Optional[Config] = None) -> PaletteLUT:
+    """
+    Create a LUT for a palette using the bit depth and cache directory from config
+
+    Args:
+        palette: Palette colors (K, 3) in RGB
+        metric: Distance metric ('lab', 'hsv' or 'rgb')
+        config: Configuration object (default: Config class values)
+
+    Returns:
+        PaletteLUT instance
+    """
+    source = config or Config
+    return PaletteLUT(
+        palette,
+        metric=metric,
+        bits=getattr(source, 'PALETTE_LUT_BITS', 8),
+        cache_dir=getattr(source, 'PALETTE_LUT_CACHE_DIR', None)
+    )
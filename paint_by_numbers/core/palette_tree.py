@@ -0,0 +1,209 @@
+"""
+Palette Tree Module - Divisive color clustering that can be cut at any palette size
+"""
+
+import heapq
+import numpy as np
+from typing import Optional, Tuple
+
+try:
+    from paint_by_numbers.core.color_assignment import build_color_histogram, compact_label_dtype
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core.color_assignment import build_color_histogram, compact_label_dtype
+
+
+class PaletteTree:
+    """
+    Binary cluster tree over an image's color histogram.
+
+    Built top-down: the cluster with the largest weighted squared error is
+    split in two (principal-axis seed refined by weighted 2-means) until
+    ``max_colors`` leaves exist. Split ``s`` keeps the parent's label for
+    one half and gives the other half label ``s``, so the clustering with
+    ``n`` colors is obtained by folding every label ``>= n`` back into its
+    parent. Cutting is O(max_colors + distinct colors) plus one gather over
+    the pixels, independent of how the tree was built.
+    """
+
+    def __init__(self, max_colors: int = 72, refine_iterations: int = 8):
+        """
+        Initialize palette tree
+
+        Args:
+            max_colors: Largest palette size the tree can be cut at
+            refine_iterations: 2-means iterations used to refine each split
+        """
+        self.max_colors = max_colors
+        self.refine_iterations = refine_iterations
+
+        self.color_space = "rgb"
+        self.shape = None
+        self.colors = None
+        self.weights = None
+        self.inverse = None
+        self.leaf_labels = None
+        self.parents = None
+        self.n_leaves = 0
+
+    def build(self, image: np.ndarray, bits: int = 6, color_space: str = "rgb") -> 'PaletteTree':
+        """
+        Build the tree from a uint8 image in the clustering color space
+
+        Args:
+            image: uint8 image (H, W, 3)
+            bits: Bits per channel kept in the color histogram
+            color_space: Name of the space ``image`` is in, kept for callers
+                         converting centers back to RGB
+
+        Returns:
+            self, for chaining
+        """
+        self.color_space = color_space
+        self.shape = image.shape[:2]
+        colors, counts, inverse = build_color_histogram(image, bits=bits)
+        self.colors = colors.astype(np.float64)
+        self.weights = counts.astype(np.float64)
+        self.inverse = inverse
+
+        n_entries = len(colors)
+        self.leaf_labels = np.zeros(n_entries, dtype=np.int32)
+        self.parents = np.full(self.max_colors, -1, dtype=np.int32)
+
+        # Max-heap of (-error, label, member indices) for splittable clusters
+        root = np.arange(n_entries)
+        heap = [(-self._cluster_error(root), 0, root)]
+        self.n_leaves = 1
+
+        while heap and self.n_leaves < self.max_colors:
+            neg_error, label, members = heapq.heappop(heap)
+            if neg_error >= 0:
+                break
+
+            halves = self._split(members)
+            if halves is None:
+                continue
+
+            keep, moved = halves
+            new_label = self.n_leaves
+            self.leaf_labels[moved] = new_label
+            self.parents[new_label] = label
+            self.n_leaves += 1
+
+            for child_label, child in ((label, keep), (new_label, moved)):
+                if len(child) > 1:
+                    heapq.heappush(heap, (-self._cluster_error(child), child_label, child))
+
+        return self
+
+    def _cluster_error(self, members: np.ndarray) -> float:
+        """Weighted sum of squared distances to the cluster centroid."""
+        if len(members) < 2:
+            return 0.0
+        x = self.colors[members]
+        w = self.weights[members]
+        centroid = (x * w[:, None]).sum(axis=0) / w.sum()
+        diff = x - centroid
+        return float((np.einsum('ij,ij->i', diff, diff) * w).sum())
+
+    def _split(self, members: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Split a cluster in two along its principal axis, refined by 2-means."""
+        x = self.colors[members]
+        w = self.weights[members]
+        total = w.sum()
+        centroid = (x * w[:, None]).sum(axis=0) / total
+        diff = x - centroid
+
+        cov = (diff * w[:, None]).T @ diff / total
+        axis = np.linalg.eigh(cov)[1][:, -1]
+        side = diff @ axis > 0
+
+        for _ in range(self.refine_iterations):
+            if side.all() or not side.any():
+                return None
+            w_a, w_b = w[~side].sum(), w[side].sum()
+            c_a = (x[~side] * w[~side, None]).sum(axis=0) / w_a
+            c_b = (x[side] * w[side, None]).sum(axis=0) / w_b
+            # Nearer to c_b  <=>  projection onto (c_b - c_a) beyond the midpoint
+            direction = c_b - c_a
+            new_side = x @ direction > direction @ (c_a + c_b) / 2
+            if np.array_equal(new_side, side):
+                break
+            side = new_side
+
+        if side.all() or not side.any():
+            return None
+        return members[~side], members[side]
+
+    def label_mapping(self, n_colors: int) -> np.ndarray:
+        """
+        Map every leaf label to its cluster label at ``n_colors`` colors
+
+        Args:
+            n_colors: Palette size to cut at
+
+        Returns:
+            Array of length ``n_leaves`` with values in [0, n_colors)
+        """
+        n_colors = int(np.clip(n_colors, 1, self.n_leaves))
+        mapping = np.arange(self.n_leaves, dtype=np.int32)
+        # Parents always have smaller labels, so one ascending pass resolves chains
+        for label in range(n_colors, self.n_leaves):
+            mapping[label] = mapping[self.parents[label]]
+        return mapping
+
+    def cut_histogram(self, n_colors: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cut the tree at a palette size without touching the pixels
+
+        Args:
+            n_colors: Number of colors (clamped to the number of leaves)
+
+        Returns:
+            Tuple of (cluster centers (n, 3) in the clustering color space,
+            cluster label per histogram entry)
+        """
+        if self.leaf_labels is None:
+            raise RuntimeError("PaletteTree.build() must be called before cutting")
+
+        mapping = self.label_mapping(n_colors)
+        n = int(mapping.max()) + 1
+        entry_labels = mapping[self.leaf_labels]
+
+        weight_sums = np.bincount(entry_labels, weights=self.weights, minlength=n)
+        centers = np.empty((n, 3), dtype=np.float32)
+        for channel in range(3):
+            sums = np.bincount(entry_labels, weights=self.colors[:, channel] * self.weights, minlength=n)
+            centers[:, channel] = sums / weight_sums
+
+        return centers, entry_labels
+
+    def expand_labels(self, entry_labels: np.ndarray, n_colors: int) -> np.ndarray:
+        """
+        Spread per-histogram-entry labels back onto the image grid
+
+        Args:
+            entry_labels: Label per histogram entry
+            n_colors: Number of distinct labels (selects the compact dtype)
+
+        Returns:
+            Compact label map (H, W)
+        """
+        compact = entry_labels.astype(compact_label_dtype(n_colors))
+        return compact[self.inverse].reshape(self.shape)
+
+    def cut(self, n_colors: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cut the tree at a palette size
+
+        Args:
+            n_colors: Number of colors (clamped to the number of leaves)
+
+        Returns:
+            Tuple of (cluster centers (n, 3) in the clustering color space,
+            compact label map (H, W))
+        """
+        centers, entry_labels = self.cut_histogram(n_colors)
+        return centers, self.expand_labels(entry_labels, len(centers))
@@ -7,41 +7,154 @@ from typing import List, Tuple, Dict, Optional
 
 try:
     from paint_by_numbers.config import Config
-    from paint_by_numbers.utils.helpers import calculate_region_area, find_region_center
+    from paint_by_numbers.utils.helpers import (
+        find_region_center, majority_filter_labels
+    )
     from paint_by_numbers.utils.opencv import require_cv2
     from paint_by_numbers.logger import logger
+    from paint_by_numbers.core.color_assignment import compact_label_dtype
+    from paint_by_numbers.core.region_labeling import label_regions, region_crop, region_contour
+    from paint_by_numbers.core.region_graph import RegionGraph, build_region_graph, rasterize_regions
+    from paint_by_numbers.core.region_merge import (
+        absorb_small_regions, collapse_regions, group_nearby_boxes, merge_region_groups
+    )
 except ImportError:
     import sys
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent.parent))
     from config import Config
-    from utils.helpers import calculate_region_area, find_region_center
+    from utils.helpers import find_region_center, majority_filter_labels
     from utils.opencv import require_cv2
     from logger import logger
+    from core.color_assignment import compact_label_dtype
+    from core.region_labeling import label_regions, region_crop, region_contour
+    from core.region_graph import RegionGraph, build_region_graph, rasterize_regions
+    from core.region_merge import (
+        absorb_small_regions, collapse_regions, group_nearby_boxes, merge_region_groups
+    )
 
 
 class Region:
-    """Represents a color region in the image"""
+    """
+    Represents a color region in the image
+
+    The mask is cropped to the region's bounding box and ``offset`` gives
+    the crop's (x, y) position in the frame, so memory scales with the
+    region's area rather than the frame size. ``contour``, ``center`` and
+    ``number_position`` are in frame coordinates.
+    """
+
+    __slots__ = ("color_idx", "mask", "offset", "contour", "center", "area",
+                 "region_id", "number_position")
 
     def __init__(self, color_idx: int, mask: np.ndarray, contour: np.ndarray,
-                 center: Tuple[int, int], area: int):
+                 center: Tuple[int, int], area: int, region_id: Optional[int] = None,
+                 offset: Tuple[int, int] = (0, 0)):
         """
         Initialize region
 
         Args:
             color_idx: Index of color in palette
-            mask: Binary mask of region
+            mask: Binary mask of region, cropped to its bounding box
             contour: Contour points
             center: (x, y) center point
             area: Area in pixels
+            region_id: Id in the detector's region-id raster (None once merged)
+            offset: (x, y) of the mask's top-left corner in the frame
         """
         self.color_idx = color_idx
         self.mask = mask
+        self.offset = (int(offset[0]), int(offset[1]))
         self.contour = contour
         self.center = center
         self.area = area
+        self.region_id = region_id
         self.number_position = center  # Can be adjusted later
 
+    @classmethod
+    def from_frame_mask(cls, color_idx: int, frame_mask: np.ndarray, contour: np.ndarray,
+                        center: Tuple[int, int], area: int,
+                        region_id: Optional[int] = None) -> "Region":
+        """
+        Build a region from a full-frame mask, keeping only its bounding box
+
+        Args:
+            color_idx: Index of color in palette
+            frame_mask: Binary mask the size of the frame
+            contour: Contour points
+            center: (x, y) center point
+            area: Area in pixels
+            region_id: Id in the detector's region-id raster
+
+        Returns:
+            Region with a cropped mask
+        """
+        cv2 = require_cv2()
+        x, y, w, h = cv2.boundingRect(frame_mask)
+        return cls(color_idx, frame_mask[y:y + h, x:x + w].copy(), contour, center, area,
+                   region_id=region_id, offset=(x, y))
+
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        """(x, y, width, height) of the region in the frame."""
+        h, w = self.mask.shape
+        return self.offset[0], self.offset[1], w, h
+
+    def to_local(self, x: int, y: int) -> Tuple[int, int]:
+        """Frame coordinates to mask coordinates."""
+        return x - self.offset[0], y - self.offset[1]
+
+    def to_frame(self, x: int, y: int) -> Tuple[int, int]:
+        """Mask coordinates to frame coordinates."""
+        return x + self.offset[0], y + self.offset[1]
+
+    def contains(self, x: int, y: int) -> bool:
+        """Whether the frame point (x, y) belongs to the region."""
+        lx, ly = self.to_local(x, y)
+        h, w = self.mask.shape
+        return 0 <= lx < w and 0 <= ly < h and self.mask[ly, lx] > 0
+
+    def padded_mask(self, pad: int,
+                    frame_shape: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """
+        Mask with ``pad`` background pixels around it
+
+        With ``frame_shape`` the padding stops at the frame edge, so e.g. a
+        distance transform of the padded mask matches one of the full frame.
+
+        Args:
+            pad: Border width
+            frame_shape: (height, width) of the frame to clip the padding to
+
+        Returns:
+            Tuple of (mask, (x, y) frame offset of the padded mask)
+        """
+        cv2 = require_cv2()
+        x, y, w, h = self.bbox
+        left = top = right = bottom = pad
+        if frame_shape is not None:
+            left, top = min(pad, x), min(pad, y)
+            right = max(0, min(pad, frame_shape[1] - x - w))
+            bottom = max(0, min(pad, frame_shape[0] - y - h))
+        padded = cv2.copyMakeBorder(self.mask, top, bottom, left, right,
+                                    cv2.BORDER_CONSTANT, value=0)
+        return padded, (x - left, y - top)
+
+    def frame_mask(self, shape: Tuple[int, int]) -> np.ndarray:
+        """
+        Full-frame copy of the mask (for callers that need frame-sized arrays)
+
+        Args:
+            shape: (height, width) of the frame
+
+        Returns:
+            uint8 mask of the given shape
+        """
+        full = np.zeros(shape[:2], dtype=self.mask.dtype)
+        x, y, w, h = self.bbox
+        full[y:y + h, x:x + w] = self.mask
+        return full
+
 
 class RegionDetector:
     """Detects and segments regions in quantized images"""
@@ -56,6 +169,12 @@ class RegionDetector:
         self.config = config or Config()
         self.regions = []
         self.color_regions = {}  # Maps color_idx to list of regions
+        self.labels = None        # Cleaned label map regions were taken from
+        self.region_ids = None    # int32 raster of region ids (see core.region_labeling)
+        self.region_table = None  # Columnar per-region color, area, bbox and center
+        self.region_graph = None  # Adjacency of self.regions (see get_region_graph)
+        self.palette_lab = None   # LAB palette, for picking the neighbor small regions join
+        self._region_graph_source = None
 
     def detect_regions(self, quantized_image: np.ndarray, palette: np.ndarray,
                       labels: np.ndarray) -> List[Region]:
@@ -75,61 +194,66 @@ class RegionDetector:
 
         logger.info("Detecting regions...")
 
-        cv2 = require_cv2()
-
-        for color_idx in range(len(palette)):
-            # Create mask for this color
-            mask = (labels == color_idx).astype(np.uint8) * 255
-
-            if mask.sum() == 0:
+        # Compact labels make the cleanup and labeling passes cheaper
+        label_dtype = compact_label_dtype(len(palette))
+        if labels.dtype.itemsize > label_dtype.itemsize:
+            labels = labels.astype(label_dtype)
+
+        # Speckle cleanup on the label map itself (the label-level counterpart
+        # of closing/opening each color's mask), so regions still partition
+        # the frame exactly
+        passes = max(0, getattr(self.config, "MORPH_CLOSE_ITERATIONS", 1),
+                     getattr(self.config, "MORPH_OPEN_ITERATIONS", 1))
+        window = self.config.MORPHOLOGY_KERNEL_SIZE | 1
+        for _ in range(passes):
+            labels = majority_filter_labels(labels, window)
+
+        # Every same-color component in one labeling pass
+        region_ids, table = label_regions(labels)
+
+        # Very small regions join their most similar neighbor, so the
+        # regions still cover the whole canvas
+        self.palette_lab = self._palette_lab(palette)
+        graph = build_region_graph(region_ids, len(table["area"]))
+        root = absorb_small_regions(table["area"], table["color"], graph,
+                                    self.config.MIN_REGION_SIZE,
+                                    self.palette_lab[table["color"]])
+        self.region_ids, self.region_table = collapse_regions(region_ids, table, root)
+        del region_ids
+        table = self.region_table
+        if len(table["area"]) < len(root):
+            logger.info(f"Absorbed {len(root) - len(table['area'])} small regions into neighbors")
+            labels = table["color"].astype(labels.dtype)[self.region_ids]
+        self.labels = labels
+
+        # Keep regions grouped by color
+        kept = np.argsort(table["color"], kind="stable")
+
+        for region_id in kept:
+            # Masks and contours are only built inside the region's bbox; the
+            # one-pixel background ring keeps the distance transform exact
+            x, y, w, h = (int(v) for v in table["bbox"][region_id])
+            padded, (px, py) = region_crop(self.region_ids, (x, y, w, h), region_id, pad=1)
+            contour = region_contour(padded, (px, py))
+            if contour is None:
                 continue
 
-            # Apply morphological operations to clean up mask
-            kernel = cv2.getStructuringElement(
-                cv2.MORPH_ELLIPSE,
-                (self.config.MORPHOLOGY_KERNEL_SIZE, self.config.MORPHOLOGY_KERNEL_SIZE)
-            )
-
-            close_iterations = max(0, getattr(self.config, "MORPH_CLOSE_ITERATIONS", 1))
-            open_iterations = max(0, getattr(self.config, "MORPH_OPEN_ITERATIONS", 1))
-
-            if close_iterations > 0:
-                mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=close_iterations)
-
-            if open_iterations > 0:
-                mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=open_iterations)
-
-            # Find contours
-            contours, hierarchy = cv2.findContours(
-                mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+            # Find region center
+            cx, cy = find_region_center(padded)
+
+            color_idx = int(table["color"][region_id])
+            region = Region(
+                color_idx=color_idx,
+                mask=padded[y - py:y - py + h, x - px:x - px + w].copy(),
+                contour=contour,
+                center=(cx + px, cy + py),
+                area=int(table["area"][region_id]),
+                region_id=int(region_id),
+                offset=(x, y)
             )
 
-            # Process each contour as a separate region
-            for contour in contours:
-                area = cv2.contourArea(contour)
-
-                # Skip very small regions
-                if area < self.config.MIN_REGION_SIZE:
-                    continue
-
-                # Create region mask
-                region_mask = np.zeros_like(mask)
-                cv2.drawContours(region_mask, [contour], -1, 255, -1)
-
-                # Find region center
-                center = find_region_center(region_mask)
-
-                # Create region object
-                region = Region(
-                    color_idx=color_idx,
-                    mask=region_mask,
-                    contour=contour,
-                    center=center,
-                    area=int(area)
-                )
-
-                self.regions.append(region)
-                self.color_regions[color_idx].append(region)
+            self.regions.append(region)
+            self.color_regions[color_idx].append(region)
 
         logger.info(f"Detected {len(self.regions)} regions")
         return self.regions
@@ -162,20 +286,40 @@ class RegionDetector:
 
     def filter_small_regions(self, min_area: Optional[int] = None) -> List[Region]:
         """
-        Filter out regions smaller than threshold
+        Absorb regions smaller than threshold into their most similar neighbor
 
         Args:
             min_area: Minimum area (uses config default if None)
 
         Returns:
-            List of filtered regions
+            List of regions, still covering the canvas
         """
         if min_area is None:
             min_area = self.config.MIN_REGION_SIZE
 
-        filtered = [r for r in self.regions if r.area >= min_area]
+        if not self.regions:
+            return self.regions
+
+        areas = np.array([r.area for r in self.regions])
+        colors = np.array([r.color_idx for r in self.regions])
+        colors_lab = self.palette_lab[colors] if self.palette_lab is not None else None
+        root = absorb_small_regions(areas, colors, self.get_region_graph(), min_area, colors_lab)
+
+        filtered = []
+        for survivor, members in merge_region_groups(self.regions, root):
+            if len(members) == 1:
+                filtered.append(members[0])
+                continue
+
+            combined = self._combine_regions(self.regions[survivor].color_idx, members)
+            # Absorbed pixels now carry the survivor's color
+            if self.labels is not None:
+                x, y, w, h = combined.bbox
+                window = self.labels[y:y + h, x:x + w]
+                window[combined.mask > 0] = combined.color_idx
+            filtered.append(combined)
 
-        logger.info(f"Filtered {len(self.regions) - len(filtered)} small regions")
+        logger.info(f"Absorbed {len(self.regions) - len(filtered)} small regions into neighbors")
 
         self.regions = filtered
 
@@ -188,6 +332,39 @@ class RegionDetector:
 
         return self.regions
 
+    def _combine_regions(self, color_idx: int, members: List[Region]) -> Region:
+        """
+        One region covering all members
+
+        Args:
+            color_idx: Color of the combined region
+            members: Regions to combine
+
+        Returns:
+            Combined region
+        """
+        x0 = min(r.bbox[0] for r in members)
+        y0 = min(r.bbox[1] for r in members)
+        x1 = max(r.bbox[0] + r.bbox[2] for r in members)
+        y1 = max(r.bbox[1] + r.bbox[3] for r in members)
+
+        mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        for region in members:
+            x, y, w, h = region.bbox
+            mask[y - y0:y - y0 + h, x - x0:x - x0 + w] |= region.mask
+
+        return self._region_from_mask(color_idx, mask, (x0, y0), sum(r.area for r in members))
+
+    @staticmethod
+    def _palette_lab(palette: np.ndarray) -> np.ndarray:
+        """LAB coordinates of an RGB palette."""
+        try:
+            from paint_by_numbers.core.color_quantizer import rgb_to_lab
+        except ImportError:
+            from core.color_quantizer import rgb_to_lab
+
+        return rgb_to_lab(np.asarray(palette)).astype(np.float64)
+
     def merge_nearby_regions(self, same_color: bool = True,
                             distance_threshold: int = 10) -> List[Region]:
         """
@@ -205,72 +382,160 @@ class RegionDetector:
             # Merge regions color by color
             merged_regions = []
 
+            # Dilate slightly to connect nearby regions
+            kernel_size = distance_threshold
+            kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (kernel_size, kernel_size))
+            # Dilation reaches at most half the kernel; one more pixel keeps a
+            # background ring around every ROI
+            margin = kernel_size // 2 + 1
+
             for color_idx, regions in self.color_regions.items():
                 if not regions:
                     continue
 
-                # Create combined mask for all regions of this color
-                h, w = regions[0].mask.shape
-                combined_mask = np.zeros((h, w), dtype=np.uint8)
-
-                for region in regions:
-                    combined_mask = cv2.bitwise_or(combined_mask, region.mask)
+                # Only regions whose padded bboxes overlap can end up connected,
+                # so each group is dilated inside its own ROI
+                clusters = []
+                bboxes = np.array([r.bbox for r in regions])
+                for members in group_nearby_boxes(bboxes, margin):
+                    clusters.extend(self._merge_cluster(
+                        color_idx, [regions[i] for i in members], kernel, margin
+                    ))
 
-                # Dilate slightly to connect nearby regions
-                kernel_size = distance_threshold
-                kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (kernel_size, kernel_size))
-                dilated = cv2.dilate(combined_mask, kernel)
+                # Same order a full-frame contour scan yields: reverse raster
+                # order of each cluster's first pixel
+                clusters.sort(key=lambda cluster: cluster[0], reverse=True)
+                merged_regions.extend(region for _, region in clusters)
 
-                # Find connected components
-                contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            self.regions = merged_regions
 
-                # Create new regions
-                for contour in contours:
-                    # Erode back to original size
-                    region_mask = np.zeros((h, w), dtype=np.uint8)
-                    cv2.drawContours(region_mask, [contour], -1, 255, -1)
-                    region_mask = cv2.erode(region_mask, kernel)
+            # Rebuild color_regions mapping
+            self.color_regions = {i: [] for i in self.color_regions.keys()}
+            for region in self.regions:
+                self.color_regions[region.color_idx].append(region)
 
-                    # Intersect with original combined mask
-                    region_mask = cv2.bitwise_and(region_mask, combined_mask)
+            logger.info(f"After merging: {len(self.regions)} regions")
 
-                    area = calculate_region_area(region_mask)
+        return self.regions
 
-                    if area < self.config.MIN_REGION_SIZE:
-                        continue
+    def get_region_graph(self) -> RegionGraph:
+        """
+        Adjacency graph of the current regions
 
-                    # Find new contour on cleaned mask
-                    contours_clean, _ = cv2.findContours(
-                        region_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
-                    )
+        Node i is ``self.regions[i]``; edge weights are shared boundary
+        lengths in pixel edges. The graph is rebuilt only when the region
+        list has changed since the last call.
 
-                    if not contours_clean:
-                        continue
+        Returns:
+            RegionGraph over the current regions
+        """
+        if self.region_graph is not None and self._region_graph_source is self.regions \
+                and self.region_graph.n_nodes == len(self.regions):
+            return self.region_graph
+
+        if self.region_ids is not None and all(r.region_id is not None for r in self.regions):
+            # Straight from labeling: map region ids to list indices
+            index_of = np.full(len(self.region_table["area"]), -1, dtype=np.int32)
+            index_of[[r.region_id for r in self.regions]] = np.arange(len(self.regions))
+            raster = index_of[self.region_ids]
+        else:
+            raster = rasterize_regions(self.regions, self._frame_shape())
+
+        self.region_graph = build_region_graph(raster, len(self.regions))
+        self._region_graph_source = self.regions
+        return self.region_graph
+
+    def _merge_cluster(self, color_idx: int, members: List[Region], kernel: np.ndarray,
+                       margin: int) -> List[Tuple[Tuple[int, int], Region]]:
+        """
+        Dilate a group of same-colored regions inside their padded ROI and merge
+        the regions that end up in one connected blob
 
-                    # Use largest contour
-                    contour = max(contours_clean, key=cv2.contourArea)
-                    center = find_region_center(region_mask)
+        Args:
+            color_idx: Color of the regions
+            members: Regions whose padded bboxes overlap
+            kernel: Dilation structuring element
+            margin: ROI padding (at least the kernel's reach plus one)
 
-                    merged_region = Region(
-                        color_idx=color_idx,
-                        mask=region_mask,
-                        contour=contour,
-                        center=center,
-                        area=int(area)
-                    )
+        Returns:
+            List of ((y, x) first pixel of the blob, merged region); blobs below
+            MIN_REGION_SIZE are dropped
+        """
+        cv2 = require_cv2()
+        frame_h, frame_w = self._frame_shape()
+        x0 = max(0, min(r.bbox[0] for r in members) - margin)
+        y0 = max(0, min(r.bbox[1] for r in members) - margin)
+        x1 = min(frame_w, max(r.bbox[0] + r.bbox[2] for r in members) + margin)
+        y1 = min(frame_h, max(r.bbox[1] + r.bbox[3] for r in members) + margin)
+
+        combined_mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        for region in members:
+            x, y, w, h = region.bbox
+            combined_mask[y - y0:y - y0 + h, x - x0:x - x0 + w] |= region.mask
+
+        dilated = cv2.dilate(combined_mask, kernel)
+        blobs, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        merged = []
+        for blob in blobs:
+            # Erode back to original size inside the blob's bbox plus margin;
+            # the background ring makes this match eroding the full frame
+            bx, by, bw, bh = cv2.boundingRect(blob)
+            bx, by = bx + x0, by + y0
+            fx0, fy0 = max(0, bx - margin), max(0, by - margin)
+            fx1, fy1 = min(frame_w, bx + bw + margin), min(frame_h, by + bh + margin)
+            filled = np.zeros((fy1 - fy0, fx1 - fx0), dtype=np.uint8)
+            cv2.drawContours(filled, [blob], -1, 255, -1, offset=(x0 - fx0, y0 - fy0))
+            eroded = cv2.erode(filled, kernel)
+
+            # Intersect with original combined mask
+            region_mask = cv2.bitwise_and(
+                eroded[by - fy0:by - fy0 + bh, bx - fx0:bx - fx0 + bw],
+                combined_mask[by - y0:by - y0 + bh, bx - x0:bx - x0 + bw]
+            )
 
-                    merged_regions.append(merged_region)
+            area = cv2.countNonZero(region_mask)
+            if area == 0 or area < self.config.MIN_REGION_SIZE:
+                continue
 
-            self.regions = merged_regions
+            start = blob[0, 0]
+            merged.append(((int(start[1]) + y0, int(start[0]) + x0),
+                           self._region_from_mask(color_idx, region_mask, (bx, by), area)))
+        return merged
 
-            # Rebuild color_regions mapping
-            self.color_regions = {i: [] for i in self.color_regions.keys()}
-            for region in self.regions:
-                self.color_regions[region.color_idx].append(region)
+    def _region_from_mask(self, color_idx: int, mask: np.ndarray, offset: Tuple[int, int],
+                          area: int) -> Region:
+        """
+        Region from a mask, cropped to the mask's bounding box
 
-            logger.info(f"After merging: {len(self.regions)} regions")
+        Args:
+            color_idx: Color of the region
+            mask: uint8 mask
+            offset: (x, y) of the mask in the frame
+            area: Pixel count of the mask
 
-        return self.regions
+        Returns:
+            Region with contour and center in frame coordinates
+        """
+        cv2 = require_cv2()
+        x, y, w, h = cv2.boundingRect(mask)
+        region = Region(color_idx, mask[y:y + h, x:x + w].copy(), None, (0, 0), int(area),
+                        offset=(offset[0] + x, offset[1] + y))
+
+        # Contour and center on a background ring, as on the full frame
+        padded, (px, py) = region.padded_mask(1, self._frame_shape())
+        region.contour = region_contour(padded, (px, py))
+        cx, cy = find_region_center(padded)
+        region.center = region.number_position = (cx + px, cy + py)
+        return region
+
+    def _frame_shape(self) -> Tuple[int, int]:
+        """(height, width) of the frame the regions were detected in."""
+        if self.region_ids is not None:
+            return self.region_ids.shape
+        # Regions assigned from elsewhere: the union of their bboxes
+        return (max(r.bbox[1] + r.bbox[3] for r in self.regions),
+                max(r.bbox[0] + r.bbox[2] for r in self.regions))
 
     def get_region_at_point(self, x: int, y: int) -> Optional[Region]:
         """
@@ -284,10 +549,8 @@ class RegionDetector:
             Region at point or None
         """
         for region in self.regions:
-            h, w = region.mask.shape
-            if 0 <= x < w and 0 <= y < h:
-                if region.mask[y, x] > 0:
-                    return region
+            if region.contains(x, y):
+                return region
 
         return None
 
@@ -309,15 +572,13 @@ class RegionDetector:
 
         # Import LAB conversion functions
         try:
-            from paint_by_numbers.core.color_quantizer import rgb_to_lab, delta_e_cie2000
+            from paint_by_numbers.core.color_quantizer import rgb_to_lab, delta_e_cie2000_matrix
         except ImportError:
-            from core.color_quantizer import rgb_to_lab, delta_e_cie2000
-
-        cv2 = require_cv2()
-        h, w = labels.shape[:2]
+            from core.color_quantizer import rgb_to_lab, delta_e_cie2000_matrix
 
-        # Convert palette to LAB
+        # Convert palette to LAB and compute all pairwise distances at once
         palette_lab = rgb_to_lab(palette)
+        pair_distances = delta_e_cie2000_matrix(palette_lab, palette_lab)
 
         # Find pairs of similar colors
         merge_map = {}  # Maps color_idx to target color_idx
@@ -327,7 +588,7 @@ class RegionDetector:
         # Find colors that are perceptually similar
         for i in range(len(palette)):
             for j in range(i + 1, len(palette)):
-                distance = delta_e_cie2000(palette_lab[i], palette_lab[j])
+                distance = pair_distances[i, j]
 
                 if distance < threshold:
                     # These colors are similar enough to merge
@@ -335,28 +596,14 @@ class RegionDetector:
                     logger.info(f"Merging color {j} into {i} (distance: {distance:.1f})")
                     merge_map[j] = i
 
-        # Check for adjacent regions with similar colors
-        # Create adjacency matrix
-        adjacency = np.zeros((len(palette), len(palette)), dtype=bool)
-
-        # Scan image to find adjacent colors
-        for y in range(h - 1):
-            for x in range(w - 1):
-                current = labels[y, x]
-                # Check right neighbor
-                if labels[y, x + 1] != current:
-                    adjacency[current, labels[y, x + 1]] = True
-                    adjacency[labels[y, x + 1], current] = True
-                # Check bottom neighbor
-                if labels[y + 1, x] != current:
-                    adjacency[current, labels[y + 1, x]] = True
-                    adjacency[labels[y + 1, x], current] = True
+        # Colors that touch anywhere in the label map
+        adjacency = build_region_graph(labels, len(palette)).adjacency_matrix()
 
         # Merge adjacent similar colors more aggressively
         for i in range(len(palette)):
             for j in range(i + 1, len(palette)):
                 if adjacency[i, j]:
-                    distance = delta_e_cie2000(palette_lab[i], palette_lab[j])
+                    distance = pair_distances[i, j]
                     # Use slightly higher threshold for adjacent regions
                     if distance < threshold * 1.5:
                         logger.info(f"Merging adjacent color {j} into {i} (distance: {distance:.1f})")
@@ -368,21 +615,18 @@ class RegionDetector:
                         else:
                             merge_map[j] = i
 
-        # Apply merging to labels
-        new_labels = labels.copy()
-        for old_idx, new_idx in merge_map.items():
-            if old_idx != new_idx:
-                new_labels[labels == old_idx] = new_idx
+        # Apply merging to labels through a lookup table
+        merge_lut = np.array([merge_map[i] for i in range(len(palette))])
+        new_labels = merge_lut[labels]
 
         # Create new palette with only used colors
         used_colors = np.unique(new_labels)
         new_palette = palette[used_colors]
 
         # Remap labels to consecutive indices
-        remap = {old: new for new, old in enumerate(used_colors)}
-        final_labels = np.zeros_like(new_labels)
-        for old_idx, new_idx in remap.items():
-            final_labels[new_labels == old_idx] = new_idx
+        remap = np.zeros(len(palette), dtype=labels.dtype)
+        remap[used_colors] = np.arange(len(used_colors))
+        final_labels = remap[new_labels]
 
         logger.info(f"Artistic simplification: {len(palette)} → {len(new_palette)} colors")
 
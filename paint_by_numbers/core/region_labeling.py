@@ -0,0 +1,132 @@
+"""
+Region Labeling Module - Single-pass connected-component labeling of label maps
+
+Every 4-connected run of same-colored pixels becomes one region. Regions are
+described by an int32 region-id raster plus a columnar table (one array per
+attribute), so per-region pixels, masks and contours are only materialized
+inside a region's bounding box when a caller asks for them.
+"""
+
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+try:
+    from paint_by_numbers.utils.opencv import require_cv2
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from utils.opencv import require_cv2
+
+
+# Region table columns: 'color' (N,), 'area' (N,), 'bbox' (N, 4) as
+# (x, y, width, height) and 'center' (N, 2) as mean (x, y)
+RegionTable = Dict[str, np.ndarray]
+
+
+def label_regions(labels: np.ndarray) -> Tuple[np.ndarray, RegionTable]:
+    """
+    Label all same-color 4-connected components of a label map at once
+
+    The label map is expanded onto a lattice of twice the resolution where
+    even/even cells are pixels and the cells between two neighbouring
+    pixels are set only when both pixels share a label. One binary
+    connected-components pass over that lattice then separates every color
+    at once, with no per-color masks.
+
+    Args:
+        labels: (H, W) integer label map
+
+    Returns:
+        Tuple of (region-id raster (H, W) int32 with ids 0..N-1 in raster
+        order of each region's first pixel, region table)
+    """
+    cv2 = require_cv2()
+    labels = np.asarray(labels)
+    h, w = labels.shape
+
+    lattice = np.zeros((2 * h - 1, 2 * w - 1), dtype=np.uint8)
+    lattice[::2, ::2] = 1
+    lattice[::2, 1::2] = labels[:, :-1] == labels[:, 1:]
+    lattice[1::2, ::2] = labels[:-1] == labels[1:]
+
+    n, components, stats, _ = cv2.connectedComponentsWithStats(
+        lattice, connectivity=4, ltype=cv2.CV_32S
+    )
+    del lattice
+
+    # Component 0 is the unset link cells; pixel cells are always set
+    region_ids = components[::2, ::2] - 1
+    del components
+    n_regions = n - 1
+
+    flat = region_ids.ravel()
+    area = np.bincount(flat, minlength=n_regions)
+
+    color = np.empty(n_regions, dtype=np.int32)
+    color[flat] = labels.ravel()
+
+    # A component's extreme lattice cells are pixels, never links
+    stats = stats[1:]
+    bbox = np.stack([
+        stats[:, cv2.CC_STAT_LEFT] // 2,
+        stats[:, cv2.CC_STAT_TOP] // 2,
+        (stats[:, cv2.CC_STAT_WIDTH] + 1) // 2,
+        (stats[:, cv2.CC_STAT_HEIGHT] + 1) // 2,
+    ], axis=1).astype(np.int64)
+
+    sum_x = np.bincount(flat, weights=np.broadcast_to(np.arange(w), (h, w)).ravel(),
+                        minlength=n_regions)
+    sum_y = np.bincount(flat, weights=np.repeat(np.arange(h), w), minlength=n_regions)
+    center = np.stack([sum_x, sum_y], axis=1) / area[:, None]
+
+    table = {
+        "color": color,
+        "area": area.astype(np.int64),
+        "bbox": bbox,
+        "center": center,
+    }
+    return region_ids, table
+
+
+def region_crop(region_ids: np.ndarray, bbox: np.ndarray, region_id: int,
+                pad: int = 0) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """
+    Binary mask of one region, cropped to its bounding box
+
+    Args:
+        region_ids: Region-id raster
+        bbox: The region's (x, y, width, height)
+        region_id: Region to extract
+        pad: Extra pixels on each side (clipped to the frame)
+
+    Returns:
+        Tuple of (uint8 0/255 mask, (x, y) offset of the crop in the frame)
+    """
+    h, w = region_ids.shape
+    x, y, bw, bh = (int(v) for v in bbox)
+    x0, y0 = max(0, x - pad), max(0, y - pad)
+    x1, y1 = min(w, x + bw + pad), min(h, y + bh + pad)
+
+    mask = (region_ids[y0:y1, x0:x1] == region_id).view(np.uint8)
+    mask *= 255
+    return mask, (x0, y0)
+
+
+def region_contour(mask: np.ndarray, offset: Tuple[int, int] = (0, 0)) -> Optional[np.ndarray]:
+    """
+    Outer contour of a region mask, in frame coordinates
+
+    Args:
+        mask: uint8 region mask (typically a bbox crop)
+        offset: (x, y) position of the mask in the frame
+
+    Returns:
+        Largest external contour, or None for an empty mask
+    """
+    cv2 = require_cv2()
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+                                   offset=tuple(int(v) for v in offset))
+    if not contours:
+        return None
+    return max(contours, key=cv2.contourArea)
@@ -0,0 +1,236 @@
+"""
+Region Merge Module - Absorbs undersized regions into their most similar neighbor
+
+Small regions are taken from a heap ordered by (area, distance to the most
+similar neighbor's color) and merged into that neighbor, with areas and
+adjacency updated incrementally, so the canvas stays fully covered by
+paintable regions. Each edge is touched a constant number of times per
+merge of one of its endpoints, giving O(E log E) on the region graph.
+"""
+
+import heapq
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from paint_by_numbers.core.region_graph import RegionGraph
+    from paint_by_numbers.core.region_labeling import RegionTable
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core.region_graph import RegionGraph
+    from core.region_labeling import RegionTable
+
+
+def absorb_small_regions(areas: np.ndarray, colors: np.ndarray, graph: RegionGraph,
+                         min_area: int, colors_lab: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Merge every region below ``min_area`` into an adjacent region
+
+    The smallest region is absorbed first, into the neighbor whose color is
+    closest (longest shared boundary breaks ties); the absorber keeps its
+    color and is re-queued if it is still too small. Neighbors of the
+    absorbed region that share the absorber's color become contiguous with
+    it and are merged as well, so no two adjacent regions share a color.
+    Regions without neighbors (a single-region canvas) are kept.
+
+    Args:
+        areas: (N,) region areas
+        colors: (N,) palette index of each region
+        graph: Adjacency graph over the N regions
+        min_area: Minimum area a region must reach
+        colors_lab: (N, 3) LAB color of each region (default: compare by
+                    shared boundary length only)
+
+    Returns:
+        (N,) index of the region each region ended up in
+    """
+    n = len(areas)
+    parent = np.arange(n)
+    area = np.asarray(areas, dtype=np.int64).copy()
+    color = np.asarray(colors)
+    lab = None if colors_lab is None else np.asarray(colors_lab, dtype=np.float64)
+
+    small = np.flatnonzero(area < min_area)
+    if len(small) == 0:
+        return parent
+
+    # Per-node {neighbor: shared boundary} maps, built lazily from the CSR graph
+    adjacency: Dict[int, Dict[int, int]] = {}
+
+    def neighbors(node: int) -> Dict[int, int]:
+        if node not in adjacency:
+            adjacency[node] = dict(zip(graph.neighbors(node).tolist(),
+                                       graph.boundary_lengths(node).tolist()))
+        return adjacency[node]
+
+    def distance(a: int, b: int) -> float:
+        if lab is None:
+            return 0.0
+        return float(np.sum((lab[a] - lab[b]) ** 2))
+
+    def best_neighbor(node: int) -> Tuple[float, int]:
+        best = (np.inf, -1)
+        best_boundary = -1
+        for other, boundary in neighbors(node).items():
+            dist = distance(node, other)
+            if dist < best[0] or (dist == best[0] and boundary > best_boundary):
+                best, best_boundary = (dist, other), boundary
+        return best
+
+    def merge(source: int, target: int):
+        """Fold source's area and edges into target (which keeps its color)."""
+        parent[source] = target
+        area[target] += area[source]
+        target_edges = neighbors(target)
+        target_edges.pop(source, None)
+        for other, boundary in neighbors(source).items():
+            if other == target:
+                continue
+            other_edges = neighbors(other)
+            del other_edges[source]
+            other_edges[target] = other_edges.get(target, 0) + boundary
+            target_edges[other] = target_edges.get(other, 0) + boundary
+        del adjacency[source]
+
+    heap = []
+    for node in small.tolist():
+        heap.append((int(area[node]), best_neighbor(node)[0], node))
+    heapq.heapify(heap)
+
+    while heap:
+        node_area, _, node = heapq.heappop(heap)
+        # Skip entries for merged nodes or outdated areas
+        if parent[node] != node or node_area != area[node] or area[node] >= min_area:
+            continue
+
+        _, target = best_neighbor(node)
+        if target < 0:
+            continue
+
+        former = [other for other in neighbors(node) if other != target]
+        merge(node, target)
+
+        # The absorbed region bridged these to the target
+        for other in former:
+            if parent[other] == other and color[other] == color[target]:
+                merge(other, target)
+
+        if area[target] < min_area:
+            heapq.heappush(heap, (int(area[target]), best_neighbor(target)[0], target))
+
+    # Resolve merge chains
+    while True:
+        grand = parent[parent]
+        if np.array_equal(grand, parent):
+            return parent
+        parent = grand
+
+
+def collapse_regions(region_ids: np.ndarray, table: RegionTable,
+                     root: np.ndarray) -> Tuple[np.ndarray, RegionTable]:
+    """
+    Apply a merge mapping to a region-id raster and its table
+
+    Args:
+        region_ids: Region-id raster
+        table: Region table for ``region_ids``
+        root: (N,) surviving region of every region
+
+    Returns:
+        Tuple of (region-id raster with consecutive ids, region table)
+    """
+    survivors, new_of = np.unique(root, return_inverse=True)
+    if len(survivors) == len(root):
+        return region_ids, table
+
+    n = len(survivors)
+    area = np.bincount(new_of, weights=table["area"], minlength=n)
+
+    x0, y0, w, h = table["bbox"].T
+    left = np.full(n, np.iinfo(np.int64).max)
+    top = np.full(n, np.iinfo(np.int64).max)
+    right = np.zeros(n, dtype=np.int64)
+    bottom = np.zeros(n, dtype=np.int64)
+    np.minimum.at(left, new_of, x0)
+    np.minimum.at(top, new_of, y0)
+    np.maximum.at(right, new_of, x0 + w)
+    np.maximum.at(bottom, new_of, y0 + h)
+
+    weighted = table["center"] * table["area"][:, None]
+    center = np.stack([np.bincount(new_of, weights=weighted[:, 0], minlength=n),
+                       np.bincount(new_of, weights=weighted[:, 1], minlength=n)], axis=1)
+
+    merged = {
+        "color": table["color"][survivors],
+        "area": area.astype(np.int64),
+        "bbox": np.stack([left, top, right - left, bottom - top], axis=1),
+        "center": center / area[:, None],
+    }
+    return new_of.astype(np.int32)[region_ids], merged
+
+
+def merge_region_groups(regions: List, root: np.ndarray) -> List[Tuple[int, List]]:
+    """
+    Group region objects by the region they were merged into
+
+    Args:
+        regions: Region objects, indexed like ``root``
+        root: (N,) surviving region of every region
+
+    Returns:
+        List of (survivor index, member regions) in survivor order
+    """
+    groups: Dict[int, List] = {}
+    for index, target in enumerate(root.tolist()):
+        groups.setdefault(target, []).append(regions[index])
+    return sorted(groups.items())
+
+
+def group_nearby_boxes(bboxes: np.ndarray, margin: int) -> List[np.ndarray]:
+    """
+    Group boxes that overlap once grown by ``margin`` on every side
+
+    Args:
+        bboxes: (N, 4) boxes as (x, y, width, height)
+        margin: Growth on each side
+
+    Returns:
+        List of index arrays, one per connected group
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    n = len(bboxes)
+    x0 = bboxes[:, 0] - margin
+    y0 = bboxes[:, 1] - margin
+    x1 = bboxes[:, 0] + bboxes[:, 2] + margin
+    y1 = bboxes[:, 1] + bboxes[:, 3] + margin
+
+    # Sweep along x: boxes sorted by left edge only need comparing with the
+    # boxes that start before they end
+    order = np.argsort(x0, kind="stable")
+    x0, y0, x1, y1 = x0[order], y0[order], x1[order], y1[order]
+    reach = np.searchsorted(x0, x1, side="left")
+
+    rows, cols = [], []
+    for i in range(n):
+        j = np.arange(i + 1, reach[i])
+        if len(j) == 0:
+            continue
+        j = j[(y0[j] < y1[i]) & (y0[i] < y1[j])]
+        rows.append(np.full(len(j), i))
+        cols.append(j)
+
+    if rows:
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+    else:
+        rows = cols = np.zeros(0, dtype=np.int64)
+
+    graph = coo_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n, n))
+    n_groups, group_of = connected_components(graph, directed=False)
+
+    sorted_groups = np.argsort(group_of, kind="stable")
+    bounds = np.cumsum(np.bincount(group_of, minlength=n_groups))[:-1]
+    return [order[members] for members in np.split(sorted_groups, bounds)]
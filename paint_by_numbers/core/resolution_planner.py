@@ -0,0 +1,159 @@
+"""
+Resolution Planner Module - Decides the working resolution before any pixel is resampled
+"""
+
+import numpy as np
+from dataclasses import dataclass, asdict
+from typing import Callable, Optional, Tuple
+
+try:
+    from paint_by_numbers.utils.opencv import require_cv2
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from utils.opencv import require_cv2
+
+
+@dataclass
+class ResolutionPlan:
+    """
+    Where the source pixels end up in the working image.
+
+    The source is resampled once to ``content_size`` and placed at
+    ``offset`` on a canvas of ``canvas_size`` (the two only differ when a
+    paper format adds borders).
+    """
+    source_size: Tuple[int, int]
+    content_size: Tuple[int, int]
+    canvas_size: Tuple[int, int]
+    upscale_requested: bool = False
+    paper_format: Optional[str] = None
+
+    @property
+    def scale(self) -> float:
+        """Net linear scale from source to working resolution"""
+        return self.content_size[0] / self.source_size[0]
+
+    @property
+    def offset(self) -> Tuple[int, int]:
+        """(x, y) position of the content on the canvas"""
+        return ((self.canvas_size[0] - self.content_size[0]) // 2,
+                (self.canvas_size[1] - self.content_size[1]) // 2)
+
+    @property
+    def needs_resample(self) -> bool:
+        """True if the source pixels have to be resized at all"""
+        return self.content_size != self.source_size
+
+    @property
+    def is_upscale(self) -> bool:
+        """True if the content ends up larger than the source"""
+        return self.content_size[0] > self.source_size[0] or self.content_size[1] > self.source_size[1]
+
+    @property
+    def enhance(self) -> bool:
+        """Run the upscaler's clean-up chain: only for real, requested enlargements"""
+        return self.upscale_requested and self.is_upscale
+
+    def to_dict(self) -> dict:
+        """Convert to a JSON-friendly dictionary"""
+        data = asdict(self)
+        data.update(scale=self.scale, offset=self.offset, enhanced=self.enhance)
+        return data
+
+
+def plan_resolution(source_size: Tuple[int, int],
+                    max_size: Tuple[int, int],
+                    paper_format=None,
+                    upscaler=None) -> ResolutionPlan:
+    """
+    Compute the final working resolution up front
+
+    Composes the three size decisions the pipeline used to apply one after
+    another — the upscaler's target, the paper format's contain-fit and the
+    ``MAX_IMAGE_SIZE`` cap — into a single source → working mapping.
+
+    Args:
+        source_size: Source (width, height)
+        max_size: Maximum working (width, height), i.e. ``MAX_IMAGE_SIZE``
+        paper_format: Optional PaperFormat; the image is fitted inside its
+                      ``dimensions`` with borders
+        upscaler: Optional IntelligentUpscaler deciding whether small
+                  images are enlarged and to what size
+
+    Returns:
+        ResolutionPlan
+    """
+    width, height = (int(v) for v in source_size)
+    upscale_requested = upscaler is not None and upscaler.size_needs_upscaling(width, height)
+
+    if paper_format is not None:
+        canvas_w, canvas_h = paper_format.dimensions
+        scale = min(canvas_w / width, canvas_h / height)
+        content_w, content_h = int(width * scale), int(height * scale)
+    elif upscale_requested:
+        content_w, content_h = upscaler.optimal_size_for(width, height)
+        canvas_w, canvas_h = content_w, content_h
+    else:
+        content_w, content_h = canvas_w, canvas_h = width, height
+
+    # Same rule as resize_image: shrink the whole canvas to fit, never grow it
+    max_w, max_h = max_size
+    cap = min(max_w / canvas_w, max_h / canvas_h, 1.0)
+    if cap < 1.0:
+        new_canvas_w, new_canvas_h = int(canvas_w * cap), int(canvas_h * cap)
+        content_w = min(new_canvas_w, max(1, round(content_w * cap)))
+        content_h = min(new_canvas_h, max(1, round(content_h * cap)))
+        canvas_w, canvas_h = new_canvas_w, new_canvas_h
+
+    return ResolutionPlan(
+        source_size=(width, height),
+        content_size=(int(content_w), int(content_h)),
+        canvas_size=(int(canvas_w), int(canvas_h)),
+        upscale_requested=upscale_requested,
+        paper_format=getattr(paper_format, 'name', None)
+    )
+
+
+def apply_resolution_plan(image: np.ndarray, plan: ResolutionPlan,
+                          has_faces: bool = False,
+                          enhance: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                          background_color: Tuple[int, int, int] = (255, 255, 255)) -> np.ndarray:
+    """
+    Resample an image once according to a plan and place it on its canvas
+
+    Args:
+        image: Source RGB image matching ``plan.source_size``
+        plan: Plan from ``plan_resolution``
+        has_faces: Prefer LANCZOS4 when enlarging portraits
+        enhance: Clean-up run on the resampled content (before borders are
+                 added) when ``plan.enhance`` is set
+        background_color: Border color when the canvas is larger than the content
+
+    Returns:
+        Working image of ``plan.canvas_size``
+    """
+    cv2 = require_cv2()
+    content = image
+
+    if plan.needs_resample:
+        if not plan.is_upscale:
+            interpolation = cv2.INTER_AREA
+        elif plan.upscale_requested and not has_faces:
+            interpolation = cv2.INTER_CUBIC
+        else:
+            interpolation = cv2.INTER_LANCZOS4
+        content = cv2.resize(image, plan.content_size, interpolation=interpolation)
+
+    if enhance is not None and plan.enhance:
+        content = enhance(content)
+
+    if plan.canvas_size == plan.content_size:
+        return content
+
+    canvas_w, canvas_h = plan.canvas_size
+    canvas = np.full((canvas_h, canvas_w, 3), background_color, dtype=np.uint8)
+    x, y = plan.offset
+    canvas[y:y + plan.content_size[1], x:x + plan.content_size[0]] = content
+    return canvas
@@ -0,0 +1,596 @@
+"""
+Streaming Pipeline Module - Tile-by-tile quantization and region labeling for very large images
+
+The regular pipeline keeps several full-frame copies of the image in memory,
+which is why ``ImageProcessor.load_image`` caps images at
+``MAX_IMAGE_DIMENSION``. This mode keeps every full-size array in a
+disk-backed ``.npy`` memory map and only ever materializes one tile
+(plus halo) at a time:
+
+1. Pixels are memory-mapped straight from uncompressed files, or decoded
+   once (within ``STREAMING_DECODE_BUDGET_MB``) and spilled to a scratch
+   memmap strip by strip.
+2. The palette is fit on a color histogram accumulated tile by tile.
+3. Labels are assigned per tile, optionally smoothed with a majority filter.
+4. Regions are labeled per tile and stitched across tile seams with a
+   union-find pass, giving a global region-id raster and a region table.
+"""
+
+import shutil
+import struct
+import tempfile
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    from paint_by_numbers.config import Config
+    from paint_by_numbers.logger import logger
+    from paint_by_numbers.utils.opencv import require_cv2
+    from paint_by_numbers.utils.helpers import majority_filter_labels
+    from paint_by_numbers.core.color_assignment import PaletteAssigner, compact_label_dtype
+    from paint_by_numbers.core.palette_lut import to_metric_space
+    from paint_by_numbers.core.kmeans_engine import make_kmeans
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from config import Config
+    from logger import logger
+    from utils.opencv import require_cv2
+    from utils.helpers import majority_filter_labels
+    from core.color_assignment import PaletteAssigner, compact_label_dtype
+    from core.palette_lut import to_metric_space
+    from core.kmeans_engine import make_kmeans
+
+
+# (y0, y1, x0, x1)
+Box = Tuple[int, int, int, int]
+
+
+def iter_tiles(height: int, width: int, tile_size: int) -> Iterator[Box]:
+    """
+    Non-overlapping tiles covering a frame, in row-major order
+
+    Args:
+        height: Frame height
+        width: Frame width
+        tile_size: Tile edge length
+
+    Yields:
+        (y0, y1, x0, x1) boxes
+    """
+    tile_size = max(1, int(tile_size))
+    for y0 in range(0, height, tile_size):
+        for x0 in range(0, width, tile_size):
+            yield y0, min(y0 + tile_size, height), x0, min(x0 + tile_size, width)
+
+
+def _raw_rgb_offset(img) -> Optional[int]:
+    """Byte offset of an uncompressed, top-down, packed RGB pixel block, else None."""
+    if img.mode != "RGB" or len(img.tile) != 1:
+        return None
+
+    codec, extents, offset, args = img.tile[0][:4]
+    if isinstance(args, str):
+        args = (args,)
+    rawmode, stride, ystep = (tuple(args) + (0, 1))[:3]
+
+    if codec != "raw" or rawmode != "RGB" or stride not in (0, img.size[0] * 3) or ystep != 1:
+        return None
+    if tuple(extents) != (0, 0) + img.size:
+        return None
+    return offset
+
+
+def _open_unchecked(path: Path):
+    """
+    Open an image with Pillow, skipping its decompression-bomb check
+
+    ``Image.open`` rejects large frames based on the process-wide
+    ``Image.MAX_IMAGE_PIXELS``. Changing that global would also lift the
+    guard for every other thread of the process, so the plugin is picked
+    here the same way and the caller checks the header size against its
+    own limit instead.
+
+    Args:
+        path: Image file
+
+    Returns:
+        Lazily loaded PIL image (owns its file handle)
+
+    Raises:
+        ValueError: If no Pillow plugin recognizes the file
+    """
+    from PIL import Image
+
+    Image.init()
+    with open(path, "rb") as fp:
+        prefix = fp.read(16)
+
+    for fmt in Image.ID:
+        factory, accept = Image.OPEN[fmt]
+        accepted = not accept or accept(prefix)
+        # Newer Pillow returns a warning string for near-misses
+        if not accepted or isinstance(accepted, str):
+            continue
+        try:
+            return factory(str(path), str(path))
+        except (SyntaxError, IndexError, TypeError, struct.error):
+            continue
+
+    raise ValueError(f"Cannot identify image file: {path}")
+
+
+def _decoded_bytes(img) -> int:
+    """Memory Pillow needs to hold ``img`` fully decoded."""
+    if img.mode in ("1", "L", "P"):
+        per_pixel = 1
+    elif img.mode.startswith("I;16"):
+        per_pixel = 2
+    else:
+        # Multi-band modes are stored as 4 bytes per pixel
+        per_pixel = 4
+    return img.size[0] * img.size[1] * per_pixel
+
+
+def _apply_orientation(pixels: np.ndarray, orientation: int) -> np.ndarray:
+    """EXIF orientation as a numpy view, so no pixels are copied."""
+    if orientation in (5, 6, 7, 8):
+        pixels = pixels.swapaxes(0, 1)
+    flip_rows = orientation in (3, 4, 6, 7)
+    flip_cols = orientation in (2, 3, 7, 8)
+    # After the transpose, tags 6 and 8 are a flip of columns/rows respectively
+    if orientation == 6:
+        flip_rows, flip_cols = False, True
+    elif orientation == 8:
+        flip_rows, flip_cols = True, False
+    if flip_rows:
+        pixels = pixels[::-1]
+    if flip_cols:
+        pixels = pixels[:, ::-1]
+    return pixels
+
+
+def open_image_strips(image_path: str, scratch_dir: Path, max_dimension: int,
+                      min_size: Tuple[int, int] = (1, 1), strip_rows: int = 256,
+                      decode_budget_mb: Optional[float] = None) -> np.ndarray:
+    """
+    Open an image as a read-only (H, W, 3) uint8 RGB memory map
+
+    Uncompressed RGB files (PPM, plain TIFF) are mapped in place, so no pixel
+    is read until a tile asks for it. Pillow has no strip decoder for
+    compressed formats (JPEG, PNG), so they are decoded once, converted to
+    RGB strip by strip and copied into a scratch ``.npy``; that decode is
+    the only step holding a full frame in memory, and it is refused when it
+    would exceed ``decode_budget_mb``.
+
+    Args:
+        image_path: Path to the image
+        scratch_dir: Directory for the decoded copy
+        max_dimension: Largest accepted width or height
+        min_size: Smallest accepted (width, height)
+        strip_rows: Rows copied per strip when spilling a decoded image
+        decode_budget_mb: Largest full-frame decode allowed (None = no limit)
+
+    Returns:
+        Memory-mapped pixels (possibly a transposed/flipped view for EXIF orientation)
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If the image is too small or too large, or a compressed
+                    image would need more than ``decode_budget_mb`` to decode
+    """
+    path = Path(image_path)
+    if not path.is_file():
+        raise FileNotFoundError(f"Image file not found: {image_path}")
+
+    # The header size is checked against max_dimension instead of Pillow's
+    # decompression-bomb limit, which would reject the images this mode is for
+    with _open_unchecked(path) as img:
+        w, h = img.size
+        min_w, min_h = min_size
+        if w < min_w or h < min_h:
+            raise ValueError(f"Image too small. Minimum size is {min_w}x{min_h}, got {w}x{h}")
+        if w > max_dimension or h > max_dimension:
+            raise ValueError(
+                f"Image dimensions too large: {w}x{h}. "
+                f"Maximum dimension in streaming mode is {max_dimension} pixels."
+            )
+
+        orientation = img.getexif().get(0x0112, 1)
+        offset = _raw_rgb_offset(img)
+
+        if offset is not None:
+            logger.info(f"Memory-mapping {w}x{h} uncompressed pixels in place")
+            pixels = np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(h, w, 3))
+        else:
+            decode_mb = _decoded_bytes(img) / (1024 * 1024)
+            if decode_budget_mb is not None and decode_mb > decode_budget_mb:
+                raise ValueError(
+                    f"Decoding this {w}x{h} {img.format or 'compressed'} image needs "
+                    f"{decode_mb:.0f} MB, over the {decode_budget_mb:.0f} MB streaming budget. "
+                    f"Convert it to uncompressed PPM or TIFF, which is memory-mapped instead."
+                )
+
+            logger.info(f"Decoding {w}x{h} image ({decode_mb:.0f} MB) into a scratch memory map")
+            img.load()
+            # Strips are converted one at a time, so non-RGB modes never get a
+            # second full frame, and written with plain file writes, so the
+            # copy sits in the page cache rather than this process's memory
+            with open(scratch_dir / "decoded.npy", "wb") as f:
+                np.lib.format.write_array_header_1_0(f, {
+                    "descr": np.lib.format.dtype_to_descr(np.dtype(np.uint8)),
+                    "fortran_order": False,
+                    "shape": (h, w, 3),
+                })
+                for y0 in range(0, h, strip_rows):
+                    strip = img.crop((0, y0, w, min(y0 + strip_rows, h)))
+                    if strip.mode != "RGB":
+                        strip = strip.convert("RGB")
+                    f.write(np.asarray(strip).tobytes())
+            pixels = np.load(scratch_dir / "decoded.npy", mmap_mode="r")
+
+    return _apply_orientation(pixels, orientation)
+
+
+class StreamingPipeline:
+    """
+    Quantizes and labels arbitrarily large images with tile-bounded memory.
+
+    Full-size results (labels and region ids) are ``.npy`` memory maps, so
+    they can be opened later with ``np.load(path, mmap_mode='r')``.
+    """
+
+    def __init__(self, config: Optional[Config] = None):
+        """
+        Initialize streaming pipeline
+
+        Args:
+            config: Configuration object
+        """
+        self.config = config or Config()
+        self.tile_size = int(getattr(self.config, "STREAMING_TILE_SIZE", 1024))
+        self.metric = getattr(self.config, "PALETTE_DISTANCE_METRIC", "lab").lower()
+        self.metadata = {}
+
+    def build_palette(self, pixels: np.ndarray, n_colors: int,
+                      random_state: int = 42) -> np.ndarray:
+        """
+        Fit a palette on a color histogram accumulated tile by tile
+
+        Args:
+            pixels: (H, W, 3) uint8 RGB image (memmap)
+            n_colors: Number of palette colors
+            random_state: Random state for K-means
+
+        Returns:
+            Palette (K, 3) uint8 RGB, sorted by luminance
+        """
+        bits = int(np.clip(getattr(self.config, "STREAMING_HISTOGRAM_BITS", 6), 1, 8))
+        shift = 8 - bits
+        n_bins = 1 << (3 * bits)
+        counts = np.zeros(n_bins, dtype=np.int64)
+        sums = np.zeros((3, n_bins), dtype=np.float64)
+
+        h, w = pixels.shape[:2]
+        for y0, y1, x0, x1 in iter_tiles(h, w, self.tile_size):
+            flat = np.ascontiguousarray(pixels[y0:y1, x0:x1]).reshape(-1, 3)
+            binned = (flat >> shift).astype(np.int64)
+            keys = (binned[:, 0] << (2 * bits)) | (binned[:, 1] << bits) | binned[:, 2]
+            counts += np.bincount(keys, minlength=n_bins)
+            for channel in range(3):
+                sums[channel] += np.bincount(keys, weights=flat[:, channel], minlength=n_bins)
+
+        occupied = np.flatnonzero(counts)
+        weights = counts[occupied]
+        # Each bin is represented by the mean of its members
+        colors = np.round(sums[:, occupied].T / weights[:, None]).astype(np.uint8)
+        logger.info(f"Streamed histogram: {len(colors)} occupied bins at {bits} bits/channel")
+
+        if len(colors) <= n_colors:
+            palette = colors
+        else:
+            samples = to_metric_space(colors, self.metric)
+            kmeans = make_kmeans(len(samples), n_colors, random_state)
+            kmeans.fit(samples, sample_weight=weights)
+            palette = self._metric_to_rgb(kmeans.cluster_centers_)
+
+        luminance = 0.299 * palette[:, 0] + 0.587 * palette[:, 1] + 0.114 * palette[:, 2]
+        return palette[np.argsort(luminance)]
+
+    def _metric_to_rgb(self, centers: np.ndarray) -> np.ndarray:
+        """Convert cluster centers from the metric space back to uint8 RGB."""
+        centers = np.clip(np.round(centers), 0, 255).astype(np.uint8).reshape(-1, 1, 3)
+        if self.metric in ("lab", "hsv"):
+            cv2 = require_cv2()
+            code = cv2.COLOR_LAB2RGB if self.metric == "lab" else cv2.COLOR_HSV2RGB
+            centers = cv2.cvtColor(centers, code)
+        return centers.reshape(-1, 3)
+
+    def assign_labels(self, pixels: np.ndarray, palette: np.ndarray, path: Path) -> np.ndarray:
+        """
+        Assign every pixel to its nearest palette color, tile by tile
+
+        Args:
+            pixels: (H, W, 3) uint8 RGB image (memmap)
+            palette: Palette (K, 3) uint8 RGB
+            path: Output ``.npy`` path for the label map
+
+        Returns:
+            (H, W) compact label memmap
+        """
+        h, w = pixels.shape[:2]
+        labels = np.lib.format.open_memmap(
+            str(path), mode="w+", dtype=compact_label_dtype(len(palette)), shape=(h, w)
+        )
+        assigner = PaletteAssigner(
+            to_metric_space(palette, self.metric),
+            memory_limit_mb=getattr(self.config, "ASSIGNMENT_MEMORY_MB", None)
+        )
+
+        for y0, y1, x0, x1 in iter_tiles(h, w, self.tile_size):
+            tile = np.ascontiguousarray(pixels[y0:y1, x0:x1])
+            labels[y0:y1, x0:x1] = assigner(to_metric_space(tile, self.metric))
+
+        labels.flush()
+        return labels
+
+    def smooth_labels(self, labels: np.ndarray, path: Path, window_size: int) -> np.ndarray:
+        """
+        Majority-filter a label map tile by tile
+
+        Each tile reads a halo of ``window_size // 2`` pixels, so the result
+        matches filtering the whole map at once.
+
+        Args:
+            labels: (H, W) label memmap
+            path: Output ``.npy`` path
+            window_size: Odd majority window side length
+
+        Returns:
+            (H, W) smoothed label memmap
+        """
+        h, w = labels.shape
+        r = window_size // 2
+        smoothed = np.lib.format.open_memmap(str(path), mode="w+", dtype=labels.dtype, shape=(h, w))
+
+        for y0, y1, x0, x1 in iter_tiles(h, w, self.tile_size):
+            ry0, ry1, rx0, rx1 = max(0, y0 - r), min(h, y1 + r), max(0, x0 - r), min(w, x1 + r)
+            filtered = majority_filter_labels(np.ascontiguousarray(labels[ry0:ry1, rx0:rx1]), window_size)
+            # Read windows stop at the frame edge, so border pixels stay unchanged
+            # exactly as in the full-frame filter
+            smoothed[y0:y1, x0:x1] = filtered[y0 - ry0:y1 - ry0, x0 - rx0:x1 - rx0]
+
+        smoothed.flush()
+        return smoothed
+
+    def label_regions(self, labels: np.ndarray, n_colors: int,
+                      path: Path) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Label 4-connected same-color regions with seams stitched across tiles
+
+        Components are found per tile and color, given provisional ids, and
+        merged with union-find wherever two touching pixels on opposite
+        sides of a tile seam share a color.
+
+        Args:
+            labels: (H, W) label memmap
+            n_colors: Palette size
+            path: Output ``.npy`` path for the region-id raster
+
+        Returns:
+            Tuple of (region-id memmap (H, W) int32, region table with
+            'color', 'area', 'bbox' (x, y, w, h) and 'center' (x, y) arrays)
+        """
+        cv2 = require_cv2()
+        h, w = labels.shape
+        region_ids = np.lib.format.open_memmap(str(path), mode="w+", dtype=np.int32, shape=(h, w))
+
+        colors, areas, boxes, sums = [], [], [], []
+        next_id = 0
+
+        for y0, y1, x0, x1 in iter_tiles(h, w, self.tile_size):
+            tile = np.ascontiguousarray(labels[y0:y1, x0:x1])
+            tile_ids = np.empty(tile.shape, dtype=np.int32)
+
+            for color in np.flatnonzero(np.bincount(tile.ravel(), minlength=n_colors)):
+                mask = tile == color
+                n, components, stats, centroids = cv2.connectedComponentsWithStats(
+                    mask.view(np.uint8), connectivity=4, ltype=cv2.CV_32S
+                )
+                # Component 0 is everything outside the mask
+                tile_ids[mask] = components[mask] + (next_id - 1)
+
+                stats, centroids = stats[1:], centroids[1:]
+                area = stats[:, cv2.CC_STAT_AREA].astype(np.int64)
+                colors.append(np.full(n - 1, color, dtype=np.int32))
+                areas.append(area)
+                boxes.append(np.stack([
+                    stats[:, cv2.CC_STAT_LEFT] + x0,
+                    stats[:, cv2.CC_STAT_TOP] + y0,
+                    stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH] + x0,
+                    stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT] + y0,
+                ], axis=1).astype(np.int64))
+                sums.append((centroids + (x0, y0)) * area[:, None])
+                next_id += n - 1
+
+            region_ids[y0:y1, x0:x1] = tile_ids
+
+        colors = np.concatenate(colors)
+        areas = np.concatenate(areas)
+        boxes = np.concatenate(boxes)
+        sums = np.concatenate(sums)
+
+        roots = self._stitch_seams(labels, region_ids, next_id)
+
+        # Merge per-tile statistics onto their stitched root, then renumber densely
+        unique_roots, dense = np.unique(roots, return_inverse=True)
+        n_regions = len(unique_roots)
+        merged_area = np.bincount(dense, weights=areas, minlength=n_regions).astype(np.int64)
+        merged_color = np.empty(n_regions, dtype=np.int32)
+        merged_color[dense] = colors
+        bbox_min = np.full((n_regions, 2), np.iinfo(np.int64).max, dtype=np.int64)
+        bbox_max = np.zeros((n_regions, 2), dtype=np.int64)
+        np.minimum.at(bbox_min, dense, boxes[:, :2])
+        np.maximum.at(bbox_max, dense, boxes[:, 2:])
+        center = np.stack([np.bincount(dense, weights=sums[:, axis], minlength=n_regions)
+                           for axis in range(2)], axis=1) / merged_area[:, None]
+
+        dense = dense.astype(np.int32)
+        for y0, y1, x0, x1 in iter_tiles(h, w, self.tile_size):
+            region_ids[y0:y1, x0:x1] = dense[region_ids[y0:y1, x0:x1]]
+        region_ids.flush()
+
+        table = {
+            "color": merged_color,
+            "area": merged_area,
+            "bbox": np.concatenate([bbox_min, bbox_max - bbox_min], axis=1),
+            "center": center,
+        }
+        return region_ids, table
+
+    def _stitch_seams(self, labels: np.ndarray, region_ids: np.ndarray, n_ids: int) -> np.ndarray:
+        """
+        Union provisional regions that touch across tile seams
+
+        Args:
+            labels: (H, W) label memmap
+            region_ids: (H, W) provisional region ids
+            n_ids: Number of provisional ids
+
+        Returns:
+            Root id for every provisional id
+        """
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        h, w = labels.shape
+        pairs = []
+
+        # Vertical seams: one column pair per tile column boundary
+        for x in range(self.tile_size, w, self.tile_size):
+            for y0 in range(0, h, self.tile_size):
+                y1 = min(y0 + self.tile_size, h)
+                same = labels[y0:y1, x - 1] == labels[y0:y1, x]
+                pairs.append(np.stack([region_ids[y0:y1, x - 1][same],
+                                       region_ids[y0:y1, x][same]], axis=1))
+
+        # Horizontal seams: one row pair per tile row boundary
+        for y in range(self.tile_size, h, self.tile_size):
+            for x0 in range(0, w, self.tile_size):
+                x1 = min(x0 + self.tile_size, w)
+                same = labels[y - 1, x0:x1] == labels[y, x0:x1]
+                pairs.append(np.stack([region_ids[y - 1, x0:x1][same],
+                                       region_ids[y, x0:x1][same]], axis=1))
+
+        if not pairs:
+            return np.arange(n_ids)
+
+        edges = np.unique(np.concatenate(pairs), axis=0)
+        graph = coo_matrix((np.ones(len(edges), dtype=np.int8), (edges[:, 0], edges[:, 1])),
+                           shape=(n_ids, n_ids))
+        _, roots = connected_components(graph, directed=False)
+        return roots
+
+    def render_preview(self, labels: np.ndarray, palette: np.ndarray,
+                       max_dimension: int) -> np.ndarray:
+        """
+        Small RGB rendering of the label map for quick inspection
+
+        Args:
+            labels: (H, W) label memmap
+            palette: Palette (K, 3) uint8 RGB
+            max_dimension: Longest side of the preview
+
+        Returns:
+            uint8 RGB preview
+        """
+        h, w = labels.shape
+        step = max(1, int(np.ceil(max(h, w) / max_dimension)))
+        return palette[np.asarray(labels[::step, ::step])]
+
+    def run(self, image_path: str, output_dir: str, n_colors: Optional[int] = None) -> Dict:
+        """
+        Quantize and label an image in streaming mode
+
+        Args:
+            image_path: Path to the image
+            output_dir: Directory for the label map, region raster and table
+            n_colors: Number of colors (None uses default)
+
+        Returns:
+            Dictionary with output paths, palette and region statistics
+        """
+        cv2 = require_cv2()
+        start = time.perf_counter()
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        stem = Path(image_path).stem
+
+        if n_colors is None:
+            n_colors = self.config.DEFAULT_NUM_COLORS
+        n_colors = max(self.config.MIN_NUM_COLORS, min(n_colors, self.config.MAX_NUM_COLORS))
+
+        scratch_root = getattr(self.config, "STREAMING_SCRATCH_DIR", None)
+        scratch_dir = Path(tempfile.mkdtemp(prefix="pbn_stream_", dir=scratch_root))
+        try:
+            pixels = open_image_strips(
+                image_path, scratch_dir,
+                max_dimension=int(getattr(self.config, "STREAMING_MAX_DIMENSION", 65500)),
+                min_size=self.config.MIN_IMAGE_SIZE,
+                decode_budget_mb=getattr(self.config, "STREAMING_DECODE_BUDGET_MB", None)
+            )
+            h, w = pixels.shape[:2]
+            logger.info(f"Streaming {w}x{h} image in {self.tile_size}px tiles")
+
+            palette = self.build_palette(pixels, n_colors)
+            labels_path = output_path / f"{stem}_labels.npy"
+            labels = self.assign_labels(pixels, palette, labels_path)
+            del pixels
+
+            window = int(getattr(self.config, "STREAMING_SMOOTHING_WINDOW", 5))
+            if window > 1:
+                smoothed_path = scratch_dir / "smoothed.npy"
+                smoothed = self.smooth_labels(labels, smoothed_path, window | 1)
+                del labels, smoothed
+                shutil.move(str(smoothed_path), str(labels_path))
+                labels = np.load(labels_path, mmap_mode="r")
+
+            regions_path = output_path / f"{stem}_regions.npy"
+            region_ids, table = self.label_regions(labels, len(palette), regions_path)
+            del region_ids
+
+            table_path = output_path / f"{stem}_regions.npz"
+            np.savez(table_path, palette=palette, **table)
+
+            preview = self.render_preview(
+                labels, palette, int(getattr(self.config, "STREAMING_PREVIEW_SIZE", 2000))
+            )
+            preview_path = output_path / f"{stem}_preview.png"
+            cv2.imwrite(str(preview_path), cv2.cvtColor(preview, cv2.COLOR_RGB2BGR))
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+        min_area = self.config.MIN_REGION_SIZE
+        self.metadata = {
+            "width": w,
+            "height": h,
+            "tile_size": self.tile_size,
+            "colors": len(palette),
+            "regions": int(len(table["area"])),
+            "numbered_regions": int(np.sum(table["area"] >= min_area)),
+            "seconds": time.perf_counter() - start,
+        }
+        logger.info(f"Streaming pipeline: {self.metadata['regions']} regions "
+                    f"({self.metadata['numbered_regions']} of at least {min_area}px) "
+                    f"in {self.metadata['seconds']:.1f}s")
+
+        return {
+            "palette": palette,
+            "labels": str(labels_path),
+            "regions": str(regions_path),
+            "region_table": str(table_path),
+            "preview": str(preview_path),
+            "metadata": self.metadata,
+        }
@@ -0,0 +1,239 @@
+"""
+Tiled Preprocess Module - Process-parallel spatial filtering over overlapping tiles
+"""
+
+import multiprocessing
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from paint_by_numbers.utils.opencv import require_cv2
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from utils.opencv import require_cv2
+
+
+# A filter spec is (name, params); specs are plain data so they pickle cheaply
+FilterSpec = Tuple[str, Dict]
+
+# (y0, y1, x0, x1)
+Box = Tuple[int, int, int, int]
+
+
+def spatial_filter_specs(config, apply_gaussian: bool = True,
+                         apply_bilateral: bool = True,
+                         denoise: str = "nlm") -> List[FilterSpec]:
+    """
+    Neighborhood filters ImageProcessor.preprocess runs before CLAHE, in order
+
+    Args:
+        config: Configuration object
+        apply_gaussian: Include the Gaussian blur
+        apply_bilateral: Include the bilateral filter
+        denoise: Denoise branch when APPLY_DENOISE is set: 'nlm'
+                 (non-local means), 'bilateral' (light bilateral) or 'skip'
+
+    Returns:
+        List of filter specs
+    """
+    specs = []
+
+    if not getattr(config, "APPLY_DENOISE", False):
+        denoise = "skip"
+
+    if denoise == "bilateral":
+        specs.append(("bilateral", {
+            "d": int(getattr(config, "DENOISE_BILATERAL_D", 5)),
+            "sigma_color": float(getattr(config, "DENOISE_BILATERAL_SIGMA_COLOR", 25)),
+            "sigma_space": float(getattr(config, "DENOISE_BILATERAL_SIGMA_SPACE", 5)),
+        }))
+    elif denoise == "nlm":
+        specs.append(("denoise", {
+            "h": float(getattr(config, "DENOISE_STRENGTH", 7)),
+            "h_color": float(getattr(config, "DENOISE_COLOR_STRENGTH", 7)),
+            "template_window": 7,
+            "search_window": 21,
+        }))
+
+    if apply_gaussian:
+        specs.append(("gaussian", {"ksize": tuple(config.GAUSSIAN_BLUR_KERNEL)}))
+
+    if apply_bilateral:
+        specs.append(("bilateral", {
+            "d": int(config.BILATERAL_FILTER_D),
+            "sigma_color": float(config.BILATERAL_SIGMA_COLOR),
+            "sigma_space": float(config.BILATERAL_SIGMA_SPACE),
+        }))
+
+    return specs
+
+
+def filter_halo(spec: FilterSpec) -> int:
+    """
+    Pixels of context a filter reads on each side of an output pixel
+
+    Args:
+        spec: Filter spec
+
+    Returns:
+        Halo width in pixels
+    """
+    name, params = spec
+    if name == "denoise":
+        return params["template_window"] // 2 + params["search_window"] // 2
+    if name == "gaussian":
+        return max(params["ksize"]) // 2
+    if name == "bilateral":
+        if params["d"] > 0:
+            return params["d"] // 2
+        # OpenCV derives the diameter from sigmaSpace when d <= 0
+        return int(round(params["sigma_space"] * 1.5))
+    raise ValueError(f"Unknown filter '{name}'")
+
+
+def apply_spatial_filters(image: np.ndarray, specs: List[FilterSpec]) -> np.ndarray:
+    """
+    Run a chain of filters on one image (or tile) in the current thread
+
+    Args:
+        image: uint8 RGB image
+        specs: Filter specs, applied in order
+
+    Returns:
+        Filtered image
+    """
+    cv2 = require_cv2()
+    result = image
+
+    for name, params in specs:
+        if name == "denoise":
+            if not hasattr(cv2, "fastNlMeansDenoisingColored"):
+                continue
+            result = cv2.fastNlMeansDenoisingColored(
+                result, None, params["h"], params["h_color"],
+                params["template_window"], params["search_window"]
+            )
+        elif name == "gaussian":
+            result = cv2.GaussianBlur(result, params["ksize"], 0)
+        elif name == "bilateral":
+            result = cv2.bilateralFilter(
+                result,
+                d=params["d"],
+                sigmaColor=params["sigma_color"],
+                sigmaSpace=params["sigma_space"]
+            )
+        else:
+            raise ValueError(f"Unknown filter '{name}'")
+
+    return result
+
+
+def plan_tiles(height: int, width: int, tile_size: int, halo: int) -> List[Tuple[Box, Box]]:
+    """
+    Split a frame into tiles, each with a halo-extended read window
+
+    Read windows are clipped to the frame, so tiles on the border see the
+    real image edge and the filters' own border handling applies exactly as
+    it would on the full frame.
+
+    Args:
+        height: Frame height
+        width: Frame width
+        tile_size: Edge length of the written (core) area of a tile
+        halo: Context pixels added on each side
+
+    Returns:
+        List of (core box, read box) pairs
+    """
+    tile_size = max(1, int(tile_size))
+    tiles = []
+    for y0 in range(0, height, tile_size):
+        for x0 in range(0, width, tile_size):
+            y1, x1 = min(y0 + tile_size, height), min(x0 + tile_size, width)
+            read = (max(0, y0 - halo), min(height, y1 + halo),
+                    max(0, x0 - halo), min(width, x1 + halo))
+            tiles.append(((y0, y1, x0, x1), read))
+    return tiles
+
+
+def _process_tile(source_name: str, target_name: str, shape: Tuple[int, ...],
+                  specs: List[FilterSpec], core: Box, read: Box):
+    """Worker body: filter one read window and write its core into the output buffer."""
+    cv2 = require_cv2()
+    # The pool already provides the parallelism
+    cv2.setNumThreads(1)
+
+    source_shm = shared_memory.SharedMemory(name=source_name)
+    target_shm = shared_memory.SharedMemory(name=target_name)
+    try:
+        source = np.ndarray(shape, dtype=np.uint8, buffer=source_shm.buf)
+        target = np.ndarray(shape, dtype=np.uint8, buffer=target_shm.buf)
+
+        ry0, ry1, rx0, rx1 = read
+        y0, y1, x0, x1 = core
+        filtered = apply_spatial_filters(np.ascontiguousarray(source[ry0:ry1, rx0:rx1]), specs)
+        target[y0:y1, x0:x1] = filtered[y0 - ry0:y1 - ry0, x0 - rx0:x1 - rx0]
+        del source, target
+    finally:
+        source_shm.close()
+        target_shm.close()
+
+
+def apply_spatial_filters_tiled(image: np.ndarray, specs: List[FilterSpec],
+                                tile_size: int = 1024,
+                                max_workers: Optional[int] = None) -> np.ndarray:
+    """
+    Run a filter chain over overlapping tiles in a process pool
+
+    The frame and the result live in shared memory, so workers only receive
+    tile coordinates. Each tile reads a halo equal to the summed reach of the
+    chain, which makes the stitched result identical to filtering the whole
+    frame at once.
+
+    Args:
+        image: uint8 RGB image
+        specs: Filter specs, applied in order
+        tile_size: Edge length of the area each tile writes
+        max_workers: Worker processes (default: CPU count)
+
+    Returns:
+        Filtered image
+    """
+    if not specs:
+        return image
+
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    halo = sum(filter_halo(spec) for spec in specs)
+    tiles = plan_tiles(image.shape[0], image.shape[1], tile_size, halo)
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(tiles)))
+
+    source_shm = shared_memory.SharedMemory(create=True, size=image.nbytes)
+    target_shm = shared_memory.SharedMemory(create=True, size=image.nbytes)
+    try:
+        source = np.ndarray(image.shape, dtype=np.uint8, buffer=source_shm.buf)
+        source[:] = image
+
+        # spawn: forked children can deadlock in OpenCV's thread pool
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [
+                executor.submit(_process_tile, source_shm.name, target_shm.name,
+                                image.shape, specs, core, read)
+                for core, read in tiles
+            ]
+            for future in futures:
+                future.result()
+
+        result = np.ndarray(image.shape, dtype=np.uint8, buffer=target_shm.buf).copy()
+        del source
+    finally:
+        for shm in (source_shm, target_shm):
+            shm.close()
+            shm.unlink()
+
+    return result
@@ -4,7 +4,6 @@ Color Optimizer - Optimizes color mapping for best visual results
 
 import numpy as np
 from typing import Tuple, Optional, List
-from scipy.spatial import distance
 
 try:
     from paint_by_numbers.utils.opencv import require_cv2
@@ -14,22 +13,33 @@ except ImportError:
 try:
     from paint_by_numbers.config import Config
     from paint_by_numbers.logger import logger
+    from paint_by_numbers.utils.helpers import ensure_uint8
+    from paint_by_numbers.core.color_assignment import assign_to_nearest
+    from paint_by_numbers.core.palette_lut import get_palette_lut
+    from paint_by_numbers.core.image_context import ImageContext
 except ImportError:
     import sys
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent.parent))
     from config import Config
     from logger import logger
+    from utils.helpers import ensure_uint8
+    from core.color_assignment import assign_to_nearest
+    from core.palette_lut import get_palette_lut
+    from core.image_context import ImageContext
 
 
 class ColorOptimizer:
     """Optimizes color selection and mapping for superior results"""
 
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None,
+                 image_context: Optional[ImageContext] = None):
         self.config = config or Config()
+        self.image_context = image_context or ImageContext()
 
     def optimize_palette_mapping(self, image: np.ndarray, palette: np.ndarray,
-                                 perceptual: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+                                 perceptual: bool = True,
+                                 use_lut: Optional[bool] = None) -> Tuple[np.ndarray, np.ndarray]:
         """
         Optimize mapping of image colors to palette using perceptual color space
 
@@ -37,39 +47,41 @@ class ColorOptimizer:
             image: Input image in RGB
             palette: Color palette in RGB
             perceptual: Use perceptual LAB color space (more accurate)
+            use_lut: Map through a cached RGB->label lookup table; meant for
+                     fixed palettes reused across jobs (default from config)
 
         Returns:
             Tuple of (optimized_image, label_map)
         """
         logger.info("Optimizing color mapping...")
 
-        if perceptual:
+        memory_limit_mb = getattr(self.config, 'ASSIGNMENT_MEMORY_MB', None)
+
+        if use_lut is None:
+            use_lut = getattr(self.config, 'PALETTE_LUT_ENABLED', False)
+
+        if use_lut:
+            lut = get_palette_lut(palette, "lab" if perceptual else "rgb", self.config)
+            labels = lut.apply(ensure_uint8(image))
+
+        elif perceptual:
             cv2 = require_cv2()
             # Convert to LAB color space for perceptual accuracy
-            image_lab = cv2.cvtColor(image, cv2.COLOR_RGB2LAB).astype(np.float32)
+            image_lab = self.image_context.lab(image)
             palette_lab = cv2.cvtColor(
                 palette.reshape(1, -1, 3), cv2.COLOR_RGB2LAB
             ).reshape(-1, 3).astype(np.float32)
 
-            h, w = image.shape[:2]
-            pixels_lab = image_lab.reshape(-1, 3)
-
             # Find nearest palette color in LAB space (perceptually accurate)
-            distances = distance.cdist(pixels_lab, palette_lab, metric='euclidean')
-            labels = np.argmin(distances, axis=1)
+            labels = assign_to_nearest(image_lab, palette_lab, memory_limit_mb)
 
         else:
             # Standard RGB mapping
-            h, w = image.shape[:2]
-            pixels = image.reshape(-1, 3).astype(np.float32)
-            palette_float = palette.astype(np.float32)
-
-            distances = distance.cdist(pixels, palette_float, metric='euclidean')
-            labels = np.argmin(distances, axis=1)
+            labels = assign_to_nearest(image, palette, memory_limit_mb)
 
         # Create optimized image
-        optimized_image = palette[labels].reshape(h, w, 3)
-        label_map = labels.reshape(h, w)
+        optimized_image = palette[labels]
+        label_map = labels
 
         # Calculate improvement
         original_error = self._calculate_mapping_error(image, image, palette)
@@ -0,0 +1,231 @@
+"""
+Detector Service - Process-wide face and saliency detection on bounded-size proxies
+
+Cascades are loaded once per process. Detection runs on a proxy whose
+longest side is at most PROXY_MAX_DIMENSION, boxes are scaled back to the
+caller's resolution, and results are cached per proxy hash so the upscaler,
+subject detector and kit recommender can all ask about the same image.
+"""
+
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+try:
+    from paint_by_numbers.logger import logger
+    from paint_by_numbers.utils.opencv import require_cv2
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from logger import logger
+    from utils.opencv import require_cv2
+
+
+# Longest side of the image detectors actually see
+PROXY_MAX_DIMENSION = 800
+
+# Detection results kept per process
+RESULT_CACHE_SIZE = 32
+
+# (x, y, width, height, confidence) in caller coordinates
+Detection = Tuple[int, int, int, int, float]
+
+_SERVICE = None
+_SERVICE_LOCK = threading.Lock()
+
+
+class DetectorService:
+    """Shared Haar-cascade face detection and spectral-residual saliency."""
+
+    def __init__(self, proxy_max_dimension: int = PROXY_MAX_DIMENSION,
+                 cache_size: int = RESULT_CACHE_SIZE):
+        """
+        Initialize service and load cascades
+
+        Args:
+            proxy_max_dimension: Longest side of the detection proxy
+            cache_size: Detection results kept (least recently used dropped)
+        """
+        self.cv2 = require_cv2()
+        self.proxy_max_dimension = proxy_max_dimension
+        self.cache_size = cache_size
+        self.face_cascade = None
+        self.eye_cascade = None
+        self._cache: OrderedDict = OrderedDict()
+        # Cascade classifiers are not safe to run concurrently
+        self._lock = threading.Lock()
+        self._load_cascades()
+
+    def _load_cascades(self):
+        """Load OpenCV cascade classifiers for face detection"""
+        try:
+            cascade_path = Path(self.cv2.data.haarcascades)
+
+            face_cascade_file = cascade_path / 'haarcascade_frontalface_default.xml'
+            eye_cascade_file = cascade_path / 'haarcascade_eye.xml'
+
+            if face_cascade_file.exists():
+                self.face_cascade = self.cv2.CascadeClassifier(str(face_cascade_file))
+                logger.info("Face cascade loaded successfully")
+
+            if eye_cascade_file.exists():
+                self.eye_cascade = self.cv2.CascadeClassifier(str(eye_cascade_file))
+                logger.info("Eye cascade loaded successfully")
+
+            if self.face_cascade is None:
+                logger.warning("Face cascade not found; face detection is disabled")
+
+        except Exception as e:
+            logger.warning(f"Could not load face cascades: {e}")
+
+    def _proxy(self, image: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Downscaled copy with longest side <= proxy_max_dimension, and its scale."""
+        h, w = image.shape[:2]
+        scale = min(1.0, self.proxy_max_dimension / max(h, w))
+        if scale >= 1.0:
+            return image, 1.0
+        size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+        return self.cv2.resize(image, size, interpolation=self.cv2.INTER_AREA), scale
+
+    def _cache_key(self, proxy: np.ndarray, image_shape: Tuple[int, ...], *params) -> Tuple:
+        """Key from the proxy's pixels (all detection sees) plus the full-size shape."""
+        digest = hashlib.blake2b(np.ascontiguousarray(proxy).tobytes(), digest_size=16).hexdigest()
+        return (digest, image_shape) + params
+
+    def _cached(self, key: Tuple, compute):
+        """Return a cached result or compute, store and return it."""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+            result = compute()
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return result
+
+    def detect_faces(self, image: np.ndarray, min_size: Tuple[int, int] = (80, 80),
+                     color_order: str = "bgr", verify_eyes: bool = True) -> List[Detection]:
+        """
+        Detect frontal faces
+
+        Args:
+            image: Input image
+            min_size: Minimum face size in the caller's resolution
+            color_order: 'bgr' or 'rgb'
+            verify_eyes: Raise confidence of faces where two eyes are found
+
+        Returns:
+            List of (x, y, width, height, confidence)
+        """
+        if self.face_cascade is None:
+            return []
+
+        proxy, scale = self._proxy(image)
+        key = self._cache_key(proxy, image.shape, "faces", tuple(min_size), color_order, verify_eyes)
+
+        def compute():
+            code = self.cv2.COLOR_BGR2GRAY if color_order == "bgr" else self.cv2.COLOR_RGB2GRAY
+            gray = self.cv2.cvtColor(proxy, code)
+            proxy_min = tuple(max(1, int(round(s * scale))) for s in min_size)
+
+            faces = self.face_cascade.detectMultiScale(
+                gray,
+                scaleFactor=1.1,
+                minNeighbors=5,
+                minSize=proxy_min,
+                flags=self.cv2.CASCADE_SCALE_IMAGE
+            )
+
+            detected = []
+            for (x, y, w, h) in faces:
+                confidence = 0.7  # Base confidence
+
+                if verify_eyes and self.eye_cascade is not None:
+                    eye_min = max(1, int(round(20 * scale)))
+                    eyes = self.eye_cascade.detectMultiScale(gray[y:y+h, x:x+w],
+                                                             minSize=(eye_min, eye_min))
+                    if len(eyes) >= 2:
+                        confidence = 0.95  # High confidence if eyes detected
+
+                detected.append(self._scale_box(x, y, w, h, scale, image.shape) + (confidence,))
+            return detected
+
+        return list(self._cached(key, compute))
+
+    def detect_salient_region(self, image: np.ndarray) -> Optional[Detection]:
+        """
+        Largest region of the spectral-residual saliency map
+
+        Args:
+            image: Input image
+
+        Returns:
+            (x, y, width, height, confidence) or None
+        """
+        proxy, scale = self._proxy(image)
+        key = self._cache_key(proxy, image.shape, "saliency")
+
+        def compute():
+            try:
+                saliency = self.cv2.saliency.StaticSaliencySpectralResidual_create()
+                success, saliency_map = saliency.computeSaliency(proxy)
+                if not success:
+                    return None
+
+                # Threshold to get salient regions
+                saliency_map = (saliency_map * 255).astype(np.uint8)
+                _, thresh = self.cv2.threshold(saliency_map, 0, 255,
+                                               self.cv2.THRESH_BINARY + self.cv2.THRESH_OTSU)
+
+                contours, _ = self.cv2.findContours(thresh, self.cv2.RETR_EXTERNAL,
+                                                    self.cv2.CHAIN_APPROX_SIMPLE)
+                if not contours:
+                    return None
+
+                largest = max(contours, key=self.cv2.contourArea)
+                x, y, w, h = self.cv2.boundingRect(largest)
+                return self._scale_box(x, y, w, h, scale, image.shape) + (0.6,)
+
+            except Exception as e:
+                logger.warning(f"Saliency detection failed: {e}")
+                return None
+
+        return self._cached(key, compute)
+
+    @staticmethod
+    def _scale_box(x: int, y: int, w: int, h: int, scale: float,
+                   image_shape: Tuple[int, ...]) -> Tuple[int, int, int, int]:
+        """Map a proxy box back to full resolution, clamped to the image."""
+        if scale >= 1.0:
+            return int(x), int(y), int(w), int(h)
+        full_h, full_w = image_shape[:2]
+        x0 = min(full_w - 1, int(round(x / scale)))
+        y0 = min(full_h - 1, int(round(y / scale)))
+        x1 = min(full_w, int(round((x + w) / scale)))
+        y1 = min(full_h, int(round((y + h) / scale)))
+        return x0, y0, max(1, x1 - x0), max(1, y1 - y0)
+
+    def clear_cache(self):
+        """Drop all cached detection results."""
+        with self._lock:
+            self._cache.clear()
+
+
+def get_detector_service() -> DetectorService:
+    """
+    Process-wide detector service, created on first use
+
+    Returns:
+        Shared DetectorService
+    """
+    global _SERVICE
+    if _SERVICE is None:
+        with _SERVICE_LOCK:
+            if _SERVICE is None:
+                _SERVICE = DetectorService()
+    return _SERVICE
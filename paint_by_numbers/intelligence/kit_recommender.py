@@ -11,6 +11,8 @@ try:
     from paint_by_numbers.logger import logger
     from paint_by_numbers.paint_kits import PaintKitManager, PaintKit
     from paint_by_numbers.utils.opencv import require_cv2
+    from paint_by_numbers.core.image_context import ImageContext
+    from paint_by_numbers.intelligence.detector_service import get_detector_service
 except ImportError:
     import sys
     from pathlib import Path
@@ -19,13 +21,17 @@ except ImportError:
     from logger import logger
     from paint_kits import PaintKitManager, PaintKit
     from utils.opencv import require_cv2
+    from core.image_context import ImageContext
+    from intelligence.detector_service import get_detector_service
 
 
 class KitRecommender:
     """Analyzes images and recommends the best paint kit for the user"""
 
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None,
+                 image_context: Optional[ImageContext] = None):
         self.config = config or Config()
+        self.image_context = image_context or ImageContext()
         self.paint_kit_manager = PaintKitManager()
 
     def analyze_image_for_kit(self, image_path: str) -> Dict:
@@ -44,6 +50,7 @@ class KitRecommender:
             - color_analysis: Detailed color analysis
         """
         cv2 = require_cv2()
+        self.image_context.clear()
 
         # Load and analyze image
         image = cv2.imread(image_path)
@@ -98,7 +105,7 @@ class KitRecommender:
     def _analyze_colors(self, image_rgb: np.ndarray) -> Dict:
         """Analyze color characteristics of the image"""
         # Downsample for faster processing
-        small = image_rgb[::4, ::4]
+        small = self.image_context.proxy(image_rgb, 4)
         pixels = small.reshape(-1, 3)
 
         # Calculate dominant colors using k-means
@@ -123,7 +130,8 @@ class KitRecommender:
         is_cool = warmth < -20
 
         # Analyze saturation
-        hsv_pixels = self._rgb_to_hsv_batch(pixels)
+        # Hue in degrees, saturation and value in 0-1
+        hsv_pixels = self.image_context.hsv(small, precise=True).reshape(-1, 3)
         avg_saturation = np.mean(hsv_pixels[:, 1])
         is_vibrant = avg_saturation > 0.4
         is_pastel = avg_saturation < 0.3
@@ -164,10 +172,13 @@ class KitRecommender:
         # Simple heuristics for subject detection
         # In production, you'd use a proper classifier
 
-        # Portrait detection: vertical orientation, skin tone detection
+        # Portrait detection: a detected face, or vertical orientation with skin tones
+        faces = get_detector_service().detect_faces(
+            image_rgb, min_size=(30, 30), color_order="rgb", verify_eyes=False
+        )
         skin_pixels = self._detect_skin_tones(image_rgb)
         skin_ratio = np.sum(skin_pixels) / (h * w)
-        is_portrait = skin_ratio > 0.1 and aspect_ratio < 1.3
+        is_portrait = len(faces) > 0 or (skin_ratio > 0.1 and aspect_ratio < 1.3)
 
         # Pet detection: fur-like textures (browns, grays, whites)
         fur_pixels = self._detect_fur_colors(image_rgb)
@@ -200,6 +211,7 @@ class KitRecommender:
             'is_landscape': bool(is_landscape),
             'is_abstract': bool(is_abstract),
             'aspect_ratio': float(aspect_ratio),
+            'face_count': len(faces),
             'skin_ratio': float(skin_ratio),
             'fur_ratio': float(fur_ratio)
         }
@@ -209,7 +221,7 @@ class KitRecommender:
         cv2 = require_cv2()
 
         # Convert to grayscale for edge detection
-        gray = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY)
+        gray = self.image_context.gray(image_rgb)
 
         # Edge detection
         edges = cv2.Canny(gray, 50, 150)
@@ -401,37 +413,6 @@ class KitRecommender:
 
         return brown | gray | white | golden
 
-    def _rgb_to_hsv_batch(self, rgb_pixels: np.ndarray) -> np.ndarray:
-        """Convert RGB pixels to HSV color space"""
-        rgb_normalized = rgb_pixels / 255.0
-
-        r, g, b = rgb_normalized[:, 0], rgb_normalized[:, 1], rgb_normalized[:, 2]
-
-        max_val = np.maximum(np.maximum(r, g), b)
-        min_val = np.minimum(np.minimum(r, g), b)
-        diff = max_val - min_val
-
-        # Hue
-        h = np.zeros_like(max_val)
-        mask = diff != 0
-
-        r_max = (max_val == r) & mask
-        g_max = (max_val == g) & mask
-        b_max = (max_val == b) & mask
-
-        h[r_max] = (60 * ((g[r_max] - b[r_max]) / diff[r_max]) + 360) % 360
-        h[g_max] = (60 * ((b[g_max] - r[g_max]) / diff[g_max]) + 120) % 360
-        h[b_max] = (60 * ((r[b_max] - g[b_max]) / diff[b_max]) + 240) % 360
-
-        # Saturation
-        s = np.zeros_like(max_val)
-        s[max_val != 0] = diff[max_val != 0] / max_val[max_val != 0]
-
-        # Value
-        v = max_val
-
-        return np.stack([h, s, v], axis=1)
-
     def _default_recommendation(self) -> Dict:
         """Return default recommendation when analysis fails"""
         creative_kit = self.paint_kit_manager.get_kit_by_id('creative_kit')
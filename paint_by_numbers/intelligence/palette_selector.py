@@ -7,15 +7,11 @@ import numpy as np
 from typing import Tuple, List, Optional
 from collections import Counter
 
-try:
-    from paint_by_numbers.utils.opencv import require_cv2
-except ImportError:
-    from ..utils.opencv import require_cv2
-
 try:
     from paint_by_numbers.config import Config
     from paint_by_numbers.logger import logger
     from paint_by_numbers.palettes import PaletteManager
+    from paint_by_numbers.core.image_context import ImageContext
 except ImportError:
     import sys
     from pathlib import Path
@@ -23,13 +19,16 @@ except ImportError:
     from config import Config
     from logger import logger
     from palettes import PaletteManager
+    from core.image_context import ImageContext
 
 
 class IntelligentPaletteSelector:
     """Analyzes images and recommends optimal color palettes"""
 
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None,
+                 image_context: Optional[ImageContext] = None):
         self.config = config or Config()
+        self.image_context = image_context or ImageContext()
         self.palette_manager = PaletteManager()
 
     def analyze_image(self, image: np.ndarray) -> dict:
@@ -43,9 +42,8 @@ class IntelligentPaletteSelector:
             Dictionary with image analysis
         """
         # Convert to different color spaces for analysis
-        cv2 = require_cv2()
-        hsv = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)
-        lab = cv2.cvtColor(image, cv2.COLOR_RGB2LAB)
+        hsv = self.image_context.hsv(image)
+        lab = self.image_context.lab(image)
 
         # Sample pixels for analysis
         h, w = image.shape[:2]
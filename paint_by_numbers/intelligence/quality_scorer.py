@@ -13,19 +13,23 @@ except ImportError:
 try:
     from paint_by_numbers.config import Config
     from paint_by_numbers.logger import logger
+    from paint_by_numbers.core.image_context import ImageContext
 except ImportError:
     import sys
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent.parent))
     from config import Config
     from logger import logger
+    from core.image_context import ImageContext
 
 
 class QualityScorer:
     """Evaluates template quality and paintability"""
 
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None,
+                 image_context: Optional[ImageContext] = None):
         self.config = config or Config()
+        self.image_context = image_context or ImageContext()
 
     def score_template(self, original_image: np.ndarray,
                       quantized_image: np.ndarray,
@@ -207,7 +211,7 @@ class QualityScorer:
         """Score how clear edges are between regions"""
         # Convert to grayscale
         cv2 = require_cv2()
-        gray = cv2.cvtColor(quantized_image, cv2.COLOR_RGB2GRAY)
+        gray = self.image_context.gray(quantized_image)
 
         # Detect edges
         edges = cv2.Canny(gray, 50, 150)
@@ -16,11 +16,13 @@ from pathlib import Path
 try:
     from paint_by_numbers.logger import logger
     from paint_by_numbers.utils.opencv import require_cv2
+    from paint_by_numbers.intelligence.detector_service import get_detector_service
 except ImportError:
     import sys
     sys.path.insert(0, str(Path(__file__).parent.parent))
     from logger import logger
     from utils.opencv import require_cv2
+    from intelligence.detector_service import get_detector_service
 
 
 class SubjectRegion:
@@ -83,31 +85,19 @@ class SubjectDetector:
     """Detects faces and important subjects in images"""
 
     def __init__(self):
-        """Initialize detector with cascade classifiers"""
+        """Initialize detector backed by the shared detector service"""
         self.cv2 = require_cv2()
-        self.face_cascade = None
-        self.eye_cascade = None
-        self._load_cascades()
+        self.service = get_detector_service()
 
-    def _load_cascades(self):
-        """Load OpenCV cascade classifiers for face detection"""
-        try:
-            # Load Haar cascades for face detection
-            cascade_path = Path(self.cv2.data.haarcascades)
+    @property
+    def face_cascade(self):
+        """Face cascade loaded once by the detector service"""
+        return self.service.face_cascade
 
-            face_cascade_file = cascade_path / 'haarcascade_frontalface_default.xml'
-            eye_cascade_file = cascade_path / 'haarcascade_eye.xml'
-
-            if face_cascade_file.exists():
-                self.face_cascade = self.cv2.CascadeClassifier(str(face_cascade_file))
-                logger.info("Face cascade loaded successfully")
-
-            if eye_cascade_file.exists():
-                self.eye_cascade = self.cv2.CascadeClassifier(str(eye_cascade_file))
-                logger.info("Eye cascade loaded successfully")
-
-        except Exception as e:
-            logger.warning(f"Could not load face cascades: {e}")
+    @property
+    def eye_cascade(self):
+        """Eye cascade loaded once by the detector service"""
+        return self.service.eye_cascade
 
     def detect_faces(self, image: np.ndarray,
                      min_size: Tuple[int, int] = (80, 80)) -> List[SubjectRegion]:
@@ -121,35 +111,10 @@ class SubjectDetector:
         Returns:
             List of detected face regions
         """
-        if self.face_cascade is None:
-            logger.warning("Face cascade not loaded, skipping face detection")
-            return []
-
-        # Convert to grayscale for detection
-        gray = self.cv2.cvtColor(image, self.cv2.COLOR_BGR2GRAY)
-
-        # Detect faces
-        faces = self.face_cascade.detectMultiScale(
-            gray,
-            scaleFactor=1.1,
-            minNeighbors=5,
-            minSize=min_size,
-            flags=self.cv2.CASCADE_SCALE_IMAGE
-        )
-
-        detected = []
-        for (x, y, w, h) in faces:
-            # Verify face by checking for eyes
-            confidence = 0.7  # Base confidence
-
-            if self.eye_cascade is not None:
-                face_roi = gray[y:y+h, x:x+w]
-                eyes = self.eye_cascade.detectMultiScale(face_roi, minSize=(20, 20))
-                if len(eyes) >= 2:
-                    confidence = 0.95  # High confidence if eyes detected
-
-            region = SubjectRegion(x, y, w, h, confidence, 'face')
-            detected.append(region)
+        detected = [
+            SubjectRegion(x, y, w, h, confidence, 'face')
+            for x, y, w, h, confidence in self.service.detect_faces(image, min_size=min_size)
+        ]
 
         logger.info(f"Detected {len(detected)} faces")
         return detected
@@ -165,38 +130,14 @@ class SubjectDetector:
         Returns:
             Most salient region or None
         """
-        try:
-            # Use static saliency detection
-            saliency = self.cv2.saliency.StaticSaliencySpectralResidual_create()
-            success, saliency_map = saliency.computeSaliency(image)
-
-            if not success:
-                return None
-
-            # Threshold to get salient regions
-            saliency_map = (saliency_map * 255).astype(np.uint8)
-            _, thresh = self.cv2.threshold(saliency_map, 0, 255,
-                                          self.cv2.THRESH_BINARY + self.cv2.THRESH_OTSU)
-
-            # Find largest salient region
-            contours, _ = self.cv2.findContours(thresh, self.cv2.RETR_EXTERNAL,
-                                               self.cv2.CHAIN_APPROX_SIMPLE)
-
-            if not contours:
-                return None
-
-            # Get largest contour
-            largest = max(contours, key=self.cv2.contourArea)
-            x, y, w, h = self.cv2.boundingRect(largest)
-
-            region = SubjectRegion(x, y, w, h, 0.6, 'salient')
-            logger.info(f"Detected salient region at ({x}, {y}, {w}, {h})")
-            return region
-
-        except Exception as e:
-            logger.warning(f"Saliency detection failed: {e}")
+        salient = self.service.detect_salient_region(image)
+        if salient is None:
             return None
 
+        x, y, w, h, confidence = salient
+        logger.info(f"Detected salient region at ({x}, {y}, {w}, {h})")
+        return SubjectRegion(x, y, w, h, confidence, 'salient')
+
     def get_center_region(self, image: np.ndarray,
                           size_factor: float = 0.6) -> SubjectRegion:
         """
@@ -8,6 +8,7 @@ and number placement.
 """
 
 import sys
+import time
 import argparse
 from pathlib import Path
 import numpy as np
@@ -20,6 +21,8 @@ from .palettes import PaletteManager
 from .paint_kits import PaintKitManager
 from .core.image_processor import ImageProcessor
 from .core.color_quantizer import ColorQuantizer
+from .core.image_context import ImageContext
+from .core.streaming_pipeline import StreamingPipeline
 from .core.region_detector import RegionDetector
 from .core.contour_builder import ContourBuilder
 from .core.number_placer import NumberPlacer
@@ -33,7 +36,7 @@ from .intelligence.difficulty_analyzer import DifficultyAnalyzer
 from .intelligence.quality_scorer import QualityScorer
 from .intelligence.color_optimizer import ColorOptimizer
 from .models import ModelRegistry, ModelProfile
-from .formats import FormatRegistry, ImageFormatter, FitMode
+from .formats import FormatRegistry
 from .utils.opencv import require_cv2
 
 
@@ -55,9 +58,12 @@ class PaintByNumbersGenerator:
             log_file=self.config.LOG_FILE
         )
 
+        # Color-space conversions shared by every stage of a job
+        self.image_context = ImageContext()
+
         # Initialize components
-        self.image_processor = ImageProcessor(self.config)
-        self.color_quantizer = ColorQuantizer(self.config)
+        self.image_processor = ImageProcessor(self.config, self.image_context)
+        self.color_quantizer = ColorQuantizer(self.config, self.image_context)
         self.region_detector = RegionDetector(self.config)
         self.contour_builder = ContourBuilder(self.config)
         self.number_placer = NumberPlacer(self.config)
@@ -69,15 +75,14 @@ class PaintByNumbersGenerator:
         self.paint_kit_manager = PaintKitManager()
 
         # Initialize intelligence modules
-        self.palette_selector = IntelligentPaletteSelector(self.config)
+        self.palette_selector = IntelligentPaletteSelector(self.config, self.image_context)
         self.difficulty_analyzer = DifficultyAnalyzer(self.config)
-        self.quality_scorer = QualityScorer(self.config)
-        self.color_optimizer = ColorOptimizer(self.config)
+        self.quality_scorer = QualityScorer(self.config, self.image_context)
+        self.color_optimizer = ColorOptimizer(self.config, self.image_context)
 
         # Storage for intermediate results
         self.original_image = None
         self.processed_image = None
-        self.quantized_image = None
         self.palette = None
         self.color_names = []
         self.regions = None
@@ -90,6 +95,24 @@ class PaintByNumbersGenerator:
         self.color_mixing_guide = None
         self.current_model = None
         self.recommended_paint_kit = None  # Business: Recommend which kit to buy
+        self.preview_request = None  # Arguments of the last preview, for promote_preview()
+        self._quantized_render = None  # (labels, palette, image) behind quantized_image
+
+    @property
+    def quantized_image(self) -> Optional[np.ndarray]:
+        """
+        Quantized RGB image, rendered from the current label map and palette
+
+        The rendering is kept until the labels or palette are replaced, so
+        every stage of a job sees the same array (and shares its cached
+        conversions).
+        """
+        labels, palette = self.color_quantizer.labels, self.color_quantizer.palette
+        cached = self._quantized_render
+        if cached is None or cached[0] is not labels or cached[1] is not palette:
+            cached = (labels, palette, self.color_quantizer.quantized_image)
+            self._quantized_render = cached
+        return cached[2]
 
     def apply_model(self, model_id: str) -> ModelProfile:
         """
@@ -111,8 +134,8 @@ class PaintByNumbersGenerator:
         self.config = model_profile.to_config()
 
         # Re-initialize components with new config
-        self.image_processor = ImageProcessor(self.config)
-        self.color_quantizer = ColorQuantizer(self.config)
+        self.image_processor = ImageProcessor(self.config, self.image_context)
+        self.color_quantizer = ColorQuantizer(self.config, self.image_context)
         self.region_detector = RegionDetector(self.config)
         self.contour_builder = ContourBuilder(self.config)
         self.number_placer = NumberPlacer(self.config)
@@ -135,7 +158,11 @@ class PaintByNumbersGenerator:
                 model: str = "classic",
                 paper_format: str = "a4",
                 use_region_emphasis: bool = False,
-                emphasized_region: Optional[dict] = None) -> dict:
+                emphasized_region: Optional[dict] = None,
+                fixed_palette: Optional[np.ndarray] = None,
+                fixed_color_names: Optional[list] = None,
+                fixed_clusters: Optional[dict] = None,
+                preview: bool = False) -> dict:
         """
         Generate complete paint-by-numbers package from input image
 
@@ -152,12 +179,63 @@ class PaintByNumbersGenerator:
             paper_format: Paper format (a4, a3, square_medium, etc.)
             use_region_emphasis: Enable multi-region processing for better quality
             emphasized_region: Dict with {x, y, width, height} (0-1 ratios) for emphasized area
+            fixed_palette: Map onto this RGB palette instead of selecting one
+                           (used to promote a preview to a full render)
+            fixed_color_names: Names for fixed_palette colors
+            fixed_clusters: K-means cluster model behind fixed_palette
+                            (ColorQuantizer.cluster_model); pixels are assigned
+                            to its clusters instead of the nearest palette color
+            preview: Run on a PREVIEW_MAX_DIMENSION proxy and only save the
+                     template, solution and legend (see generate_preview)
 
         Returns:
             Dictionary with paths to generated files and model info
         """
+        try:
+            return self._generate(
+                input_path, output_dir,
+                n_colors=n_colors, merge_similar=merge_similar,
+                add_grid=add_grid, legend_style=legend_style,
+                use_unified_palette=use_unified_palette,
+                palette_name=palette_name,
+                model=model,
+                paper_format=paper_format,
+                use_region_emphasis=use_region_emphasis,
+                emphasized_region=emphasized_region,
+                fixed_palette=fixed_palette,
+                fixed_color_names=fixed_color_names,
+                fixed_clusters=fixed_clusters,
+                preview=preview
+            )
+        finally:
+            # Cached conversions hold frame-sized arrays; release them with the
+            # job (the results already carry the statistics)
+            self.image_context.clear()
+            self._quantized_render = None
+
+    def _generate(self, input_path: str, output_dir: str = "output",
+                 n_colors: int = None, merge_similar: bool = True,
+                 add_grid: bool = False, legend_style: str = "grid",
+                 use_unified_palette: Optional[bool] = None,
+                 palette_name: Optional[str] = None,
+                 model: str = "classic",
+                 paper_format: str = "a4",
+                 use_region_emphasis: bool = False,
+                 emphasized_region: Optional[dict] = None,
+                 fixed_palette: Optional[np.ndarray] = None,
+                 fixed_color_names: Optional[list] = None,
+                 fixed_clusters: Optional[dict] = None,
+                 preview: bool = False) -> dict:
+        """Run one generate() job (see generate for the arguments)."""
+        start_time = time.perf_counter()
+
         # Apply model configuration
         model_profile = self.apply_model(model)
+        if preview:
+            self._scale_config_for_preview()
+
+        # New job: drop conversions cached for the previous image
+        self.image_context.clear()
 
         # Model can override some parameters if not explicitly provided
         if n_colors is None:
@@ -192,25 +270,21 @@ class PaintByNumbersGenerator:
 
         # Step 1: Load and preprocess image
         logger.info("\n[1/8] Loading and preprocessing image...")
-        self.original_image = self.image_processor.load_image(input_path)
-
-        # Apply paper format if specified
+        # Resolve paper format first so loading can plan a single resample
+        format_obj = None
         if paper_format:
             format_obj = FormatRegistry.get_format(paper_format)
             if format_obj:
                 logger.info(f"📐 Applying paper format: {format_obj.display_name}")
                 logger.info(f"   Target size: {format_obj.width_mm}x{format_obj.height_mm}mm at {format_obj.dpi}dpi")
-
-                # Fit image to format using CONTAIN mode (keeps aspect ratio)
-                self.original_image = ImageFormatter.fit_image(
-                    self.original_image,
-                    format_obj,
-                    mode=FitMode.CONTAIN
-                )
-                logger.info(f"   Fitted to: {self.original_image.shape[1]}x{self.original_image.shape[0]}px")
             else:
                 logger.warning(f"Paper format '{paper_format}' not found, using original size")
 
+        # Fit inside the format (CONTAIN mode keeps aspect ratio) while loading
+        self.original_image = self.image_processor.load_image(input_path, paper_format=format_obj)
+        if format_obj:
+            logger.info(f"   Fitted to: {self.original_image.shape[1]}x{self.original_image.shape[0]}px")
+
         self.processed_image = self.image_processor.preprocess(
             apply_bilateral=True,
             apply_gaussian=True
@@ -245,10 +319,18 @@ class PaintByNumbersGenerator:
             n_colors = self.config.DEFAULT_NUM_COLORS
 
         # Apply color style adjustments (Vintage warmth, Pop-Art saturation, etc.)
-        styled_image = self.color_quantizer.apply_color_style(self.processed_image)
+        # on the filtered frame; vibrancy joins the same LUT pass when K-means
+        # will quantize this image directly, or its clusters are predicted
+        fold_vibrancy = fixed_clusters is not None or (
+            fixed_palette is None and not use_unified_palette
+            and not (use_region_emphasis and emphasized_region)
+        )
+        styled_image = self.color_quantizer.apply_color_style(
+            self.processed_image, include_vibrancy=fold_vibrancy
+        )
 
         # Multi-region processing if enabled
-        if use_region_emphasis and emphasized_region:
+        if use_region_emphasis and emphasized_region and fixed_palette is None:
             logger.info("🎯 Using multi-region processing with user-selected area")
 
             from paint_by_numbers.intelligence.subject_detector import SubjectRegion
@@ -277,28 +359,37 @@ class PaintByNumbersGenerator:
             # Use combined palette from multi-region processing
             self.palette = multi_result['combined_palette']
 
-            # Quantize using the combined palette
-            from paint_by_numbers.core.color_quantizer import assign_colors_to_palette
-            self.quantized_image = assign_colors_to_palette(styled_image, self.palette)
+            # Quantize using the combined palette (label map only; RGB is rendered on output)
+            from paint_by_numbers.core.color_assignment import assign_to_nearest
+            self.color_quantizer.labels = assign_to_nearest(styled_image, self.palette)
+            self.color_quantizer.palette = self.palette
 
             logger.info(f"✅ Multi-region processing complete")
             logger.info(f"   Emphasized: {len(multi_result['emphasized_palette'])} colors")
             logger.info(f"   Background: {len(multi_result['background_palette'])} colors")
 
+        elif fixed_palette is not None:
+            # Palette chosen on a preview: map onto it instead of re-clustering
+            _, self.palette = self.color_quantizer.quantize_with_palette(
+                styled_image, fixed_palette, fixed_color_names,
+                cluster_model=fixed_clusters
+            )
+
         else:
             # Standard single-region quantization
-            self.quantized_image, self.palette = self.color_quantizer.quantize(
+            _, self.palette = self.color_quantizer.quantize(
                 styled_image,  # Use styled image instead of processed_image
                 n_colors=n_colors,
                 sort_palette=True,
                 use_unified_palette=use_unified_palette,
-                palette_name=palette_name
+                palette_name=palette_name,
+                apply_vibrancy=not fold_vibrancy
             )
 
         # Optimize color mapping for better visual quality
         if use_unified_palette:
             logger.info("Optimizing color mapping...")
-            self.quantized_image, optimized_labels = self.color_optimizer.optimize_palette_mapping(
+            _, optimized_labels = self.color_optimizer.optimize_palette_mapping(
                 self.processed_image, self.palette, perceptual=True
             )
             self.color_quantizer.labels = optimized_labels
@@ -333,43 +424,53 @@ class PaintByNumbersGenerator:
                 distance_threshold=5
             )
 
-        # Filter small regions
+        # Absorb small regions into their neighbors
         self.regions = self.region_detector.filter_small_regions()
 
+        # The solution shows absorbed specks in their new region's color
+        if self.region_detector.labels is not None:
+            self.color_quantizer.labels = self.region_detector.labels
+
         stats = self.region_detector.get_region_statistics()
         logger.info(f"  Total regions: {stats['total_regions']}")
         logger.info(f"  Average region size: {stats['mean_area']:.0f} pixels")
 
-        # Analyze difficulty
-        self.difficulty_analysis = self.difficulty_analyzer.analyze_difficulty(
-            self.regions, self.palette, self.processed_image.shape[:2]
-        )
+        # Analyses feed the saved reports, which previews skip
+        self.difficulty_analysis = None
+        self.quality_analysis = None
+        self.recommended_paint_kit = None
+        self.color_mixing_guide = None
+        if not preview:
+            # Analyze difficulty
+            self.difficulty_analysis = self.difficulty_analyzer.analyze_difficulty(
+                self.regions, self.palette, self.processed_image.shape[:2]
+            )
 
-        # Analyze quality
-        self.quality_analysis = self.quality_scorer.score_template(
-            self.original_image,
-            self.quantized_image,
-            self.regions,
-            self.palette
-        )
+            # Analyze quality
+            self.quality_analysis = self.quality_scorer.score_template(
+                self.original_image,
+                self.quantized_image,
+                self.regions,
+                self.palette
+            )
 
-        # Business: Recommend paint kit based on difficulty and colors
-        difficulty_score = self.difficulty_analysis['overall_difficulty']
-        num_colors_used = len(self.palette)
-        self.recommended_paint_kit = self.paint_kit_manager.recommend_kit_for_image(
-            difficulty_score, num_colors_used
-        )
-        logger.info(f"  💰 Recommended Paint Kit: {self.recommended_paint_kit.display_name} (${self.recommended_paint_kit.price_usd})")
-        logger.info(f"      Perfect for: {', '.join(self.recommended_paint_kit.best_for[:2])}")
+            # Business: Recommend paint kit based on difficulty and colors
+            difficulty_score = self.difficulty_analysis['overall_difficulty']
+            num_colors_used = len(self.palette)
+            self.recommended_paint_kit = self.paint_kit_manager.recommend_kit_for_image(
+                difficulty_score, num_colors_used
+            )
+            logger.info(f"  💰 Recommended Paint Kit: {self.recommended_paint_kit.display_name} (${self.recommended_paint_kit.price_usd})")
+            logger.info(f"      Perfect for: {', '.join(self.recommended_paint_kit.best_for[:2])}")
 
-        # Generate color mixing guide
-        self.color_mixing_guide = self.color_optimizer.generate_color_mixing_guide(
-            self.palette, self.color_names
-        )
+            # Generate color mixing guide
+            self.color_mixing_guide = self.color_optimizer.generate_color_mixing_guide(
+                self.palette, self.color_names
+            )
 
-        # Analyze color harmony
-        harmony_analysis = self.color_optimizer.analyze_color_harmony(self.palette)
-        logger.info(f"🎨 Color Harmony: {harmony_analysis['harmony_type']} ({harmony_analysis['harmony_score']:.1f}/100)")
+            # Analyze color harmony
+            harmony_analysis = self.color_optimizer.analyze_color_harmony(self.palette)
+            logger.info(f"🎨 Color Harmony: {harmony_analysis['harmony_type']} ({harmony_analysis['harmony_score']:.1f}/100)")
 
         if self.config.SHOW_PROGRESS:
             pbar.update(1)
@@ -438,6 +539,10 @@ class PaintByNumbersGenerator:
         # Get base filename
         input_name = Path(input_path).stem
 
+        if preview:
+            return self._save_preview(output_path, input_name, printable_template,
+                                      start_time, pbar if self.config.SHOW_PROGRESS else None)
+
         result_files = {}
 
         # Add model information
@@ -452,6 +557,19 @@ class PaintByNumbersGenerator:
                 'detail_level': self.current_model.detail_level,
             }
 
+        # Add clustering run metadata (restarts, iterations, timing)
+        if self.color_quantizer.clustering_metadata:
+            result_files['quantization'] = self.color_quantizer.clustering_metadata
+
+        # Denoise branch chosen from the estimated noise level
+        if self.image_processor.denoise_metadata:
+            result_files['denoise'] = self.image_processor.denoise_metadata
+
+        # Color-space conversions performed for this job (each should happen once)
+        result_files['color_conversions'] = self.image_context.get_statistics()
+        logger.info(f"  Color conversions: {result_files['color_conversions']['conversions']} "
+                    f"({result_files['color_conversions']['cache_hits']} cache hits)")
+
         # Save main template
         template_path = output_path / f"{input_name}_template.png"
         self.template_generator.save_template(printable_template, str(template_path))
@@ -641,6 +759,176 @@ class PaintByNumbersGenerator:
 
         return result_files
 
+    def generate_preview(self, input_path: str, output_dir: str = "output",
+                         **options) -> dict:
+        """
+        Fast, low-resolution run to judge a palette or model
+
+        Runs the same pipeline as ``generate`` on a proxy whose longest side
+        is ``PREVIEW_MAX_DIMENSION``, with size-dependent settings (region
+        size, number spacing, font, contour width, filter reach) scaled to
+        match. Analyses, JSON reports, guide, comparison, SVG and PDF are
+        skipped. Call ``promote_preview`` to render the same palette at full
+        resolution.
+
+        Args:
+            input_path: Path to input image
+            output_dir: Directory for output files
+            **options: Any other ``generate`` argument (n_colors, model, ...)
+
+        Returns:
+            Dictionary with template, solution and legend paths, the palette
+            and preview timing
+        """
+        options.pop('preview', None)
+        self.preview_request = dict(options, input_path=input_path, output_dir=output_dir)
+        return self.generate(input_path, output_dir, preview=True, **options)
+
+    def promote_preview(self, output_dir: Optional[str] = None, **overrides) -> dict:
+        """
+        Full-resolution render of the last preview, reusing its palette
+
+        The palette chosen on the proxy is mapped onto the full-size image
+        instead of clustering again, so the final colors match the preview.
+        K-means palettes are mapped by predicting the preview's clusters on
+        the same styled image, since their colors were adjusted after
+        clustering.
+
+        Args:
+            output_dir: Directory for output files (default: the preview's)
+            **overrides: ``generate`` arguments to change (e.g. paper_format)
+
+        Returns:
+            Dictionary with paths to generated files and model info
+
+        Raises:
+            ValueError: If no preview has been generated
+        """
+        if self.preview_request is None or self.palette is None:
+            raise ValueError("No preview to promote. Call generate_preview() first.")
+
+        options = dict(self.preview_request, **overrides)
+        if output_dir is not None:
+            options['output_dir'] = output_dir
+        options.update(
+            fixed_palette=self.palette.copy(),
+            fixed_color_names=list(self.color_names),
+            fixed_clusters=self.color_quantizer.cluster_model,
+            preview=False
+        )
+        return self.generate(**options)
+
+    def _scale_config_for_preview(self):
+        """Shrink the working size to the preview proxy and scale pixel-based settings with it."""
+        preview_size = int(getattr(self.config, 'PREVIEW_MAX_DIMENSION', 400))
+        full_size = max(self.config.MAX_IMAGE_SIZE)
+        scale = min(1.0, preview_size / full_size)
+
+        self.config.MAX_IMAGE_SIZE = (min(preview_size, self.config.MAX_IMAGE_SIZE[0]),
+                                      min(preview_size, self.config.MAX_IMAGE_SIZE[1]))
+
+        # Areas scale with the square of the linear factor
+        for key in ('MIN_REGION_SIZE', 'SMALL_REGION_THRESHOLD'):
+            setattr(self.config, key, max(1, int(round(getattr(self.config, key) * scale ** 2))))
+        for key in ('MIN_NUMBER_SPACING', 'MIN_CONTOUR_LENGTH', 'BILATERAL_SIGMA_SPACE'):
+            setattr(self.config, key, max(1, int(round(getattr(self.config, key) * scale))))
+        for key in ('CONTOUR_THICKNESS', 'FONT_THICKNESS', 'FONT_OUTLINE_THICKNESS'):
+            setattr(self.config, key, max(1, int(round(getattr(self.config, key) * scale))))
+        self.config.FONT_SCALE = max(0.25, self.config.FONT_SCALE * scale)
+        # Keep the bilateral diameter odd and at least 3
+        self.config.BILATERAL_FILTER_D = max(3, int(round(self.config.BILATERAL_FILTER_D * scale)) | 1)
+
+        logger.info(f"👁️  Preview mode: proxy up to {preview_size}px (settings scaled by {scale:.2f})")
+
+    def _save_preview(self, output_path: Path, input_name: str,
+                      printable_template: np.ndarray, start_time: float,
+                      pbar=None) -> dict:
+        """Save the preview's template, solution and legend."""
+        result_files = {}
+
+        template_path = output_path / f"{input_name}_preview_template.png"
+        self.template_generator.save_template(printable_template, str(template_path))
+        result_files['template'] = str(template_path)
+
+        solution = self.template_generator.create_solution_image(
+            self.quantized_image,
+            self.contour_image
+        )
+        solution_path = output_path / f"{input_name}_preview_solution.png"
+        self.template_generator.save_template(solution, str(solution_path))
+        result_files['solution'] = str(solution_path)
+
+        legend_path = output_path / f"{input_name}_preview_legend.png"
+        self.legend_generator.save_legend(self.legend, str(legend_path))
+        result_files['legend'] = str(legend_path)
+
+        if pbar is not None:
+            pbar.update(1)
+            pbar.close()
+
+        height, width = self.processed_image.shape[:2]
+        result_files['preview'] = {
+            'size': (width, height),
+            'seconds': time.perf_counter() - start_time,
+        }
+        result_files['palette'] = self.palette.tolist()
+        result_files['color_names'] = list(self.color_names)
+        result_files['color_conversions'] = self.image_context.get_statistics()
+        if self.current_model:
+            result_files['model'] = {
+                'id': self.current_model.id,
+                'display_name': self.current_model.display_name,
+            }
+
+        logger.info(f"\n👁️  Preview ({width}x{height}) ready in "
+                    f"{result_files['preview']['seconds']:.2f}s: {template_path.name}, {solution_path.name}")
+        return result_files
+
+    def generate_streaming(self, input_path: str, output_dir: str = "output",
+                           n_colors: Optional[int] = None,
+                           legend_style: str = "grid") -> dict:
+        """
+        Quantize and label an image too large for the in-memory pipeline
+
+        Works tile by tile with disk-backed arrays, so peak memory is bounded
+        by STREAMING_TILE_SIZE rather than the image size. Produces the label
+        map and region-id raster as ``.npy`` files, a region table, a legend
+        and a downscaled preview instead of the full template set.
+
+        Args:
+            input_path: Path to input image
+            output_dir: Directory for output files
+            n_colors: Number of colors (None uses default)
+            legend_style: Style of legend ("grid", "list", or "compact")
+
+        Returns:
+            Dictionary with paths to generated files
+        """
+        logger.info("=" * 60)
+        logger.info("Paint by Numbers Generator - Streaming Mode")
+        logger.info("=" * 60)
+
+        pipeline = StreamingPipeline(self.config)
+        result = pipeline.run(input_path, output_dir, n_colors)
+        self.palette = result.pop('palette')
+
+        self.legend = self.legend_generator.generate_legend(
+            self.palette,
+            include_hex=True,
+            include_rgb=False,
+            style=legend_style
+        )
+        legend_path = Path(output_dir) / f"{Path(input_path).stem}_legend.png"
+        self.legend_generator.save_legend(self.legend, str(legend_path))
+        result['legend'] = str(legend_path)
+
+        logger.info(f"\n📁 Output directory: {Path(output_dir).absolute()}")
+        logger.info(f"\n📄 Files generated:")
+        for key in ('labels', 'regions', 'region_table', 'preview', 'legend'):
+            logger.info(f"  • {key.replace('_', ' ').title()}: {Path(result[key]).name}")
+
+        return result
+
 
 def main():
     """Main entry point for command-line interface"""
@@ -672,6 +960,12 @@ Examples:
 
   # Add reference grid
   python main.py input.jpg --grid
+
+  # Quick low-resolution preview
+  python main.py input.jpg --preview
+
+  # Label an image larger than MAX_IMAGE_DIMENSION tile by tile
+  python main.py huge_scan.tif --streaming
         """
     )
 
@@ -753,6 +1047,18 @@ Examples:
         help="Generate PDF kit"
     )
 
+    parser.add_argument(
+        "--preview",
+        action="store_true",
+        help="Quick low-resolution template and solution preview (no analysis, SVG or PDF)"
+    )
+
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Process tile by tile with bounded memory (for very large images)"
+    )
+
     parser.add_argument(
         "--batch",
         action="store_true",
@@ -864,14 +1170,31 @@ Examples:
 
             # Create generator and run
             generator = PaintByNumbersGenerator(config)
-            generator.generate(
-                input_path=args.input,
-                output_dir=args.output,
-                n_colors=args.colors,
-                merge_similar=not args.no_merge,
-                add_grid=args.grid,
-                legend_style=args.legend_style
-            )
+            if args.streaming:
+                generator.generate_streaming(
+                    input_path=args.input,
+                    output_dir=args.output,
+                    n_colors=args.colors,
+                    legend_style=args.legend_style
+                )
+            elif args.preview:
+                generator.generate_preview(
+                    input_path=args.input,
+                    output_dir=args.output,
+                    n_colors=args.colors,
+                    merge_similar=not args.no_merge,
+                    add_grid=args.grid,
+                    legend_style=args.legend_style
+                )
+            else:
+                generator.generate(
+                    input_path=args.input,
+                    output_dir=args.output,
+                    n_colors=args.colors,
+                    merge_similar=not args.no_merge,
+                    add_grid=args.grid,
+                    legend_style=args.legend_style
+                )
 
     except Exception as e:
         logger.error(f"\nError: {str(e)}")
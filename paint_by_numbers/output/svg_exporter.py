@@ -18,6 +18,27 @@ except ImportError:
     from logger import logger
 
 
+def _region_fields(region) -> Tuple[int, List[np.ndarray], Tuple[int, int]]:
+    """
+    Color index, contours and label position of a region
+
+    Accepts both Region objects (whose contours are already in frame
+    coordinates, independent of the cropped mask) and plain dictionaries.
+
+    Args:
+        region: Region object or dict with 'color_index', 'contours', 'center'
+
+    Returns:
+        Tuple of (color index, contours, (x, y) label position)
+    """
+    if isinstance(region, dict):
+        return region['color_index'], region['contours'], region['center']
+
+    contours = [region.contour] if region.contour is not None else []
+    position = getattr(region, 'number_position', None) or region.center
+    return region.color_idx, contours, position
+
+
 class SVGExporter:
     """Exports paint-by-numbers templates as SVG files"""
 
@@ -30,7 +51,7 @@ class SVGExporter:
         """
         self.config = config or Config()
 
-    def export_template(self, contour_image: np.ndarray, regions: List[dict],
+    def export_template(self, contour_image: np.ndarray, regions: List,
                        palette: np.ndarray, output_path: str,
                        width: str = None, height: str = None):
         """
@@ -38,7 +59,7 @@ class SVGExporter:
 
         Args:
             contour_image: Image with contours
-            regions: List of region dictionaries with contours and labels
+            regions: List of Region objects or region dictionaries with contours and labels
             palette: Color palette
             output_path: Path to save SVG file
             width: SVG width (with units, e.g., "800px", "50cm"). If None, uses actual pixel dimensions
@@ -77,12 +98,12 @@ class SVGExporter:
 
         # Draw regions
         for region in regions:
-            color_idx = region['color_index']
+            color_idx, contours, _ = _region_fields(region)
             rgb = palette[color_idx]
             color = f"rgb({rgb[0]},{rgb[1]},{rgb[2]})"
 
             # Get contours for this region
-            for contour in region['contours']:
+            for contour in contours:
                 if len(contour) < 3:
                     continue
 
@@ -106,8 +127,7 @@ class SVGExporter:
 
         # Add numbers
         for region in regions:
-            color_idx = region['color_index']
-            center = region['center']
+            color_idx, _, center = _region_fields(region)
 
             # Add number text
             text_x, text_y = int(center[0]), int(center[1])
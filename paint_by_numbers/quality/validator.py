@@ -16,7 +16,8 @@ class TemplateValidator:
         self.warnings = []
         self.info = []
 
-    def validate(self, regions: List, palette: np.ndarray, image_shape: Tuple[int, int]) -> Dict:
+    def validate(self, regions: List, palette: np.ndarray, image_shape: Tuple[int, int],
+                 region_graph=None) -> Dict:
         """
         Perform comprehensive validation on a paint-by-numbers template
 
@@ -24,6 +25,8 @@ class TemplateValidator:
             regions: List of Region objects
             palette: Color palette array (N, 3)
             image_shape: (height, width) of the template
+            region_graph: Adjacency graph of ``regions`` (e.g. from
+                          RegionDetector.get_region_graph); built if None
 
         Returns:
             Validation report dictionary
@@ -37,7 +40,7 @@ class TemplateValidator:
         self._check_all_colors_used(regions, palette)
         self._check_no_unnumbered_regions(regions)
         self._check_region_sizes(regions)
-        self._check_adjacent_color_similarity(regions, palette)
+        self._check_adjacent_color_similarity(regions, palette, image_shape, region_graph)
         self._check_coverage(regions, image_shape)
         self._check_number_visibility(regions)
 
@@ -139,38 +142,39 @@ class TemplateValidator:
             f"Region sizes: min={min_area}, max={max_area}, avg={int(avg_area)}"
         )
 
-    def _check_adjacent_color_similarity(self, regions: List, palette: np.ndarray):
+    def _check_adjacent_color_similarity(self, regions: List, palette: np.ndarray,
+                                         image_shape: Tuple[int, int], region_graph=None):
         """Check if adjacent regions have very similar colors"""
         from paint_by_numbers.utils.color_names import color_distance_lab
+        from paint_by_numbers.core.region_graph import build_region_graph, rasterize_regions
 
-        # Build adjacency information (simplified check)
-        similar_adjacent = []
+        if not regions:
+            return
 
-        for i, region1 in enumerate(regions):
-            for j, region2 in enumerate(regions[i+1:], start=i+1):
-                # Check if regions are the same color (expected to be adjacent)
-                if region1.color_idx == region2.color_idx:
-                    continue
+        # Regions that actually share a boundary
+        if region_graph is None:
+            region_graph = build_region_graph(rasterize_regions(regions, image_shape), len(regions))
+        first, second, _ = region_graph.edges()
 
-                # Check if regions are close in space (rough check)
-                dist = np.linalg.norm(
-                    np.array(region1.center) - np.array(region2.center)
-                )
+        colors = np.array([r.color_idx for r in regions])
+        color1, color2 = colors[first], colors[second]
 
-                # If centers are close, check color similarity
-                if dist < 100:  # Rough proximity threshold
-                    color1 = tuple(palette[region1.color_idx])
-                    color2 = tuple(palette[region2.color_idx])
+        # Same-color neighbors are expected; compare each color pair once
+        differ = color1 != color2
+        low = np.minimum(color1, color2)[differ]
+        high = np.maximum(color1, color2)[differ]
 
-                    color_dist = color_distance_lab(color1, color2)
+        similar = np.zeros((len(palette), len(palette)), dtype=bool)
+        for c1, c2 in np.unique(np.stack([low, high], axis=1), axis=0):
+            color_dist = color_distance_lab(tuple(palette[c1]), tuple(palette[c2]))
+            # If colors are very similar
+            similar[c1, c2] = color_dist < 10  # Perceptually very similar
 
-                    # If colors are very similar
-                    if color_dist < 10:  # Perceptually very similar
-                        similar_adjacent.append((i, j, color_dist))
+        similar_adjacent = int(similar[low, high].sum())
 
         if similar_adjacent:
             self.warnings.append(
-                f"Found {len(similar_adjacent)} pairs of nearby regions with very similar colors. "
+                f"Found {similar_adjacent} pairs of adjacent regions with very similar colors. "
                 f"Consider adjusting color quantization."
             )
 
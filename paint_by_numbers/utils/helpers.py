@@ -3,7 +3,7 @@ Utility helper functions for Paint-by-Numbers System
 """
 
 import numpy as np
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 from scipy.spatial import distance
 
 try:
@@ -112,7 +112,8 @@ def sort_colors_by_brightness(colors: np.ndarray) -> np.ndarray:
 
 
 def is_point_inside_region(point: Tuple[int, int], region_mask: np.ndarray,
-                           min_distance: int = 5) -> bool:
+                           min_distance: int = 5,
+                           dist_transform: Optional[np.ndarray] = None) -> bool:
     """
     Check if a point is safely inside a region (not too close to edges)
 
@@ -120,6 +121,8 @@ def is_point_inside_region(point: Tuple[int, int], region_mask: np.ndarray,
         point: (x, y) coordinates
         region_mask: Binary mask of region
         min_distance: Minimum distance from edge
+        dist_transform: Precomputed distance transform of ``region_mask``
+                        (pass it when testing several points of one region)
 
     Returns:
         True if point is safely inside
@@ -136,8 +139,9 @@ def is_point_inside_region(point: Tuple[int, int], region_mask: np.ndarray,
         return False
 
     # Check distance from edge using distance transform
-    cv2 = require_cv2()
-    dist_transform = cv2.distanceTransform(region_mask, cv2.DIST_L2, 5)
+    if dist_transform is None:
+        cv2 = require_cv2()
+        dist_transform = cv2.distanceTransform(region_mask, cv2.DIST_L2, 5)
 
     return dist_transform[y, x] >= min_distance
 
@@ -206,3 +210,96 @@ def ensure_uint8(image: np.ndarray) -> np.ndarray:
             image = image.astype(np.uint8)
 
     return image
+
+
+def majority_filter_labels(labels: np.ndarray, window_size: int = 3,
+                           exclude_mask: np.ndarray = None) -> np.ndarray:
+    """
+    Replace each label with the most frequent label in its window
+
+    Ties go to the label seen first when scanning the window row by row,
+    and pixels closer than ``window_size // 2`` to the border are left
+    unchanged. Votes are counted with one box filter per label; when there
+    are more labels than window-offset pairs, labels are instead compared
+    offset by offset.
+
+    Args:
+        labels: 2D integer label map
+        window_size: Odd window side length
+        exclude_mask: Optional boolean mask of pixels to keep unchanged (e.g. edges)
+
+    Returns:
+        Filtered label map (same dtype as ``labels``)
+    """
+    cv2 = require_cv2()
+    h, w = labels.shape
+    r = window_size // 2
+    output = labels.copy()
+
+    if h <= 2 * r or w <= 2 * r:
+        return output
+
+    offsets = [(dy, dx) for dy in range(-r, r + 1) for dx in range(-r, r + 1)]
+
+    def shifted(dy, dx, ys=None, xs=None):
+        if ys is None:
+            return labels[r + dy:h - r + dy, r + dx:w - r + dx]
+        return labels[ys + dy, xs + dx]
+
+    def scan_order_mode(ys=None, xs=None):
+        # Strict ">" in scan order keeps the first label to reach the top count
+        best_count = best_label = None
+        for dy, dx in offsets:
+            candidate = shifted(dy, dx, ys, xs)
+            count = np.zeros(candidate.shape, dtype=np.uint16)
+            for oy, ox in offsets:
+                count += shifted(oy, ox, ys, xs) == candidate
+            if best_count is None:
+                best_count, best_label = count, candidate.copy()
+            else:
+                better = count > best_count
+                best_count[better] = count[better]
+                best_label[better] = candidate[better]
+        return best_label
+
+    used = np.flatnonzero(np.bincount(labels.ravel()))
+
+    if len(used) > len(offsets) ** 2:
+        mode = scan_order_mode()
+    else:
+        inner = (slice(r, h - r), slice(r, w - r))
+        best = np.zeros((h - 2 * r, w - 2 * r), dtype=np.uint16)
+        second = np.zeros_like(best)
+        mode = np.zeros(best.shape, dtype=labels.dtype)
+
+        for label in used:
+            votes = cv2.boxFilter((labels == label).view(np.uint8), cv2.CV_16U,
+                                  (window_size, window_size), normalize=False,
+                                  borderType=cv2.BORDER_CONSTANT)[inner]
+            better = votes > best
+            np.maximum(second, np.where(better, best, votes), out=second)
+            best[better] = votes[better]
+            mode[better] = label
+
+        # Ties were resolved by lowest label; the scan-order winner is the
+        # first window label whose vote count reaches the top count
+        ys, xs = np.nonzero(second == best)
+        target = best[ys, xs]
+        ys, xs = ys + r, xs + r
+        for dy, dx in offsets:
+            if len(ys) == 0:
+                break
+            candidate = shifted(dy, dx, ys, xs)
+            count = np.zeros(len(ys), dtype=np.uint16)
+            for oy, ox in offsets:
+                count += shifted(oy, ox, ys, xs) == candidate
+            done = count == target
+            mode[ys[done] - r, xs[done] - r] = candidate[done]
+            ys, xs, target = ys[~done], xs[~done], target[~done]
+
+    if exclude_mask is not None:
+        keep = exclude_mask[r:h - r, r:w - r]
+        mode[keep] = labels[r:h - r, r:w - r][keep]
+
+    output[r:h - r, r:w - r] = mode
+    return output
@@ -22,19 +22,22 @@ def point_to_polygon_distance(point: Tuple[float, float], polygon: np.ndarray) -
     if len(polygon.shape) == 3:
         polygon = polygon.reshape(-1, 2)
 
-    x, y = point
-    min_dist = float('inf')
+    if len(polygon) == 0:
+        return float('inf')
 
-    n = len(polygon)
-    for i in range(n):
-        p1 = polygon[i]
-        p2 = polygon[(i + 1) % n]
+    # All edges at once: segment i runs from vertex i to vertex i + 1 (wrapping)
+    start = polygon.astype(np.float64)
+    delta = np.roll(start, -1, axis=0) - start
+    offset = np.asarray(point, dtype=np.float64) - start
 
-        # Calculate distance to line segment
-        dist = point_to_segment_distance((x, y), p1, p2)
-        min_dist = min(min_dist, dist)
+    length_sq = np.einsum('ij,ij->i', delta, delta)
+    # Degenerate segments (repeated vertices) reduce to their start point
+    t = np.divide(np.einsum('ij,ij->i', offset, delta), length_sq,
+                  out=np.zeros_like(length_sq), where=length_sq > 0)
+    t = np.clip(t, 0, 1)
 
-    return min_dist
+    gap = offset - t[:, None] * delta
+    return float(np.sqrt(np.einsum('ij,ij->i', gap, gap).min()))
 
 
 def point_to_segment_distance(
@@ -190,15 +193,18 @@ def pole_of_inaccessibility(
 def find_best_label_position(
     mask: np.ndarray,
     contour: Optional[np.ndarray] = None,
-    precision: float = 1.0
+    precision: float = 1.0,
+    offset: Tuple[int, int] = (0, 0)
 ) -> Tuple[int, int]:
     """
     Find the best position to place a label in a region
 
     Args:
-        mask: Binary mask of the region (2D array)
+        mask: Binary mask of the region (2D array), possibly a crop
         contour: Optional contour points for the region
         precision: Search precision (smaller = more accurate)
+        offset: (x, y) position of ``mask`` in the coordinate space of
+                ``contour`` and the returned point
 
     Returns:
         (x, y) coordinates for label placement
@@ -217,8 +223,8 @@ def find_best_label_position(
     if len(x_coords) == 0:
         return (0, 0)
 
-    center_x = int(np.mean(x_coords))
-    center_y = int(np.mean(y_coords))
+    center_x = int(np.mean(x_coords)) + offset[0]
+    center_y = int(np.mean(y_coords)) + offset[1]
 
     return (center_x, center_y)
 
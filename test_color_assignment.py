@@ -0,0 +1,42 @@
+"""
+Regression tests for capacity-balanced palette assignment
+Run this from the mine/ directory
+"""
+
+import sys
+import os
+
+# Add paint_by_numbers to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'paint_by_numbers'))
+
+import numpy as np
+
+from paint_by_numbers.core.color_assignment import balanced_assignment
+
+
+def test_dominant_color_is_rebalanced():
+    """A column cheaper than every round's price step must still be priced down"""
+    rng = np.random.default_rng(0)
+    cost = rng.uniform(40, 60, (500, 6)).astype(np.float32)
+    cost[:, 0] -= 40  # Column 0 wins every row by about 40 ΔE
+    targets = np.full(6, 100 / 6)
+
+    labels, usage, rounds = balanced_assignment(cost, np.ones(500), targets, tolerance=15.0)
+
+    violation = np.maximum(np.abs(usage - targets) - 15.0, 0).sum()
+    assert violation == 0
+    assert rounds > 2
+    assert np.all(usage > 0)
+    assert np.allclose(np.bincount(labels, minlength=6) / 5, usage)
+
+
+def test_in_band_assignment_stops_after_first_round():
+    """Balanced input needs no price adjustment"""
+    cost = np.tile(np.arange(4, dtype=np.float32), (400, 1))
+    cost[np.arange(400), np.arange(400) % 4] = -1  # Every column wins a quarter of the rows
+
+    labels, usage, rounds = balanced_assignment(cost, np.ones(400), np.full(4, 25.0))
+
+    assert rounds == 1
+    assert np.allclose(usage, 25.0)
+    assert np.array_equal(labels, np.arange(400) % 4)
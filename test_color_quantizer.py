@@ -0,0 +1,65 @@
+"""
+Checks for the vectorized color-difference helpers and K-means engine selection
+Run this from the mine/ directory
+"""
+
+import sys
+import os
+
+# Add paint_by_numbers to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'paint_by_numbers'))
+
+import numpy as np
+
+from paint_by_numbers.config import Config
+from paint_by_numbers.core.color_quantizer import ColorQuantizer, delta_e_cie2000, delta_e_cie2000_matrix
+
+
+def random_lab(rng, n):
+    """Random Lab colors spanning L 0-100 and a/b -128..127"""
+    return np.column_stack([
+        rng.uniform(0, 100, n),
+        rng.uniform(-128, 127, n),
+        rng.uniform(-128, 127, n),
+    ])
+
+
+def test_matrix_matches_scalar_delta_e():
+    """Every entry equals the scalar CIEDE2000 at float32 tolerance"""
+    rng = np.random.default_rng(0)
+    lab1 = random_lab(rng, 200)
+    lab2 = random_lab(rng, 30)
+
+    matrix = delta_e_cie2000_matrix(lab1, lab2)
+    expected = np.array([[delta_e_cie2000(p, q) for q in lab2] for p in lab1])
+
+    assert matrix.shape == (200, 30)
+    assert matrix.dtype == np.float32
+    np.testing.assert_allclose(matrix, expected, rtol=1e-5, atol=1e-4)
+
+
+def test_chunked_matrix_equals_unchunked():
+    """A tiny memory ceiling forces row chunks without changing the result"""
+    rng = np.random.default_rng(1)
+    lab1 = random_lab(rng, 500)
+    lab2 = random_lab(rng, 12)
+
+    whole = delta_e_cie2000_matrix(lab1, lab2, memory_limit_mb=1024)
+    chunked = delta_e_cie2000_matrix(lab1, lab2, memory_limit_mb=0.01)
+
+    assert np.array_equal(whole, chunked)
+
+
+def test_parallel_engine_runs_on_default_config():
+    """KMEANS_ENGINE='parallel' clusters the histogram instead of falling back"""
+    config = Config()
+    config.KMEANS_ENGINE = 'parallel'
+    config.KMEANS_USE_HISTOGRAM = False
+
+    rng = np.random.default_rng(2)
+    image = (rng.integers(0, 8, (200, 200, 3)) * 32).astype(np.uint8)
+
+    quantizer = ColorQuantizer(config)
+    quantizer.quantize(image, n_colors=8, use_unified_palette=False)
+
+    assert quantizer.clustering_metadata['engine'] == 'parallel'
@@ -0,0 +1,58 @@
+"""
+Tests for cutting one palette tree at several palette sizes
+Run this from the mine/ directory
+"""
+
+import sys
+import os
+
+# Add paint_by_numbers to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'paint_by_numbers'))
+
+import numpy as np
+import pytest
+
+from paint_by_numbers.config import Config
+from paint_by_numbers.core.color_quantizer import ColorQuantizer
+
+
+@pytest.fixture(scope="module")
+def quantizer():
+    """Quantizer with a tree built once on a colorful image"""
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (96, 96, 3), dtype=np.uint8)
+    quantizer = ColorQuantizer(Config())
+    quantizer.build_palette_tree(image)
+    return quantizer
+
+
+@pytest.mark.parametrize("n_colors", [Config.MIN_NUM_COLORS, 20, Config.MAX_NUM_COLORS])
+def test_cut_gives_exactly_n_colors(quantizer, n_colors):
+    """Each cut yields n palette entries, all used, with labels in range"""
+    quantized, palette = quantizer.quantize_from_tree(n_colors)
+    labels = quantizer.labels
+
+    assert len(palette) == n_colors
+    assert labels.shape == (96, 96)
+    assert labels.min() >= 0 and labels.max() < n_colors
+    assert len(np.unique(labels)) == n_colors
+    assert np.array_equal(quantized, palette[labels])
+
+
+@pytest.mark.parametrize("n_colors", [Config.MIN_NUM_COLORS, 20, Config.MAX_NUM_COLORS])
+def test_labels_follow_the_tree_cut(quantizer, n_colors):
+    """Quantizer labels are the tree's cut labels up to the brightness ordering"""
+    quantizer.quantize_from_tree(n_colors)
+    _, tree_labels = quantizer.palette_tree.cut(n_colors)
+
+    pairs = np.unique(np.stack([tree_labels.ravel(), quantizer.labels.ravel()]), axis=1)
+    assert pairs.shape[1] == n_colors
+
+
+def test_coarser_cuts_merge_finer_clusters(quantizer):
+    """Every cluster at a finer cut lies inside one cluster of a coarser cut"""
+    _, coarse = quantizer.palette_tree.cut(Config.MIN_NUM_COLORS)
+    _, fine = quantizer.palette_tree.cut(20)
+
+    pairs = np.unique(np.stack([fine.ravel(), coarse.ravel()]), axis=1)
+    assert pairs.shape[1] == 20
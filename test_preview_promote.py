@@ -0,0 +1,73 @@
+"""
+Preview-to-full-resolution consistency tests
+Run this from the mine/ directory
+"""
+
+import sys
+import os
+
+# Add paint_by_numbers to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'paint_by_numbers'))
+
+import numpy as np
+import pytest
+
+from paint_by_numbers.utils.opencv import cv2_available, describe_missing_cv2, require_cv2
+
+if not cv2_available():
+    pytest.skip(describe_missing_cv2(), allow_module_level=True)
+
+from paint_by_numbers.config import Config
+from paint_by_numbers.main import PaintByNumbersGenerator
+from paint_by_numbers.output.template_generator import TemplateGenerator
+
+cv2 = require_cv2()
+
+
+def color_shares(generator):
+    """Percentage of the canvas painted with each palette color"""
+    labels = generator.color_quantizer.labels
+    return np.bincount(labels.ravel(), minlength=len(generator.palette)) / labels.size * 100
+
+
+@pytest.fixture
+def photo(tmp_path):
+    """Smooth, colorful scene with a dominant background"""
+    rng = np.random.default_rng(0)
+    h, w = 900, 1200
+    ys, xs = np.mgrid[0:h, 0:w].astype(np.float32)
+    image = np.stack([
+        120 + 80 * np.sin(xs / 170.0),
+        140 + 60 * np.cos(ys / 130.0),
+        110 + 70 * np.sin((xs + ys) / 210.0),
+    ], axis=2)
+    image += rng.normal(0, 6, image.shape)
+    image = np.clip(image, 0, 255).astype(np.uint8)
+    cv2.circle(image, (800, 300), 160, (240, 200, 60), -1)
+    cv2.rectangle(image, (150, 500), (520, 820), (40, 70, 160), -1)
+
+    path = tmp_path / "scene.png"
+    cv2.imwrite(str(path), cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+    return str(path)
+
+
+def test_kmeans_promote_matches_preview(photo, tmp_path, monkeypatch):
+    """Promoting a K-means preview keeps every color and its share of the canvas"""
+    # The comparison sheet is unrelated to quantization; skip it to keep the test quick
+    monkeypatch.setattr(TemplateGenerator, "create_comparison_image",
+                        lambda self, original, template, solution, layout="horizontal": template)
+    config = Config()
+    config.SHOW_PROGRESS = False
+    generator = PaintByNumbersGenerator(config)
+
+    generator.generate_preview(photo, str(tmp_path / "preview"), use_unified_palette=False,
+                               n_colors=12, paper_format=None)
+    preview_shares = color_shares(generator)
+    preview_palette = generator.palette.copy()
+
+    generator.promote_preview(str(tmp_path / "full"))
+    full_shares = color_shares(generator)
+
+    assert np.array_equal(generator.palette, preview_palette)
+    assert np.all(full_shares[preview_shares > 1.0] > 0)
+    assert np.abs(full_shares - preview_shares).sum() < 10.0
@@ -0,0 +1,106 @@
+"""
+Tile-seam and decoding tests for the streaming pipeline
+Run this from the mine/ directory
+"""
+
+import sys
+import os
+
+# Add paint_by_numbers to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'paint_by_numbers'))
+
+import numpy as np
+import pytest
+
+from paint_by_numbers.utils.opencv import cv2_available, describe_missing_cv2, require_cv2
+
+if not cv2_available():
+    pytest.skip(describe_missing_cv2(), allow_module_level=True)
+
+from PIL import Image
+
+from paint_by_numbers.config import Config
+from paint_by_numbers.utils.helpers import majority_filter_labels
+from paint_by_numbers.core.streaming_pipeline import StreamingPipeline, open_image_strips
+
+cv2 = require_cv2()
+
+N_COLORS = 4
+
+
+@pytest.fixture
+def pipeline():
+    """Pipeline with tiles small enough for many seams"""
+    config = Config()
+    config.STREAMING_TILE_SIZE = 64
+    return StreamingPipeline(config)
+
+
+@pytest.fixture
+def labels():
+    """Blobby label map whose regions wind across tile seams"""
+    rng = np.random.default_rng(0)
+    noise = cv2.GaussianBlur(rng.normal(size=(200, 330)).astype(np.float32), (0, 0), 6)
+    edges = np.quantile(noise, [0.25, 0.5, 0.75])
+    return np.digitize(noise, edges).astype(np.uint8)
+
+
+def test_smoothing_matches_full_frame(pipeline, labels, tmp_path):
+    """Halo reads make the tiled majority filter equal the full-frame one"""
+    smoothed = pipeline.smooth_labels(labels, tmp_path / "smoothed.npy", 5)
+
+    assert np.array_equal(np.asarray(smoothed), majority_filter_labels(labels, 5))
+
+
+def test_regions_stitched_across_seams(pipeline, labels, tmp_path):
+    """Stitched regions are exactly the full-frame 4-connected components"""
+    region_ids, table = pipeline.label_regions(labels, N_COLORS, tmp_path / "regions.npy")
+    region_ids = np.asarray(region_ids)
+
+    reference = np.empty(labels.shape, dtype=np.int64)
+    n_reference = 0
+    for color in range(N_COLORS):
+        mask = labels == color
+        n, components = cv2.connectedComponents(mask.view(np.uint8), connectivity=4)
+        reference[mask] = components[mask] + n_reference - 1
+        n_reference += n - 1
+
+    n_regions = len(table["area"])
+    assert n_regions == n_reference
+    # One-to-one correspondence between stitched and reference regions
+    pairs = np.unique(np.stack([region_ids.ravel(), reference.ravel()]), axis=1)
+    assert pairs.shape[1] == n_regions
+
+    assert np.array_equal(table["color"][region_ids], labels)
+    assert np.array_equal(table["area"], np.bincount(region_ids.ravel(), minlength=n_regions))
+
+    ys, xs = np.indices(labels.shape)
+    for region in (0, n_regions // 2, n_regions - 1):
+        member_y, member_x = ys[region_ids == region], xs[region_ids == region]
+        x, y, w, h = table["bbox"][region]
+        assert (x, y) == (member_x.min(), member_y.min())
+        assert (x + w, y + h) == (member_x.max() + 1, member_y.max() + 1)
+        assert np.allclose(table["center"][region], (member_x.mean(), member_y.mean()))
+
+
+def test_compressed_image_keeps_bomb_guard(tmp_path, monkeypatch):
+    """Decoding ignores Pillow's pixel limit without changing it"""
+    rng = np.random.default_rng(1)
+    gray = rng.integers(0, 256, (90, 120), dtype=np.uint8)
+    path = tmp_path / "gray.png"
+    Image.fromarray(gray).save(path)
+
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+    pixels = open_image_strips(str(path), tmp_path, max_dimension=200, strip_rows=8)
+
+    assert Image.MAX_IMAGE_PIXELS == 1000
+    assert np.array_equal(np.asarray(pixels), np.repeat(gray[..., None], 3, axis=2))
+
+
+def test_compressed_image_over_budget_is_refused(tmp_path):
+    """Compressed inputs whose full decode exceeds the budget are rejected"""
+    path = tmp_path / "color.png"
+    Image.fromarray(np.zeros((100, 100, 3), dtype=np.uint8)).save(path)
+
+    with pytest.raises(ValueError, match="streaming budget"):
+        open_image_strips(str(path), tmp_path, max_dimension=200, decode_budget_mb=0.01)